@@ -1,13 +1,27 @@
+import os
+import sys
+import json
+import time
 import pygame
 from src.settings import *
-from src.utils import safe_eval, screen_to_real
+from src.utils import safe_eval
 from src.game import Game
-from src.levels import LEVELS, is_free_level  # Import is_free_level
+from src.controls import handle_event, handle_held_keys, new_backspace_state
+from src.replay import ReplayRecorder
+from src.progress import ProgressStore, progress_path
+from src.preview import CurvePreview
+from src.frame_rate import FrameScheduler, is_animating
+from src.levels import is_free_level  # Import is_free_level
+from src.level_pack import load_levels
 from src.ui import (
     draw_text, 
     draw_panel, 
     draw_path, 
+    draw_preview_curve,
+    draw_fit_overlay,
+    draw_roots,
     draw_stars, 
+    draw_point_cloud,
     draw_ball,
     draw_game_ui, 
     draw_level_complete, 
@@ -28,125 +42,59 @@ def main():
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption(TITLE)
     
-    # Create game instance
-    game = Game()
+    # Create game instance, with the levels from a pack file if one is given: --pack FILE
+    pack_path = sys.argv[sys.argv.index("--pack") + 1] if "--pack" in sys.argv[:-1] else None
+    game = Game(load_levels(pack_path))
     
-    # Backspace handling variables
-    backspace_held = False
-    backspace_delay = 500  # Initial delay in ms before rapid deletion starts
-    backspace_rate = 50    # Time between deletions in ms during rapid deletion
-    backspace_timer = 0
+    # Record the run so player-reported bugs can be replayed
+    recorder = None
+    if "--no-record" not in sys.argv:
+        recorder = ReplayRecorder(os.path.join(REPLAY_DIR, time.strftime("run-%Y%m%d-%H%M%S.eqr")))
+        if pack_path:
+            recorder.record_level_pack(os.path.abspath(pack_path))  # So --verify plays the same levels
+        game.recorder = recorder
     
-    # Main loop
+    # Save progress for this level pack in the background (disable with --no-save)
+    progress = None
+    if "--no-save" not in sys.argv:
+        progress = ProgressStore(progress_path(game.levels.name))
+        progress.start()
+        game.progress = progress
+    
+    # Start in free exploration with a dataset loaded: --import FILE
+    if "--import" in sys.argv[:-1]:
+        game.selected_menu_item = 1  # Explore
+        game.select_menu_item()
+        game.import_points(sys.argv[sys.argv.index("--import") + 1])
+    
+    # Preview the equation while it's being typed
+    preview = CurvePreview()
+    preview.start()
+    game.preview = preview
+    
+    # Backspace handling state
+    backspace = new_backspace_state()
+    
+    # Main loop - redraw at ACTIVE_FPS only while something moves (--fixed-fps always does)
     running = True
-    clock = pygame.time.Clock()
+    scheduler = FrameScheduler(idle_fps=0 if "--fixed-fps" in sys.argv else IDLE_FPS)
+    events = []  # Input that woke up an idle frame
     
     while running:
         current_time = pygame.time.get_ticks()
         mouse_pos = pygame.mouse.get_pos()
+        if recorder:
+            recorder.begin_frame(current_time)
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        for event in events + pygame.event.get():
+            mods = pygame.key.get_mods()
+            if recorder:
+                recorder.record_event(event, mods, mouse_pos)
+            if not handle_event(game, event, mods, mouse_pos, current_time, backspace):
                 running = False
-                
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # Check if in free exploration mode and playing state
-                if game.is_free_mode and game.game_state == STATE_PLAYING and event.button == 1:
-                    # Add a point at the clicked position
-                    game.add_point(mouse_pos)
-                
-            if event.type == pygame.KEYDOWN:
-                # Handle different input based on game state
-                if game.game_state == STATE_MENU:
-                    if event.key == pygame.K_UP:
-                        game.move_menu_selection(-1)
-                    elif event.key == pygame.K_DOWN:
-                        game.move_menu_selection(1)
-                    elif event.key == pygame.K_RETURN:
-                        running = game.select_menu_item()
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False
-                        
-                elif game.game_state == STATE_LEVEL_SELECT:
-                    if event.key == pygame.K_UP:
-                        game.move_menu_selection(-1)
-                    elif event.key == pygame.K_DOWN:
-                        game.move_menu_selection(1)
-                    elif event.key == pygame.K_RETURN:
-                        game.select_menu_item()
-                    elif event.key == pygame.K_ESCAPE:
-                        game.game_state = STATE_MENU
-                        
-                elif game.game_state == STATE_LEVEL_COMPLETE:
-                    if event.key == pygame.K_RETURN:
-                        game.next_level()
-                    elif event.key == pygame.K_r and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        game.reset_level()
-                    elif event.key == pygame.K_ESCAPE:
-                        game.game_state = STATE_LEVEL_SELECT
-                
-                # Add handling for level failed state
-                elif game.game_state == "level_failed":
-                    if event.key == pygame.K_r and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        game.reset_level()
-                    elif event.key == pygame.K_ESCAPE:
-                        game.game_state = STATE_LEVEL_SELECT
-                
-                elif game.game_state == STATE_PLAYING:
-                    # Check for free mode specific keys first
-                    if game.handle_free_mode_keys(event):
-                        # Key was handled by free mode
-                        continue
-                        
-                    # Normal game controls
-                    if event.key == pygame.K_ESCAPE and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        running = False
-                    elif event.key == pygame.K_ESCAPE:
-                        game.game_state = STATE_MENU
-                    elif event.key == pygame.K_RETURN and game.input_active:
-                        game.submit_equation()
-                    elif event.key == pygame.K_e and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        game.toggle_input()
-                    elif event.key == pygame.K_r and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        # Only allow reset if not attempted yet in challenge mode
-                        if not game.has_attempted or game.is_free_mode:
-                            game.reset_level()
-                    elif event.key == pygame.K_h and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        game.show_help()  # Use the show_help function to properly remember the previous state
-                    elif event.key == pygame.K_t and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        # Toggle hint display
-                        game.toggle_hint()
-                    elif event.key == pygame.K_a and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        # Toggle answer display
-                        game.toggle_answer()
-                    elif game.input_active:
-                        if event.key == pygame.K_BACKSPACE:
-                            game.handle_backspace()
-                            backspace_held = True
-                            backspace_timer = current_time + backspace_delay
-                        else:
-                            game.add_character(event.unicode)
-                    else:
-                        # Auto-enable input mode when user starts typing (not in free mode)
-                        if (not game.is_free_mode and 
-                            event.unicode.isprintable() and 
-                            event.unicode not in [' ', '\t', '\r', '\n']):
-                            game.input_active = True
-                            game.add_character(event.unicode)
-                
-                elif game.game_state == STATE_HELP:
-                    # Return to the previous state (menu or playing)
-                    game.exit_help()
-            
-            elif event.type == pygame.KEYUP:
-                if event.key == pygame.K_BACKSPACE:
-                    backspace_held = False
     
         # Handle continuous backspace when held down
-        if backspace_held and game.input_active:
-            if current_time >= backspace_timer:
-                game.handle_backspace()
-                backspace_timer = current_time + backspace_rate
+        handle_held_keys(game, current_time, backspace)
     
         # Update game state
         game.update()
@@ -162,17 +110,28 @@ def main():
             draw_main_menu(screen, game.selected_menu_item, game.menu_items)
             
         elif game.game_state == STATE_LEVEL_SELECT:
-            draw_level_select(screen, game.selected_level, game.unlocked_levels, game.level_stats)
+            draw_level_select(screen, game.selected_level, game.unlocked_levels, game.level_stats, game.levels)
             
         elif game.game_state == STATE_PLAYING:
             # Draw coordinate system
-            draw_coordinate_system(screen)
+            draw_coordinate_system(screen, game.view)
             
-            # Draw path, stars and ball
-            draw_path(screen, lambda x: game.path(x))  # Pass as a lambda function
-            draw_stars(screen, game.stars)
+            # Draw path, stars and ball through the zoomed and panned view
+            if game.imported is not None:
+                draw_point_cloud(screen, game.imported, view=game.view)
+            if game.is_free_mode and game.show_overlay:
+                # Every fitting method at once, instead of just the selected one
+                draw_fit_overlay(screen, game.overlay_curves(), game.view)
+                samples = game.sample_path()
+            else:
+                samples = draw_path(screen, game.path, view=game.view, samples=game.sample_path())
+            if game.show_roots and samples is not None:
+                draw_roots(screen, game.visible_roots(*samples), view=game.view)
+            if game.input_active and preview.curve is not None:
+                draw_preview_curve(screen, preview.curve[1], preview.curve[2], view=game.view)
+            draw_stars(screen, game.stars, view=game.view)
             if not game.is_free_mode:
-                draw_ball(screen, game.ball_pos)
+                draw_ball(screen, game.ball_pos, view=game.view)
             
             # Check for level completion or failure and show appropriate screen
             if game.handle_level_progress(screen):
@@ -186,11 +145,11 @@ def main():
                 
                 # In free mode, show the real coordinates near the mouse cursor
                 if game.is_free_mode:
-                    draw_point_coordinates(screen, mouse_pos)
+                    draw_point_coordinates(screen, mouse_pos, game.view)
                          
         elif game.game_state == STATE_LEVEL_COMPLETE:
             # Check if there are more levels available
-            next_level_available = game.current_level + 1 < len(LEVELS)
+            next_level_available = game.current_level + 1 < len(game.levels)
             draw_level_complete(screen, game.collected_stars, next_level_available)
             
         elif game.game_state == "level_failed":
@@ -201,8 +160,15 @@ def main():
             draw_help_screen(screen)
     
         pygame.display.flip()
-        clock.tick(60)
+        events = scheduler.wait(is_animating(game, backspace))
     
+    if recorder:
+        recorder.close()
+    if progress:
+        progress.close()
+    preview.close()
+    if "--fps-report" in sys.argv:
+        print("Frame report: " + json.dumps(scheduler.report()))
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""
+Sound loading and playback for Equation Quest
+
+Sounds are decoded on a background thread so startup never waits on audio.
+Decoded samples are cached on disk, so later launches skip MP3 decoding.
+Playing a sound that is not loaded (yet), or when no audio device is
+available, does nothing.
+"""
+import os
+import threading
+import pygame
+from src.settings import SOUND_ENABLED, SOUND_VOLUME, SOUND_CACHE_DIR
+
+class SoundRegistry:
+    """Named sound effects loaded in the background"""
+
+    def __init__(self, cache_dir=SOUND_CACHE_DIR, volume=SOUND_VOLUME):
+        self.cache_dir = cache_dir
+        self.volume = volume
+        self.sounds = {}
+        self.available = True
+        self._thread = None
+
+    def load_async(self, paths):
+        """
+        Start loading sounds on a background thread.
+
+        Args:
+            paths: Dictionary mapping sound names to asset paths
+        """
+        self._thread = threading.Thread(target=self._load_all, args=(dict(paths),),
+                                        name="sound-loader", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """Block until background loading has finished (mainly for tools)"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_loaded(self, name):
+        """Check if a sound is ready to play"""
+        return name in self.sounds
+
+    def play(self, name):
+        """Play a sound if it is loaded"""
+        sound = self.sounds.get(name)
+        if SOUND_ENABLED and sound is not None:
+            sound.play()
+
+    def _load_all(self, paths):
+        """Initialize the mixer and load every sound (runs on the loader thread)"""
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Sound disabled: {e}")
+            self.available = False
+            return
+
+        for name, path in paths.items():
+            try:
+                sound = self._load(path)
+                sound.set_volume(self.volume)
+                self.sounds[name] = sound
+            except (pygame.error, OSError) as e:
+                print(f"Error loading sound {path}: {e}")
+
+    def _cache_path(self, path):
+        """Get the cache file for a sound, keyed on the asset and mixer format"""
+        stat = os.stat(path)
+        frequency, size, channels = pygame.mixer.get_init()
+        name = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+        key = f"{name}-{stat.st_size}-{int(stat.st_mtime)}-{frequency}-{size}-{channels}.pcm"
+        return os.path.join(self.cache_dir, key)
+
+    def _load(self, path):
+        """Load a sound from the decoded sample cache, decoding it on a miss"""
+        cache_path = self._cache_path(path)
+        try:
+            with open(cache_path, "rb") as f:
+                return pygame.mixer.Sound(buffer=f.read())
+        except OSError:
+            pass
+
+        sound = pygame.mixer.Sound(path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(sound.get_raw())
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not cache sound {path}: {e}")
+        return sound
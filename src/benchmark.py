@@ -0,0 +1,206 @@
+"""
+Root-finding and curve-fitting benchmarks for Equation Quest
+
+Times every solver on a corpus of functions (each LEVELS solution plus
+pathological cases) and every fitting method on point sets from 2 up to
+10^6 points. Results are written as JSON lines so runs can be compared
+across releases.
+
+Usage:
+    python -m src.benchmark [--quick] [--output results.jsonl]
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+import contextlib
+import numpy as np
+from src.levels import LEVELS
+from src.utils import safe_eval
+from src.settings import X_MIN, X_MAX
+from src.rootfinding import (
+    bisection_method,
+    brent_method,
+    newton_raphson,
+    secant_method,
+    bisection_batch,
+    find_roots_in_samples,
+    find_best_fit,
+    polynomial_from_points,
+    collect_solver_stats
+)
+
+POINT_SET_SIZES = [2, 10, 100, 1000, 10**4, 10**5, 10**6]
+QUICK_SIZES = [2, 10, 100, 1000, 10**4]
+
+# Largest point set each fitting method is run on (Lagrange weights need n^2 memory)
+MAX_FIT_SIZE = {
+    "least_squares": 10**6,
+    "spline": 10**6,
+    "lagrange": 2000
+}
+
+def _derivative(f, h=1e-4):
+    """Central difference derivative for corpus functions without one"""
+    return lambda x: (f(x + h) - f(x - h)) / (2 * h)
+
+def function_corpus():
+    """
+    Get the benchmark functions.
+
+    Returns:
+        List of (name, f, df, bracket) tuples. bracket is None when the
+        function has no sign change in the visible window.
+    """
+    corpus = []
+    x_grid = np.linspace(X_MIN, X_MAX, 400)
+    for i, level in enumerate(LEVELS):
+        if "solution" not in level:
+            continue
+        equation = level["solution"]
+        f = lambda x, equation=equation: safe_eval(equation, x)
+        # Use the first sign change in view as the bracket
+        roots = find_roots_in_samples(f, x_grid)
+        bracket = None
+        if len(roots):
+            i_right = np.searchsorted(x_grid, roots[0])
+            bracket = (x_grid[max(i_right - 1, 0)], x_grid[min(i_right, len(x_grid) - 1)])
+            if bracket[0] == bracket[1]:
+                bracket = (bracket[0] - 1.0, bracket[1] + 1.0)
+        corpus.append((f"level{i + 1}: {equation}", f, _derivative(f), bracket))
+
+    corpus += [
+        ("cubic", lambda x: x**3 - 2*x - 5, lambda x: 3*x**2 - 2, (2.0, 3.0)),
+        ("flat derivative: x^3", lambda x: x**3, lambda x: 3*x**2, (-1.0, 2.0)),
+        ("triple root: (x-1)^3", lambda x: (x - 1)**3, lambda x: 3*(x - 1)**2, (0.0, 3.0)),
+        ("near-double root: (x-1)(x-1.001)", lambda x: (x - 1)*(x - 1.001),
+         lambda x: 2*x - 2.001, (0.5, 1.0005)),
+        ("steep: exp(20x) - 1", lambda x: np.exp(20*x) - 1, lambda x: 20*np.exp(20*x), (-1.0, 2.0)),
+        ("high frequency: sin(50x)", lambda x: np.sin(50*x), lambda x: 50*np.cos(50*x), (0.05, 0.08)),
+    ]
+    return corpus
+
+def _time_best(func, repeat):
+    """Run func repeat times and return (best time in seconds, last result)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def bench_solvers(repeat=5):
+    """Benchmark every scalar solver on every corpus function"""
+    results = []
+    for name, f, df, bracket in function_corpus():
+        if bracket is None:
+            results.append({"suite": "solver", "case": name, "method": None, "error": "no sign change in view"})
+            continue
+        a, b = bracket
+        solvers = {
+            "bisection": lambda: bisection_method(f, a, b, history=False),
+            "brent": lambda: brent_method(f, a, b, history=False),
+            "newton_raphson": lambda: newton_raphson(f, df, b, history=False),
+            "secant": lambda: secant_method(f, a, b, history=False)
+        }
+        for method, solve in solvers.items():
+            record = {"suite": "solver", "case": name, "method": method}
+            try:
+                with collect_solver_stats() as stats:
+                    seconds, (root, _, _) = _time_best(solve, repeat)
+                record.update({
+                    "seconds": seconds,
+                    "iterations": stats[-1]["iterations"],
+                    "evals": stats[-1]["evals"],
+                    "converged": bool(stats[-1]["converged"]),
+                    "root": float(root),
+                    "residual": float(abs(f(root)))
+                })
+            except (ValueError, OverflowError, ZeroDivisionError) as e:
+                record["error"] = str(e)
+            results.append(record)
+    return results
+
+def bench_batch(sizes, repeat=3):
+    """Benchmark vectorized bisection on one bracket per sample interval"""
+    results = []
+    for size in sizes:
+        if size < 2:
+            continue
+        grid = np.linspace(-1000, 1000, size + 1)
+        seconds, (_, iterations, converged) = _time_best(
+            lambda: bisection_batch(np.sin, grid[:-1], grid[1:]), repeat)
+        results.append({
+            "suite": "batch", "case": "sin(x)", "method": "bisection_batch", "size": size,
+            "seconds": seconds, "iterations": int(iterations.sum()), "converged": int(converged.sum())
+        })
+    return results
+
+def bench_fitting(sizes, repeat=3, seed=0):
+    """Benchmark building and evaluating every fitting method"""
+    rng = np.random.default_rng(seed)
+    eval_x = np.linspace(X_MIN, X_MAX, 1000)
+    fitters = {
+        "least_squares": lambda points: find_best_fit(points, "least_squares", degree=3),
+        "spline": lambda points: find_best_fit(points, "spline"),
+        "lagrange": polynomial_from_points
+    }
+    results = []
+    for size in sizes:
+        # Distinct sorted x values keep interpolation well defined
+        x = np.sort(rng.uniform(X_MIN, X_MAX, size))
+        y = 0.001 * x**2 + 50 * np.sin(x * 0.02) + rng.normal(0, 5, size)
+        points = np.column_stack((x, y))
+        point_list = points.tolist()
+        for method, fit in fitters.items():
+            if size > MAX_FIT_SIZE[method]:
+                continue
+            data = points if method == "spline" else point_list
+            try:
+                seconds, curve = _time_best(lambda: fit(data), repeat)
+                eval_seconds, _ = _time_best(lambda: curve(eval_x), repeat)
+                results.append({
+                    "suite": "fit", "case": "parabola+sine+noise", "method": method, "size": size,
+                    "seconds": seconds, "eval_seconds": eval_seconds, "evals": len(eval_x)
+                })
+            except (ValueError, np.linalg.LinAlgError) as e:
+                results.append({"suite": "fit", "method": method, "size": size, "error": str(e)})
+    return results
+
+def run_benchmarks(quick=False):
+    """Run every benchmark and return the result records"""
+    sizes = QUICK_SIZES if quick else POINT_SET_SIZES
+    results = [{
+        "suite": "meta",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "quick": quick
+    }]
+    results += bench_solvers()
+    results += bench_batch(sizes)
+    results += bench_fitting(sizes)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark root finding and curve fitting")
+    parser.add_argument("--quick", action="store_true", help="only use point sets up to 10^4")
+    parser.add_argument("--output", help="write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # safe_eval reports bad expressions on stdout; keep that out of the results
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_benchmarks(quick=args.quick)
+    lines = "\n".join(json.dumps(record) for record in results) + "\n"
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(lines)
+    else:
+        sys.stdout.write(lines)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Input handling for Equation Quest
+
+The main loop and replay playback both feed events through these functions
+so that a recorded run can be re-simulated exactly.
+"""
+import pygame
+from src.settings import *
+
+# Backspace handling
+BACKSPACE_DELAY = 500  # Initial delay in ms before rapid deletion starts
+BACKSPACE_RATE = 50    # Time between deletions in ms during rapid deletion
+
+def new_backspace_state():
+    """Create the state used to repeat a held backspace key"""
+    return {"held": False, "timer": 0}
+
+def handle_event(game, event, mods, mouse_pos, current_time, backspace):
+    """
+    Handle a single pygame event.
+
+    Args:
+        game: The Game instance
+        event: The pygame event
+        mods: Keyboard modifier state when the event was handled
+        mouse_pos: Mouse position in screen coordinates
+        current_time: Time in ms since the game started
+        backspace: Backspace repeat state from new_backspace_state()
+
+    Returns:
+        False if the game should quit, True otherwise
+    """
+    running = True
+
+    if event.type == pygame.QUIT:
+        running = False
+
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        # Check if in free exploration mode and playing state
+        if game.is_free_mode and game.game_state == STATE_PLAYING and event.button == 1:
+            # Add a point at the clicked position
+            game.add_point(mouse_pos)
+        elif game.game_state == STATE_PLAYING and event.button in (2, 3):
+            # Drag with the right or middle button to pan
+            game.start_pan(mouse_pos)
+
+    if event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+        game.end_pan()
+
+    if event.type == pygame.MOUSEMOTION and game.pan_from is not None and any(event.buttons):
+        game.pan_view(mouse_pos)
+
+    if event.type == pygame.MOUSEWHEEL and game.game_state == STATE_PLAYING:
+        # Zoom around the mouse pointer
+        game.zoom_view(mouse_pos, event.y)
+
+    if event.type == pygame.DROPFILE:
+        # Dropping a dataset file on the window imports it in free mode
+        if game.is_free_mode and game.game_state == STATE_PLAYING:
+            game.import_points(event.file)
+
+    if event.type == pygame.KEYDOWN:
+        # Handle different input based on game state
+        if game.game_state == STATE_MENU:
+            if event.key == pygame.K_UP:
+                game.move_menu_selection(-1)
+            elif event.key == pygame.K_DOWN:
+                game.move_menu_selection(1)
+            elif event.key == pygame.K_RETURN:
+                running = game.select_menu_item()
+            elif event.key == pygame.K_ESCAPE:
+                running = False
+
+        elif game.game_state == STATE_LEVEL_SELECT:
+            if event.key == pygame.K_UP:
+                game.move_menu_selection(-1)
+            elif event.key == pygame.K_DOWN:
+                game.move_menu_selection(1)
+            elif event.key == pygame.K_PAGEUP:
+                game.page_level_selection(-1)
+            elif event.key == pygame.K_PAGEDOWN:
+                game.page_level_selection(1)
+            elif event.key == pygame.K_RETURN:
+                game.select_menu_item()
+            elif event.key == pygame.K_ESCAPE:
+                game.game_state = STATE_MENU
+
+        elif game.game_state == STATE_LEVEL_COMPLETE:
+            if event.key == pygame.K_RETURN:
+                game.next_level()
+            elif event.key == pygame.K_r and mods & pygame.KMOD_CTRL:
+                game.reset_level()
+            elif event.key == pygame.K_ESCAPE:
+                game.game_state = STATE_LEVEL_SELECT
+
+        # Add handling for level failed state
+        elif game.game_state == "level_failed":
+            if event.key == pygame.K_r and mods & pygame.KMOD_CTRL:
+                game.reset_level()
+            elif event.key == pygame.K_ESCAPE:
+                game.game_state = STATE_LEVEL_SELECT
+
+        elif game.game_state == STATE_PLAYING:
+            # Check for free mode specific keys first
+            if game.handle_free_mode_keys(event):
+                # Key was handled by free mode
+                return running
+
+            # Normal game controls
+            if event.key == pygame.K_ESCAPE and mods & pygame.KMOD_CTRL:
+                running = False
+            elif event.key == pygame.K_ESCAPE:
+                game.game_state = STATE_MENU
+            elif event.key == pygame.K_RETURN and game.input_active:
+                game.submit_equation()
+            elif event.key == pygame.K_e and mods & pygame.KMOD_CTRL:
+                game.toggle_input()
+            elif event.key == pygame.K_r and mods & pygame.KMOD_CTRL:
+                # Only allow reset if not attempted yet in challenge mode
+                if not game.has_attempted or game.is_free_mode:
+                    game.reset_level()
+            elif event.key == pygame.K_h and mods & pygame.KMOD_CTRL:
+                game.show_help()  # Use the show_help function to properly remember the previous state
+            elif event.key == pygame.K_t and mods & pygame.KMOD_CTRL:
+                # Toggle hint display
+                game.toggle_hint()
+            elif event.key == pygame.K_a and mods & pygame.KMOD_CTRL:
+                # Toggle answer display
+                game.toggle_answer()
+            elif event.key == pygame.K_x and mods & pygame.KMOD_CTRL:
+                # Toggle x-axis crossing markers
+                game.toggle_roots()
+            elif event.key == pygame.K_HOME:
+                # Back to the standard view after zooming or panning
+                game.reset_view()
+            elif game.input_active:
+                if event.key == pygame.K_BACKSPACE:
+                    game.handle_backspace()
+                    backspace["held"] = True
+                    backspace["timer"] = current_time + BACKSPACE_DELAY
+                else:
+                    game.add_character(event.unicode)
+            else:
+                # Auto-enable input mode when user starts typing (not in free mode)
+                if (not game.is_free_mode and
+                    event.unicode.isprintable() and
+                    event.unicode not in [' ', '\t', '\r', '\n']):
+                    game.input_active = True
+                    game.add_character(event.unicode)
+
+        elif game.game_state == STATE_HELP:
+            # Return to the previous state (menu or playing)
+            game.exit_help()
+
+    elif event.type == pygame.KEYUP:
+        if event.key == pygame.K_BACKSPACE:
+            backspace["held"] = False
+
+    return running
+
+def handle_held_keys(game, current_time, backspace):
+    """Handle continuous backspace when held down"""
+    if backspace["held"] and game.input_active:
+        if current_time >= backspace["timer"]:
+            game.handle_backspace()
+            backspace["timer"] = current_time + BACKSPACE_RATE
@@ -0,0 +1,194 @@
+"""
+Bulk point import for free exploration mode
+
+Datasets are read in chunks - .npy files are memory-mapped and CSV files
+are parsed a block at a time - so files with millions of points never have
+to fit in memory. A first pass finds the data's bounding box; the second
+folds each chunk into a least-squares fitter centred on the data and into
+a PointCloud, which keeps one flag per cell of a screen-sized grid over
+the bounding box, so drawing the data costs the same however many points
+it has and wherever it lies.
+"""
+import io
+import os
+import warnings
+import numpy as np
+from src.settings import WIDTH, HEIGHT
+
+CHUNK_ROWS = 1 << 18           # Rows per chunk for .npy files
+CSV_CHUNK_BYTES = 8 << 20      # Bytes per block for CSV files
+
+class PointCloud:
+    """Imported points decimated to a screen-sized grid over their bounding box"""
+
+    def __init__(self, bounds, path=""):
+        self.path = path
+        self.count = 0  # Number of points imported
+        self.skipped = 0  # Rows dropped because x or y isn't a number
+        self.bounds = bounds  # (x_min, x_max, y_min, y_max) of the data
+        x_min, x_max, y_min, y_max = bounds
+        self.cell_width = max(x_max - x_min, 1e-9) / WIDTH
+        self.cell_height = max(y_max - y_min, 1e-9) / HEIGHT
+        self.mask = np.zeros((WIDTH, HEIGHT), dtype=bool)  # Indexed [column, row], row 0 at y_max
+        self.surface = None  # Rendered mask, cached by the UI
+        self.view_surface = None  # Rendered mask scaled for the current view, cached by the UI
+
+    def to_cells(self, x, y):
+        """Convert real coordinates to (fractional) grid coordinates"""
+        x_min, _, _, y_max = self.bounds
+        return (x - x_min) / self.cell_width, (y_max - y) / self.cell_height
+
+    def to_real(self, column, row):
+        """Convert grid coordinates to real coordinates"""
+        x_min, _, _, y_max = self.bounds
+        return x_min + column * self.cell_width, y_max - row * self.cell_height
+
+    def add(self, x, y):
+        """Add a chunk of points in real coordinates (inside the bounds)"""
+        self.count += len(x)
+        column, row = self.to_cells(x, y)
+        column = np.clip(column.astype(np.int64), 0, WIDTH - 1)  # x_max lands on the edge of the last cell
+        row = np.clip(row.astype(np.int64), 0, HEIGHT - 1)
+        self.mask[column, row] = True
+        self.surface = None
+        self.view_surface = None
+
+    def pixels(self):
+        """Get the grid cells covered by at least one point"""
+        return np.argwhere(self.mask)
+
+def _npy_chunks(path, chunk_rows):
+    """Yield (x, y) chunks from a memory-mapped .npy file"""
+    data = np.load(path, mmap_mode="r")
+    if data.ndim != 2 or data.shape[1] < 2:
+        raise ValueError(f"Expected an array of shape (n, 2), got {data.shape}")
+    for start in range(0, len(data), chunk_rows):
+        chunk = np.asarray(data[start:start + chunk_rows, :2], dtype=float)
+        yield chunk[:, 0], chunk[:, 1]
+
+def _parse_csv_block(block, columns):
+    """
+    Parse complete CSV lines into a (rows, 2) array of x and y.
+
+    Fields that aren't numbers (empty, "n/a", ...) become NaN and rows with
+    fewer than two columns are dropped, so one bad row doesn't stop an import.
+    """
+    text = block.replace(b"\r", b"").strip()
+    while b"\n\n" in text:
+        text = text.replace(b"\n\n", b"\n")  # Drop blank lines
+    if not text:
+        return np.empty((0, 2))
+    try:
+        # Fast path for clean numeric data
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")  # Older numpy only warns about unparsed text
+            values = np.fromstring(text.replace(b"\n", b",").decode("ascii"), sep=",")
+        if len(values) % columns == 0:
+            return values.reshape(-1, columns)[:, :2]
+    except (ValueError, DeprecationWarning, UnicodeDecodeError):
+        pass
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # genfromtxt warns about every short row it drops
+        rows = np.genfromtxt(io.BytesIO(text), delimiter=",", usecols=(0, 1), invalid_raise=False, ndmin=2)
+    return rows.reshape(-1, 2)
+
+def _csv_chunks(path, chunk_bytes):
+    """Yield (x, y) chunks from a CSV file, parsing one block of lines at a time"""
+    columns = None
+    leftover = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk_bytes)
+            data = leftover + block
+            if block:
+                # Only parse complete lines, keep the rest for the next block
+                end = data.rfind(b"\n") + 1
+                data, leftover = data[:end], data[end:]
+            else:
+                leftover = b""
+
+            if columns is None:
+                data = data.lstrip()
+                first_line = data.split(b"\n", 1)[0]
+                if not first_line:
+                    if not block:
+                        break
+                    continue
+                fields = first_line.split(b",")
+                try:
+                    [float(field) for field in fields if field.strip()]  # Empty fields are gaps, not a header
+                except ValueError:
+                    data = data[len(first_line) + 1:]  # Skip the header row
+                columns = len(fields)
+                if columns < 2:
+                    raise ValueError("CSV data needs at least two columns (x, y)")
+
+            rows = _parse_csv_block(data, columns)
+            if len(rows):
+                yield rows[:, 0], rows[:, 1]
+            if not block:
+                break
+
+def iter_point_chunks(path, chunk_rows=CHUNK_ROWS, chunk_bytes=CSV_CHUNK_BYTES):
+    """
+    Read a point dataset in chunks.
+
+    Args:
+        path: A .npy file holding an (n, 2) array, or a CSV file with x and y
+            as the first two columns (an optional header row is skipped)
+        chunk_rows: Rows per chunk for .npy files
+        chunk_bytes: Bytes read at a time for CSV files
+
+    Returns:
+        Iterator of (x, y) array pairs
+    """
+    if os.path.splitext(path)[1].lower() == ".npy":
+        return _npy_chunks(path, chunk_rows)
+    return _csv_chunks(path, chunk_bytes)
+
+def dataset_bounds(path):
+    """
+    Find the bounding box of a point dataset (one pass over the file).
+
+    Returns:
+        Tuple of (x_min, x_max, y_min, y_max) over the rows whose x and y
+        are numbers
+
+    Raises:
+        ValueError: If the dataset has no such rows
+    """
+    bounds = [np.inf, -np.inf, np.inf, -np.inf]
+    for x, y in iter_point_chunks(path):
+        finite = np.isfinite(x) & np.isfinite(y)
+        if finite.any():
+            x, y = x[finite], y[finite]
+            bounds = [min(bounds[0], x.min()), max(bounds[1], x.max()),
+                      min(bounds[2], y.min()), max(bounds[3], y.max())]
+    if not np.isfinite(bounds[0]):
+        raise ValueError(f"No points in {path}")
+    return tuple(float(b) for b in bounds)
+
+def load_point_cloud(path, fitter=None, bounds=None):
+    """
+    Import a point dataset.
+
+    Args:
+        path: Dataset file (see iter_point_chunks)
+        fitter: Optional PolynomialFitter the points are added to (centre it
+            on the data's x-range, see dataset_bounds)
+        bounds: The dataset's bounding box if already known (saves a pass)
+
+    Returns:
+        PointCloud covering the data's bounding box
+    """
+    cloud = PointCloud(bounds or dataset_bounds(path), path)
+    for x, y in iter_point_chunks(path):
+        # Sensor recordings often contain gaps - skip rows whose x or y isn't a number
+        finite = np.isfinite(x) & np.isfinite(y)
+        if not finite.all():
+            cloud.skipped += int((~finite).sum())
+            x, y = x[finite], y[finite]
+        cloud.add(x, y)
+        if fitter is not None:
+            fitter.add_points(x, y)
+    return cloud
@@ -0,0 +1,96 @@
+"""
+Font loading for Equation Quest
+
+Fonts are resolved on first use rather than at import. Looking up system
+fonts scans every installed font, so resolved font paths are kept in a
+small on-disk cache and later launches load the font file directly.
+"""
+import os
+import json
+import pygame
+from src.settings import FONT_CACHE_PATH
+
+# Common fallback options, tried in order after the requested font
+FALLBACK_FONTS = ['arial', 'freesans', 'liberationsans', 'dejavu', 'ubuntu']
+
+_font_paths = None  # Font name -> resolved file path (None means pygame default)
+_fonts = {}         # (font name, size) -> loaded font
+
+def _load_font_paths():
+    """Read the resolved font path table from the cache file"""
+    global _font_paths
+    if _font_paths is None:
+        try:
+            with open(FONT_CACHE_PATH) as f:
+                _font_paths = json.load(f)
+        except (OSError, ValueError):
+            _font_paths = {}
+    return _font_paths
+
+def _save_font_paths():
+    """Write the resolved font path table to the cache file"""
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH) or ".", exist_ok=True)
+        tmp_path = FONT_CACHE_PATH + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(_font_paths, f)
+        os.replace(tmp_path, FONT_CACHE_PATH)
+    except OSError as e:
+        print(f"Could not cache font paths: {e}")
+
+def resolve_font_path(font_name):
+    """Get the file for a font name, falling back to common fonts"""
+    font_paths = _load_font_paths()
+    key = font_name.lower()
+
+    path = font_paths.get(key)
+    if key in font_paths and (path is None or os.path.exists(path)):
+        return path
+
+    # Cache miss (or the font file went away) - scan the system fonts once
+    path = None
+    try:
+        available_fonts = set(pygame.font.get_fonts())
+        for font in [key] + FALLBACK_FONTS:
+            if font in available_fonts:
+                path = pygame.font.match_font(font)
+                if path:
+                    break
+    except Exception as e:
+        print(f"Error looking up system fonts: {e}")
+
+    font_paths[key] = path
+    _save_font_paths()
+    return path
+
+def load_font(font_name, size):
+    """Attempt to load a font with fallbacks"""
+    if (font_name, size) in _fonts:
+        return _fonts[(font_name, size)]
+
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+    try:
+        font = pygame.font.Font(resolve_font_path(font_name), size)
+    except Exception:
+        # Last resort
+        font = pygame.font.Font(None, size)
+
+    _fonts[(font_name, size)] = font
+    return font
+
+class LazyFont:
+    """Font handle that loads the font the first time it is used"""
+
+    def __init__(self, font_name, size):
+        self.font_name = font_name
+        self.font_size = size
+
+    def __getattr__(self, attr):
+        return getattr(load_font(self.font_name, self.font_size), attr)
+
+# Fonts used by the UI
+TITLE_FONT = LazyFont('Arial', 48)
+MAIN_FONT = LazyFont('Arial', 28)
+SMALL_FONT = LazyFont('Arial', 22)
@@ -0,0 +1,141 @@
+"""
+Adaptive frame rate for Equation Quest
+
+Most screens (menus, level select, help, the level complete and failed
+screens, free exploration while nothing is typed) only change on input,
+so redrawing them 60 times a second just burns CPU. The scheduler runs at
+ACTIVE_FPS while the ball is moving or the player is typing, and
+otherwise blocks in pygame.event.wait until input arrives, waking up
+IDLE_FPS times a second at most so the starfield still twinkles.
+
+Usage:
+    python -m src.frame_rate [--seconds N]   (measure the CPU saved)
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import pygame
+from src.settings import ACTIVE_FPS, IDLE_FPS, STATE_PLAYING
+
+def is_animating(game, backspace):
+    """
+    Check if the screen changes without input.
+
+    Args:
+        game: Game instance
+        backspace: Backspace state from controls (held backspace repeats)
+
+    Returns:
+        True while the ball is moving or the player is typing
+    """
+    if game.game_state != STATE_PLAYING:
+        return False
+    if game.input_active or backspace["held"]:
+        return True
+    return not game.is_free_mode and not game.level_completed
+
+class FrameScheduler:
+    """Paces the main loop and measures how much CPU it uses"""
+
+    def __init__(self, active_fps=ACTIVE_FPS, idle_fps=IDLE_FPS):
+        self.active_fps = active_fps  # 0 = uncapped
+        self.idle_timeout = int(1000 / idle_fps) if idle_fps else 0  # 0 = never idle
+        self.clock = pygame.time.Clock()
+
+        self.frames = 0
+        self.idle_frames = 0
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    def wait(self, animating):
+        """
+        Wait until the next frame is due.
+
+        Args:
+            animating: Whether the screen is changing on its own (see is_animating)
+
+        Returns:
+            List of events received while waiting, to handle before pygame.event.get()
+        """
+        self.frames += 1
+        if animating or not self.idle_timeout:
+            self.clock.tick(self.active_fps)
+            return []
+
+        self.idle_frames += 1
+        event = pygame.event.wait(self.idle_timeout)
+        # A burst of input (mouse motion) still can't redraw faster than active_fps
+        self.clock.tick(self.active_fps)
+        return [] if event.type == pygame.NOEVENT else [event]
+
+    def report(self):
+        """
+        Get frame and CPU usage figures since the scheduler was created.
+
+        Returns:
+            Dictionary with frames, idle_frames, seconds, cpu_seconds and cpu_percent
+        """
+        seconds = time.perf_counter() - self._start_wall
+        cpu_seconds = time.process_time() - self._start_cpu
+        return {
+            "frames": self.frames,
+            "idle_frames": self.idle_frames,
+            "seconds": round(seconds, 2),
+            "cpu_seconds": round(cpu_seconds, 2),
+            "cpu_percent": round(100 * cpu_seconds / seconds, 1) if seconds > 0 else 0.0
+        }
+
+# Run the game for a while on one screen and print the scheduler report
+RUN_GAME = """
+import sys
+import pygame
+pygame.init()
+import main
+sys.argv = {argv!r}
+for key in {keys!r}:
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+pygame.time.set_timer(pygame.QUIT, {milliseconds}, loops=1)
+main.main()
+"""
+
+# Screens to measure: name -> keys pressed on the main menu to reach it
+SCREENS = {
+    "menu": [],
+    "level select": [pygame.K_DOWN, pygame.K_DOWN, pygame.K_RETURN],
+    "help": [pygame.K_DOWN, pygame.K_DOWN, pygame.K_DOWN, pygame.K_RETURN],
+    "playing (ball moving)": [pygame.K_RETURN]
+}
+
+def measure(keys, seconds, fixed):
+    """Run the game on a screen in a fresh interpreter and return its scheduler report"""
+    argv = ["main.py", "--no-record", "--no-save", "--fps-report"] + (["--fixed-fps"] if fixed else [])
+    code = RUN_GAME.format(argv=argv, keys=keys, milliseconds=int(seconds * 1000))
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    for line in result.stdout.splitlines():
+        if line.startswith("Frame report: "):
+            return json.loads(line[len("Frame report: "):])
+    raise RuntimeError("No frame report")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the CPU saved by the adaptive frame rate")
+    parser.add_argument("--seconds", type=float, default=5.0, help="time spent on each screen")
+    args = parser.parse_args(argv)
+
+    print(f"CPU use over {args.seconds:g} s per screen (fixed {ACTIVE_FPS} fps vs adaptive):")
+    for name, keys in SCREENS.items():
+        fixed = measure(keys, args.seconds, fixed=True)
+        adaptive = measure(keys, args.seconds, fixed=False)
+        saved = fixed["cpu_seconds"] - adaptive["cpu_seconds"]
+        share = 100 * saved / fixed["cpu_seconds"] if fixed["cpu_seconds"] else 0.0
+        print(f"  {name:<22} {fixed['cpu_percent']:5.1f}% ({fixed['frames']} frames) -> "
+              f"{adaptive['cpu_percent']:5.1f}% ({adaptive['frames']} frames), saved {share:.0f}%")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
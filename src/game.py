@@ -1,22 +1,34 @@
+import bisect
 import numpy as np
 import pygame
 from src.settings import *
-from src.levels import LEVELS, is_free_level
-from src.utils import safe_eval, real_to_screen, screen_to_real
-from src.rootfinding import find_best_fit
+from src.levels import is_free_level
+from src.level_pack import load_levels
+from src.utils import safe_eval, compile_equation, evaluate_equation, real_to_screen, screen_to_real
+from src.rootfinding import (BarycentricInterpolator, PolynomialFitter, FitResult, CubicSpline,
+                             cross_validate_degree, find_roots_in_samples)
+from src.audio import SoundRegistry
+from src.dataset import dataset_bounds, load_point_cloud
+from src.viewport import Viewport, CurveSampler
+from src.overlay import FitOverlay
+from src.simulation import SimState, start_position, advance_ball, reached_end, out_of_bounds, star_hit
 
 class Game:
-    def __init__(self):
-        """Initialize game state and objects"""
+    def __init__(self, levels=None):
+        """Initialize game state and objects (levels is a LevelPack, the built-in levels by default)"""
+        self.levels = levels if levels is not None else load_levels()
+        
+        # Simulation state (game state, level, ball and stars) lives in a
+        # compact struct so it can be snapshotted and restored cheaply
+        self.sim = SimState(STATE_MENU, 0)
+        self.level_start = None  # (level index, snapshot) taken when the level was loaded
+        
         # Game state
-        self.game_state = STATE_MENU
         self.previous_state = STATE_MENU  # Track where we came from (for help screen)
-        self.current_level = 0
         self.unlocked_levels = 1  # Start with only first level unlocked
         
         # Challenge mode settings
         self.one_try_mode = True  # Enable challenging one-try mode
-        self.has_attempted = False  # Track if player has made an attempt
         self.show_answer = False  # Whether to show the solution
         self.show_hint = False   # Whether to show hint
         
@@ -25,33 +37,52 @@ class Game:
         self.menu_items = ["Play", "Explore", "Level Select", "Help", "Quit"]
         self.selected_level = 0
         
-        # Ball settings - now using real coordinates with (0,0) at center
-        self.ball_pos = [-350, 0]  # Start position left side in real coordinates
-        self.ball_speed = BALL_SPEED
-        self.on_path = False
-        self.reset_ball = True
-        
-        # Level completion tracking
-        self.level_completed = False  # Track if level has been completed (success or failure)
-        
-        # Stars tracking
-        self.collected_stars = 0
-        self.stars = []
-        self.total_stars = 0
-        self.level_stats = [{"completed": False, "stars": 0} for _ in LEVELS]
+        # Level progress tracking - level index -> stats, only for levels that have been played
+        self.level_stats = {}
         
         # Equation handling
-        self.current_equation = ""
         self.input_active = False
         self.input_text = ""
         
         # Free exploration mode
-        self.is_free_mode = False
         self.user_points = []
+        self.interpolator = BarycentricInterpolator()  # Kept in sync with user_points
+        self.fitter = self.new_fitter()  # Least-squares sums, kept in sync with user_points
+        self.fit_result = None  # Latest least-squares FitResult
+        self.fit_func = None  # Fitted curve to draw instead of current_equation
+        self.imported = None  # PointCloud of a dataset imported in free mode
         self.fit_method = "least_squares"  # Default fitting method
         self.polynomial_degree = 2  # Default polynomial degree
-        self.rootfinding_methods = ["Least Squares", "Lagrange", "Custom"]
+        self.auto_degree = None  # Degree picked by cross-validation for the Auto method
+        self.rootfinding_methods = ["Least Squares", "Auto", "Lagrange", "Spline", "Custom"]
+        self.fit_methods = ["least_squares", "auto", "lagrange", "spline", "custom"]  # Method keys for the names above
         self.selected_method = 0
+        self.points_version = 0  # Bumped whenever the points (or imported data) change
+        self.custom_equation = ""  # Last valid equation typed in free mode
+        self.custom_code = None  # custom_equation compiled once for the overlay
+        self.show_overlay = False  # Draw every fitting method at once
+        self.overlay = FitOverlay()
+        
+        # Roots of the current curve within the visible window
+        self.show_roots = True
+        self.curve_version = 0  # Bumped whenever the drawn curve changes
+        self.roots_cache_key = None
+        self.roots_cache = None
+        
+        # Zoom and pan - everything on the playing screen is drawn through the view
+        self.view = Viewport()
+        self.curve_sampler = CurveSampler()
+        self.pan_from = None  # Mouse position while the view is being dragged
+        
+        # Replay recorder (set by the main loop when recording)
+        self.recorder = None
+        
+        # Saved progress store (set by the main loop when saving)
+        self.progress = None
+        self.progress_loaded = False
+        
+        # Live preview of the equation being typed (set by the main loop)
+        self.preview = None
         
         # Load sounds
         self.load_sounds()
@@ -60,23 +91,17 @@ class Game:
         self.load_level(0)
     
     def load_sounds(self):
-        """Load game sound effects"""
-        self.ui_sound = pygame.mixer.Sound(UI_SOUND_PATH)
-        self.star_sound = pygame.mixer.Sound(STAR_SOUND_PATH)
-        
-        # Set volume based on settings
-        self.ui_sound.set_volume(SOUND_VOLUME)
-        self.star_sound.set_volume(SOUND_VOLUME)
+        """Start loading game sound effects in the background"""
+        self.sounds = SoundRegistry()
+        self.sounds.load_async({"ui": UI_SOUND_PATH, "star": STAR_SOUND_PATH})
     
     def play_ui_sound(self):
         """Play UI interaction sound"""
-        if SOUND_ENABLED:
-            self.ui_sound.play()
+        self.sounds.play("ui")
     
     def play_star_sound(self):
         """Play star collection sound"""
-        if SOUND_ENABLED:
-            self.star_sound.play()
+        self.sounds.play("star")
             
     def show_help(self):
         """Enter help screen and remember where we came from"""
@@ -91,19 +116,20 @@ class Game:
     
     def load_level(self, level_index):
         """Load a specific level"""
-        if 0 <= level_index < len(LEVELS):
+        if 0 <= level_index < len(self.levels):
+            level = self.levels[level_index]  # Reads the full level from the pack
             self.current_level = level_index
             # For challenge levels, start with a neutral equation so ball behavior is predictable
-            if not is_free_level(LEVELS[level_index]):
+            if not is_free_level(level):
                 self.current_equation = "0"  # Start with flat line for predictable ball behavior
                 self.input_text = ""  # Clear input text so player knows to enter equation
                 self.input_active = True  # Automatically start in input mode for challenge levels
             else:
-                self.current_equation = LEVELS[level_index]["equation"]
+                self.current_equation = level["equation"]
                 self.input_text = self.current_equation
                 self.input_active = False
             
-            self.stars = LEVELS[level_index]["stars"].copy()
+            self.stars = list(level["stars"])
             self.total_stars = len(self.stars)
             self.collected_stars = 0
             self.reset_ball = True
@@ -114,10 +140,31 @@ class Game:
             self.show_hint = False
             
             # Check if this is a free exploration level
-            self.is_free_mode = is_free_level(LEVELS[level_index])
+            self.is_free_mode = is_free_level(level)
+            self.fit_func = None
+            self.curve_version += 1
+            self.view.reset()
+            self.pan_from = None
             if self.is_free_mode:
                 self.user_points = []  # Reset user points when entering free mode
+                self.interpolator = BarycentricInterpolator()
+                self.fitter = self.new_fitter()
+                self.imported = None
+                self.custom_equation = ""
+                self.custom_code = None
+                self.points_version += 1
                 self.selected_method = 0  # Reset to default method
+            
+            # Remember the fresh level so resets don't have to rebuild it
+            self.level_start = (level_index, self.sim.snapshot())
+    
+    def snapshot(self):
+        """Get a cheap copy of the simulation state (for resets, rewinds and what-ifs)"""
+        return self.sim.snapshot()
+    
+    def restore(self, snapshot):
+        """Restore simulation state from snapshot()"""
+        self.sim.restore(snapshot)
     
     def add_point(self, screen_pos):
         """Add a point at the given screen position (for free exploration mode)"""
@@ -125,16 +172,19 @@ class Game:
             return
             
         # Convert screen position to real coordinates
-        real_x, real_y = screen_to_real(screen_pos[0], screen_pos[1])
-        
-        # Add to user points
-        self.user_points.append((real_x, real_y))
+        real_x, real_y = self.view.to_real(screen_pos[0], screen_pos[1])
         
-        # Sort points by x coordinate for better interpolation
-        self.user_points.sort(key=lambda p: p[0])
+        # Add to user points, keeping them sorted by x coordinate
+        index = bisect.bisect_right([p[0] for p in self.user_points], real_x)
+        self.user_points.insert(index, (real_x, real_y))
+        self.fitter.add_point(real_x, real_y)
+        if real_x not in self.interpolator.x:
+            # Interpolation needs distinct x values - keep the first point at each x
+            self.interpolator.add_point(real_x, real_y)
         
         # Update stars to visualize points
         self.stars = self.user_points.copy()
+        self.points_version += 1
         
         # Generate equation if we have enough points
         self.generate_equation_from_points()
@@ -144,8 +194,17 @@ class Game:
         if not self.is_free_mode or not self.user_points:
             return
             
-        self.user_points.pop()
+        removed_x, removed_y = self.user_points.pop()
         self.stars = self.user_points.copy()
+        self.points_version += 1
+        
+        # Update the fitters in place instead of rebuilding them
+        self.fitter.remove_point(removed_x, removed_y)
+        self.interpolator.remove_point(removed_x)
+        for x, y in self.user_points:
+            if x == removed_x:
+                self.interpolator.add_point(x, y)
+                break
         
         # Regenerate equation
         self.generate_equation_from_points()
@@ -156,38 +215,83 @@ class Game:
             return
             
         self.user_points = []
+        self.interpolator = BarycentricInterpolator()
+        self.fitter = self.new_fitter()
+        self.imported = None
+        self.points_version += 1
+        self.fit_func = None
+        self.curve_version += 1
         self.stars = []
         self.current_equation = "0"  # Reset to flat line
         self.reset_ball = True
         
+    def import_points(self, path):
+        """
+        Import a point dataset (.npy or CSV) in free exploration mode.
+        
+        The points replace any existing ones and are fitted with least
+        squares; only their screen-resolution footprint is kept for drawing,
+        and the view zooms to fit them.
+        
+        Returns:
+            True if the dataset was imported
+        """
+        if not self.is_free_mode:
+            return False
+        
+        try:
+            bounds = dataset_bounds(path)
+            fitter = self.new_fitter(bounds[0], bounds[1])  # Centred on the data, wherever it lies
+            imported = load_point_cloud(path, fitter, bounds)
+        except (OSError, ValueError) as e:
+            print(f"Error importing points from {path}: {e}")
+            return False
+        
+        self.clear_points()
+        self.fitter = fitter
+        self.imported = imported
+        self.points_version += 1
+        self.view.fit_to(*bounds)
+        self.generate_equation_from_points()
+        return True
+    
     def generate_equation_from_points(self):
         """Generate an equation that fits the user points"""
-        if len(self.user_points) < 2:
+        self.curve_version += 1
+        if self.fitter.n < 2:
             # Need at least 2 points to generate an equation
             self.current_equation = "0"
+            self.fit_func = None
             return
         
         try:
             # Get selected method
-            method = "least_squares" if self.selected_method == 0 else "lagrange"
+            method = self.fit_methods[self.selected_method]
+            if method == "custom":
+                method = "lagrange"  # Points added while editing a custom equation
+            if self.imported is not None:
+                method = "least_squares"  # Interpolating a whole dataset isn't meaningful
             
-            # Generate the fitting function
-            fit_func = find_best_fit(
-                self.user_points, 
-                method=method,
-                degree=self.polynomial_degree
-            )
+            # Generate the fitting function (the fitters are already up to date)
+            if method == "lagrange":
+                fit_func = self.interpolator
+            elif method == "spline":
+                fit_func = CubicSpline(self.user_points)
+            elif method == "auto":
+                # Cross-validation is cheap enough to redo for every added point
+                self.auto_degree = cross_validate_degree(self.user_points, self.fitter.max_degree)[0]
+                fit_func = self.fit_result = self.fitter.fit(self.auto_degree, self.fitted_points())
+            else:
+                fit_func = self.fit_result = self.fitter.fit(self.polynomial_degree, self.fitted_points())
             
             # Test the function with some values to check it works
-            test_x = self.user_points[0][0]
+            test_x = self.user_points[0][0] if self.user_points else 0.0
             test_y = fit_func(test_x)
             
             # Create a function string representation for the equation
-            if method == "least_squares":
+            if method in ("least_squares", "auto"):
                 # For least squares, we can get the polynomial coefficients and format them
-                x_vals = np.array([p[0] for p in self.user_points])
-                y_vals = np.array([p[1] for p in self.user_points])
-                coeffs = np.polyfit(x_vals, y_vals, self.polynomial_degree)
+                coeffs = fit_func.coefficients
                 
                 # Format the polynomial equation
                 terms = []
@@ -203,10 +307,15 @@ class Game:
                         terms.append(f"{c:.6f}".rstrip('0').rstrip('.') + f"*x^{power}")
                 
                 self.current_equation = " + ".join(terms).replace("+ -", "- ")
+                self.fit_func = fit_func  # Draw the exact fit, not the rounded text
+            elif method == "spline":
+                self.current_equation = f"Cubic spline through {len(self.user_points)} points"
+                self.fit_func = fit_func  # The equation text can't be evaluated
             else:
                 # For Lagrange, just show it's a Lagrange polynomial
                 point_str = ", ".join([f"({x:.1f},{y:.1f})" for x, y in self.user_points])
                 self.current_equation = f"Lagrange polynomial through {point_str}"
+                self.fit_func = fit_func  # The equation text can't be evaluated
             
             # Update the input text in case the user wants to edit
             self.input_text = self.current_equation
@@ -215,6 +324,49 @@ class Game:
         except Exception as e:
             print(f"Error generating equation: {e}")
             self.current_equation = "0"  # Fallback to a flat line
+            self.fit_func = None
+    
+    def overlay_specs(self):
+        """
+        Get the curves the fit overlay should show.
+        
+        Returns:
+            List of (method, inputs key, build) - see FitOverlay.update
+        """
+        specs = []
+        points = self.points_version
+        if self.fitter.n >= 2:
+            degree = self.polynomial_degree
+            specs.append(("least_squares", (points, degree), lambda: self.fitter.fit(degree, self.fitted_points())))
+        if len(self.user_points) >= 2 and self.imported is None:
+            # Interpolating a whole dataset isn't meaningful, so these need user points
+            max_degree = self.fitter.max_degree
+            specs.append(("auto", (points,), lambda: self.fitter.fit(
+                cross_validate_degree(self.user_points, max_degree)[0], self.user_points)))
+            specs.append(("lagrange", (points,), lambda: self.interpolator))  # Kept in sync with the points
+            specs.append(("spline", (points,), lambda: CubicSpline(self.user_points)))
+        if self.custom_code is not None:
+            code = self.custom_code
+            specs.append(("custom", (self.custom_equation,), lambda: lambda x: evaluate_equation(code, x)))
+        return specs
+    
+    def overlay_curves(self):
+        """Get every fitting method's curve and residual stats for the overlay"""
+        return self.overlay.update(self.overlay_specs(), self.view, self.user_points)
+    
+    def toggle_overlay(self):
+        """Toggle drawing every fitting method at once (free exploration mode)"""
+        if self.is_free_mode:
+            self.show_overlay = not self.show_overlay
+            self.play_ui_sound()
+    
+    def fitted_points(self):
+        """Get the points in the least-squares fit, or None for an imported dataset (not kept in memory)"""
+        return self.user_points if self.imported is None else None
+    
+    def new_fitter(self, x_min=X_MIN, x_max=X_MAX):
+        """Create an empty least-squares fitter for free exploration mode, centred on an x-range"""
+        return PolynomialFitter(max_degree=10, center=(x_min + x_max) / 2, scale=max((x_max - x_min) / 2, 1e-9))
     
     def cycle_fitting_method(self):
         """Cycle through available fitting methods"""
@@ -225,7 +377,7 @@ class Game:
         self.play_ui_sound()
         
         # If custom method, enable equation input
-        if self.selected_method == 2:  # Custom
+        if self.fit_methods[self.selected_method] == "custom":
             self.toggle_input()
         else:
             # Regenerate equation with new method
@@ -263,6 +415,11 @@ class Game:
             self.cycle_fitting_method()
             return True
             
+        elif event.key == pygame.K_o and pygame.key.get_mods() & pygame.KMOD_CTRL:
+            # Compare all fitting methods at once
+            self.toggle_overlay()
+            return True
+            
         elif event.key == pygame.K_UP:
             # Increase polynomial degree
             self.change_polynomial_degree(1)
@@ -277,7 +434,16 @@ class Game:
     
     def reset_level(self):
         """Reset the current level to initial state"""
-        self.load_level(self.current_level)
+        start_level, start_snapshot = self.level_start if self.level_start is not None else (None, None)
+        if start_level == self.current_level and not self.is_free_mode:
+            # Restore the snapshot taken by load_level instead of rebuilding the level
+            self.restore(start_snapshot)
+            self.input_text = ""
+            self.input_active = True
+            self.show_answer = False
+            self.show_hint = False
+        else:
+            self.load_level(self.current_level)
         self.level_completed = False  # Reset completion flag
         self.game_state = STATE_PLAYING
         self.play_ui_sound()
@@ -286,28 +452,26 @@ class Game:
         """Advance to the next level if available"""
         self.play_ui_sound()
         
-        if self.current_level + 1 < len(LEVELS):
+        if self.current_level + 1 < len(self.levels):
             # Update level stats first
-            self.level_stats[self.current_level]["completed"] = True
-            self.level_stats[self.current_level]["stars"] = max(
-                self.level_stats[self.current_level]["stars"], 
-                self.collected_stars
-            )
+            stats = self.stats_for(self.current_level)
+            stats["completed"] = True
+            stats["stars"] = max(stats["stars"], self.collected_stars)
             
             # Unlock next level if it's not already unlocked
             if self.current_level + 1 >= self.unlocked_levels:
                 self.unlocked_levels = self.current_level + 2
+            self.save_level_progress(self.current_level)
             
             # Load the next level
             self.load_level(self.current_level + 1)
             self.game_state = STATE_PLAYING
         else:
             # Return to level select if no more levels
-            self.level_stats[self.current_level]["completed"] = True
-            self.level_stats[self.current_level]["stars"] = max(
-                self.level_stats[self.current_level]["stars"], 
-                self.collected_stars
-            )
+            stats = self.stats_for(self.current_level)
+            stats["completed"] = True
+            stats["stars"] = max(stats["stars"], self.collected_stars)
+            self.save_level_progress(self.current_level)
             self.game_state = STATE_LEVEL_SELECT
     
     def move_menu_selection(self, direction):
@@ -317,9 +481,44 @@ class Game:
         if self.game_state == STATE_MENU:
             self.selected_menu_item = (self.selected_menu_item + direction) % len(self.menu_items)
         elif self.game_state == STATE_LEVEL_SELECT:
-            max_level = min(self.unlocked_levels, len(LEVELS))
+            max_level = min(self.unlocked_levels, len(self.levels))
             self.selected_level = (self.selected_level + direction) % max_level
     
+    def page_level_selection(self, direction):
+        """Move the level selection a page up or down"""
+        if self.game_state != STATE_LEVEL_SELECT:
+            return
+        self.play_ui_sound()
+        max_level = min(self.unlocked_levels, len(self.levels))
+        self.selected_level = max(0, min(max_level - 1, self.selected_level + direction * LEVELS_PER_PAGE))
+    
+    def stats_for(self, level_index):
+        """Get the progress stats for a level, creating them on first use"""
+        return self.level_stats.setdefault(level_index, {"completed": False, "stars": 0})
+    
+    def save_level_progress(self, level_index):
+        """Pass a level's stats and the unlocked levels to the progress store (writes happen in the background)"""
+        if self.progress:
+            stats = self.level_stats[level_index]
+            self.progress.record_level(level_index, stats["completed"], stats["stars"])
+            self.progress.record_unlocked(self.unlocked_levels)
+    
+    def apply_saved_progress(self):
+        """Merge saved progress into the game once the store has finished loading it"""
+        if self.progress_loaded or not self.progress or not self.progress.loaded.is_set():
+            return
+        self.progress_loaded = True
+        unlocked_levels, level_stats = self.progress.progress()
+        if self.recorder:
+            # Loading finishes on whatever frame it finishes - record when, so replays start the same way
+            self.recorder.record_progress(unlocked_levels, level_stats)
+        self.unlocked_levels = max(self.unlocked_levels, min(unlocked_levels, len(self.levels)))
+        for level_index, saved in level_stats.items():
+            if level_index < len(self.levels):
+                stats = self.stats_for(level_index)
+                stats["completed"] = stats["completed"] or saved["completed"]
+                stats["stars"] = max(stats["stars"], saved["stars"])
+    
     def select_menu_item(self):
         """Handle selection in menu"""
         self.play_ui_sound()
@@ -356,39 +555,100 @@ class Game:
         """Submit the current input text as the new equation"""
         self.play_ui_sound()
         self.current_equation = self.input_text
+        if self.is_free_mode:
+            try:
+                self.custom_code = compile_equation(self.current_equation)
+                self.custom_equation = self.current_equation  # Shown as "Custom" in the fit overlay
+            except (SyntaxError, ValueError):
+                pass
+        self.fit_func = None
+        self.curve_version += 1
         self.input_active = False
         self.reset_ball = True
+        if self.recorder:
+            self.recorder.record_equation(self.current_equation)
         
         # Mark that player has attempted in one-try mode
         if self.one_try_mode and not self.is_free_mode:
             self.has_attempted = True
     
+    def toggle_roots(self):
+        """Toggle markers where the curve crosses the x-axis"""
+        self.show_roots = not self.show_roots
+        self.play_ui_sound()
+    
+    def zoom_view(self, screen_pos, steps):
+        """Zoom the view in (positive steps) or out around a screen position"""
+        self.view.zoom_at(screen_pos, steps)
+    
+    def start_pan(self, screen_pos):
+        """Start dragging the view"""
+        self.pan_from = screen_pos
+    
+    def pan_view(self, screen_pos):
+        """Drag the view to follow the mouse"""
+        if self.pan_from is not None:
+            self.view.pan(screen_pos[0] - self.pan_from[0], screen_pos[1] - self.pan_from[1])
+            self.pan_from = screen_pos
+    
+    def end_pan(self):
+        """Stop dragging the view"""
+        self.pan_from = None
+    
+    def reset_view(self):
+        """Go back to the standard 1:1 view"""
+        self.view.reset()
+        self.play_ui_sound()
+    
+    def sample_path(self):
+        """Sample the current curve across the visible part of the plane (cached per view tile)"""
+        return self.curve_sampler.sample(self.path, self.view, (self.current_equation, self.curve_version))
+    
+    def visible_roots(self, x_vals, y_vals):
+        """Get the x-axis crossings of the current curve on the sampled grid (cached per curve and view)"""
+        key = (self.current_equation, self.curve_version, self.view.version)
+        if key != self.roots_cache_key:
+            try:
+                if isinstance(self.fit_func, FitResult):
+                    # Least-squares fits are polynomials - solve for their roots exactly
+                    roots = self.fit_func.roots()
+                    self.roots_cache = roots[(roots >= x_vals[0]) & (roots <= x_vals[-1])]
+                else:
+                    self.roots_cache = find_roots_in_samples(self.path, x_vals, y_vals, tol=1e-4)
+            except Exception as e:
+                print(f"Error finding roots: {e}")
+                self.roots_cache = np.zeros(0)
+            self.roots_cache_key = key
+        return self.roots_cache
+    
     def toggle_hint(self):
         """Toggle hint display"""
-        if not self.is_free_mode and self.current_level < len(LEVELS):
+        if not self.is_free_mode and self.current_level < len(self.levels):
             self.show_hint = not self.show_hint
             self.play_ui_sound()
     
     def toggle_answer(self):
         """Toggle answer display"""
-        if not self.is_free_mode and self.current_level < len(LEVELS):
+        if not self.is_free_mode and self.current_level < len(self.levels):
             self.show_answer = not self.show_answer
             self.play_ui_sound()
     
     def get_current_hint(self):
         """Get hint for current level"""
-        if self.current_level < len(LEVELS) and "hint" in LEVELS[self.current_level]:
-            return LEVELS[self.current_level]["hint"]
+        if self.current_level < len(self.levels) and "hint" in self.levels[self.current_level]:
+            return self.levels[self.current_level]["hint"]
         return "No hint available"
     
     def get_current_solution(self):
         """Get solution for current level"""
-        if self.current_level < len(LEVELS) and "solution" in LEVELS[self.current_level]:
-            return LEVELS[self.current_level]["solution"]
+        if self.current_level < len(self.levels) and "solution" in self.levels[self.current_level]:
+            return self.levels[self.current_level]["solution"]
         return "No solution available"
     
     def path(self, x):
-        """Calculate the y-coordinate for a given x based on the current equation"""
+        """Calculate the y-coordinate for a given x (or array of x) based on the current equation"""
+        if self.fit_func is not None:
+            return self.fit_func(x)
         try:
             return safe_eval(self.current_equation, x)
         except Exception as e:
@@ -398,6 +658,9 @@ class Game:
     
     def update(self):
         """Update game state - call once per frame"""
+        self.apply_saved_progress()
+        self.update_preview()
+        
         if self.game_state != STATE_PLAYING:
             return
         
@@ -407,34 +670,21 @@ class Game:
             
         # Reset ball position if needed
         if self.reset_ball:
-            try:
-                # Start at left side of screen with x = X_MIN + 50
-                start_x = X_MIN + 50  # Real x-coordinate for ball start position
-                start_y = self.path(start_x)
-                self.ball_pos = [start_x, start_y]
-                self.ball_speed = BALL_SPEED
-                self.on_path = True
-                self.reset_ball = False
-                self.level_completed = False  # Reset completion flag when ball starts
-            except Exception as e:
-                self.ball_pos = [X_MIN + 50, 0]  # Default to center height
-                self.on_path = True
-                self.reset_ball = False
-                self.level_completed = False
+            # Start at left side of screen with x = X_MIN + 50
+            self.ball_pos = start_position(self.path)
+            self.ball_speed = BALL_SPEED
+            self.on_path = True
+            self.reset_ball = False
+            self.level_completed = False  # Reset completion flag when ball starts
 
         # Update ball position in real coordinates
         if self.on_path and not self.level_completed:
-            self.ball_pos[0] += self.ball_speed
-            try:
-                target_y = self.path(self.ball_pos[0])
-                # Apply some "gravity" effect to make the ball follow the path smoothly
-                self.ball_pos[1] += (target_y - self.ball_pos[1]) * 0.1
-            except:
-                # If there's an error evaluating the path, let the ball fall
-                self.ball_pos[1] -= GRAVITY  # In real coordinates, gravity decreases y
+            advance_ball(self.ball_pos, self.path, self.ball_speed)
+            if self.recorder:
+                self.recorder.record_ball(self.ball_pos)
                 
             # Check if ball has reached the right side of screen
-            if self.ball_pos[0] >= X_MAX - 50:  # Near right edge
+            if reached_end(self.ball_pos):  # Near right edge
                 if not self.level_completed:
                     self.level_completed = True
                     # Determine if level was completed successfully or failed
@@ -444,16 +694,25 @@ class Game:
                         self.game_state = "level_failed"
                 
             # Check if the ball is out of bounds vertically or left side
-            elif self.ball_pos[0] < X_MIN or self.ball_pos[1] > Y_MAX or self.ball_pos[1] < Y_MIN:
+            elif out_of_bounds(self.ball_pos):
                 self.reset_ball = True
 
         # Check if the ball collides with any star (all in real coordinates)
         for star in self.stars[:]:
-            if np.sqrt((self.ball_pos[0] - star[0])**2 + (self.ball_pos[1] - star[1])**2) < BALL_RADIUS + 8:
+            if star_hit(self.ball_pos, star):
                 self.stars.remove(star)  # Remove star if collected
                 self.collected_stars += 1
                 self.play_star_sound()  # Play star collection sound
                 
+    def update_preview(self):
+        """Pass the equation being typed to the live preview (sampled in the background)"""
+        if not self.preview:
+            return
+        if self.game_state == STATE_PLAYING and self.input_active:
+            self.preview.request(self.input_text, self.view.x_range())
+        else:
+            self.preview.clear()
+    
     def handle_backspace(self):
         """Handle backspace key in equation input"""
         if self.input_active:
@@ -472,11 +731,13 @@ class Game:
             
         # If all stars have been collected, show level complete screen
         if self.collected_stars == self.total_stars and self.total_stars > 0:
-            self.level_stats[self.current_level]["completed"] = True
-            self.level_stats[self.current_level]["stars"] = self.total_stars
+            stats = self.stats_for(self.current_level)
+            stats["completed"] = True
+            stats["stars"] = self.total_stars
+            self.save_level_progress(self.current_level)  # Repeats every frame, the store drops them
             
             # Show level complete screen
-            next_level_available = self.current_level < len(LEVELS) - 1
+            next_level_available = self.current_level < len(self.levels) - 1
             from src.ui import draw_level_complete
             draw_level_complete(screen, self.total_stars, next_level_available)
             return True  # Indicate we're showing a level complete screen
@@ -488,3 +749,11 @@ class Game:
             return True  # Indicate we're showing a level failed screen
             
         return False  # No special screens to show
+
+def _sim_property(name):
+    """Expose a SimState field as a Game attribute"""
+    return property(lambda self: getattr(self.sim, name),
+                    lambda self, value: setattr(self.sim, name, value))
+
+for _name in SimState.__slots__:
+    setattr(Game, _name, _sim_property(_name))
@@ -0,0 +1,534 @@
+"""
+Local equation grading service for Equation Quest
+
+A small HTTP service for LMS integrations, so grading an answer doesn't
+mean starting the game. POST /grade with {"level": N, "equation": "..."}
+(N is the level number shown in the game, from 1) and get back the stars
+collected, whether the level was passed and any parse error. A JSON list
+of up to MAX_BATCH_REQUESTS such requests grades them all in one call.
+Requests must be application/json and can't come from a web page on
+another origin, and equations are checked to be plain arithmetic before
+they are run.
+
+The asyncio front end only parses HTTP. Requests go into a bounded queue;
+a dispatcher takes them off in batches (up to BATCH_SIZE, waiting at most
+BATCH_WAIT for a batch to fill) and hands each batch to a pool of worker
+processes that loaded every level's stars when they started. At most
+BATCHES_PER_WORKER batches are in flight per worker, so when the workers
+fall behind the queue fills up and new requests are turned away with
+503 and Retry-After instead of piling up. A list longer than the room
+left in the queue is queued in parts as the dispatcher takes earlier
+requests off. GET /metrics reports queue depth, batch sizes and latency
+percentiles.
+
+Everything runs locally and offline.
+
+Usage:
+    python -m src.grading_service serve [--port N] [--workers N] [--pack FILE]
+    python -m src.grading_service loadtest [--port N] [--requests N] [--concurrency N]
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.settings import HEIGHT
+from src.level_pack import load_levels
+from src.utils import check_equation, compile_equation, evaluate_equation
+from src.simulation import COLLECT_RADIUS, run_trajectory, star_clearance
+
+HOST = "127.0.0.1"     # Only reachable from this machine
+PORT = 8765
+
+QUEUE_SIZE = 1024      # Requests waiting for a worker before new ones get 503
+BATCH_SIZE = 32        # Most requests sent to a worker at once
+BATCH_WAIT = 0.002     # Seconds the dispatcher waits for a batch to fill
+BATCHES_PER_WORKER = 2 # Batches in flight per worker (one running, one ready)
+
+MAX_BODY = 1 << 20     # Largest request body in bytes
+MAX_BATCH_REQUESTS = 4096 # Most grading requests in one list body
+MAX_EQUATION_LENGTH = 500
+METRICS_WINDOW = 10000 # Latest requests the latency percentiles are taken over
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 415: "Unsupported Media Type", 500: "Internal Server Error",
+               503: "Service Unavailable"}
+
+def grade_equation(stars, equation):
+    """
+    Grade an equation against a level's stars the way the game plays it.
+
+    Args:
+        stars: (S, 2) array of star positions
+        equation: Equation text as typed in the game
+
+    Returns:
+        Dictionary with stars (collected), total, passed and error (None,
+        or why the equation couldn't be used)
+    """
+    result = {"stars": 0, "total": len(stars), "passed": False, "error": None}
+    if len(equation) > MAX_EQUATION_LENGTH:
+        result["error"] = f"equation longer than {MAX_EQUATION_LENGTH} characters"
+        return result
+    try:
+        check_equation(equation)  # The equation is untrusted input
+        code = compile_equation(equation)
+    except SyntaxError as e:
+        result["error"] = f"parse error: {e.msg}"
+        return result
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+
+    def path(x):
+        # Same fallback as safe_eval, which the game draws the path with
+        try:
+            return evaluate_equation(code, x)
+        except Exception:
+            return HEIGHT // 2
+
+    with np.errstate(all="ignore"):
+        positions, finished = run_trajectory(path)
+        clearance = star_clearance(stars, positions)
+    result["stars"] = int((clearance < COLLECT_RADIUS).sum())
+    result["passed"] = finished and result["stars"] == result["total"] and result["total"] > 0
+    return result
+
+# Stars of every challenge level, loaded once per worker process
+_worker_levels = {}
+
+def _init_worker(pack_path):
+    """Preload the levels in a worker process"""
+    pack = load_levels(pack_path)
+    for level_index in range(len(pack)):
+        if not pack.is_free(level_index):
+            _worker_levels[level_index] = np.asarray(pack[level_index]["stars"], dtype=float).reshape(-1, 2)
+
+@lru_cache(maxsize=4096)
+def _grade_cached(level_index, equation):
+    """Grade in a worker (many students send the same answer)"""
+    return grade_equation(_worker_levels[level_index], equation)
+
+def _grade_batch(batch):
+    """Grade a list of (level index, equation) in a worker, timing each"""
+    results = []
+    for level_index, equation in batch:
+        start = time.perf_counter()
+        result = dict(_grade_cached(level_index, equation))
+        results.append((result, time.perf_counter() - start))
+    return results
+
+class ServiceMetrics:
+    """Counters and latency samples for GET /metrics"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.started = time.perf_counter()
+        self.graded = 0
+        self.rejected = 0   # Turned away with 503 because the queue was full
+        self.bad_requests = 0
+        self.failed = 0     # Lost to a worker error
+        self.batches = 0
+        self.batch_sizes = deque(maxlen=window)
+        self.latency = deque(maxlen=window)     # Queued to answered
+        self.queue_wait = deque(maxlen=window)  # Queued to sent to a worker
+        self.grade_time = deque(maxlen=window)  # Time spent grading in the worker
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batch_sizes.append(size)
+
+    def record_request(self, latency, queue_wait, grade_time):
+        self.graded += 1
+        self.latency.append(latency)
+        self.queue_wait.append(queue_wait)
+        self.grade_time.append(grade_time)
+
+    @staticmethod
+    def _percentiles(samples):
+        """Latency summary in milliseconds"""
+        if not samples:
+            return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+        values = np.fromiter(samples, dtype=float) * 1000
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        return {"p50": round(float(p50), 3), "p90": round(float(p90), 3), "p99": round(float(p99), 3),
+                "max": round(float(values.max()), 3), "mean": round(float(values.mean()), 3)}
+
+    def report(self, queue_depth, in_flight):
+        """
+        Get the service figures.
+
+        Returns:
+            Dictionary with request counts, throughput, queue state, batch
+            sizes and latency percentiles in milliseconds
+        """
+        seconds = time.perf_counter() - self.started
+        return {
+            "uptime": round(seconds, 1),
+            "graded": self.graded,
+            "rejected": self.rejected,
+            "bad_requests": self.bad_requests,
+            "failed": self.failed,
+            "per_second": round(self.graded / seconds, 1) if seconds > 0 else 0.0,
+            "queue_depth": queue_depth,
+            "batches_in_flight": in_flight,
+            "batches": self.batches,
+            "mean_batch_size": round(float(np.mean(self.batch_sizes)), 2) if self.batch_sizes else 0.0,
+            "latency_ms": self._percentiles(self.latency),
+            "queue_wait_ms": self._percentiles(self.queue_wait),
+            "grade_ms": self._percentiles(self.grade_time)
+        }
+
+class RequestError(Exception):
+    """A request the service can't grade, answered with an HTTP error status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class GradingService:
+    """Asyncio HTTP front end feeding a worker process pool"""
+
+    def __init__(self, pack_path=None, workers=None, queue_size=QUEUE_SIZE,
+                 batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT, max_requests=MAX_BATCH_REQUESTS):
+        self.pack_path = pack_path
+        self.pack = load_levels(pack_path)  # Only the index is needed here
+        self.workers = workers or min(os.cpu_count() or 1, 8)
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_requests = max_requests
+        self.metrics = ServiceMetrics()
+        self.pool = None
+        self.queue = None
+        self.in_flight = 0
+        self._slots = None
+        self._dispatcher = None
+        self._hosts = set()  # Host header values that name this service, set by start()
+
+    async def start(self, host=HOST, port=PORT):
+        """Start the worker pool and the HTTP server; returns the asyncio server"""
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(self.pack_path,))
+        # Make every worker load its levels now rather than on the first requests
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _grade_batch, [])
+                               for _ in range(self.workers)))
+
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._slots = asyncio.Semaphore(self.workers * BATCHES_PER_WORKER)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        port = server.sockets[0].getsockname()[1]
+        self._hosts = {f"{name}:{port}" for name in (host, "127.0.0.1", "localhost")}
+        return server
+
+    def close(self):
+        """Stop dispatching and shut the worker pool down"""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def submit(self, level_index, equation):
+        """
+        Queue a request for grading, waiting for room in the queue if it is full.
+
+        Returns:
+            Future resolving to (result, grade time)
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((level_index, equation, time.perf_counter(), future))
+        return future
+
+    async def _dispatch(self):
+        """Take requests off the queue in batches and send them to the workers"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()  # Wait for a free worker slot before taking requests
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                if self.queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+
+            sent = time.perf_counter()
+            self.in_flight += 1
+            self.metrics.record_batch(len(batch))
+            work = loop.run_in_executor(self.pool, _grade_batch, [(level, equation) for level, equation, _, _ in batch])
+            work.add_done_callback(lambda work, batch=batch, sent=sent: self._finish_batch(work, batch, sent))
+
+    def _finish_batch(self, work, batch, sent):
+        """Hand a batch's results back to the waiting requests"""
+        self.in_flight -= 1
+        self._slots.release()
+        try:
+            results = work.result()
+        except Exception as e:
+            print(f"Error grading a batch: {e}")
+            self.metrics.failed += len(batch)
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(RequestError(500, "grading failed"))
+            return
+
+        done = time.perf_counter()
+        for (_, _, queued, future), (result, grade_time) in zip(batch, results):
+            self.metrics.record_request(done - queued, sent - queued, grade_time)
+            if not future.done():
+                future.set_result(result)
+
+    def _parse_item(self, item):
+        """Check one grading request and get its (level index, equation)"""
+        if not isinstance(item, dict):
+            raise RequestError(400, "expected an object with level and equation")
+        level, equation = item.get("level"), item.get("equation")
+        if not isinstance(level, int) or isinstance(level, bool) or not 1 <= level <= len(self.pack):
+            raise RequestError(400, f"level must be a level number from 1 to {len(self.pack)}")
+        if self.pack.is_free(level - 1):
+            raise RequestError(400, f"level {level} is a free exploration level")
+        if not isinstance(equation, str):
+            raise RequestError(400, "equation must be a string")
+        return level - 1, equation
+
+    async def grade(self, body):
+        """
+        Grade a POST /grade body.
+
+        Args:
+            body: Parsed JSON, one request object or a list of them
+
+        Returns:
+            Result object, or a list of them for a list body
+        """
+        items = body if isinstance(body, list) else [body]
+        if len(items) > self.max_requests:
+            raise RequestError(413, f"more than {self.max_requests} requests in one body")
+        requests = [self._parse_item(item) for item in items]
+        if requests and self.queue.full():
+            self.metrics.rejected += len(requests)
+            raise RequestError(503, "grading queue is full")
+        # Whatever doesn't fit now is queued as the dispatcher makes room
+        futures = [await self.submit(level_index, equation) for level_index, equation in requests]
+        results = await asyncio.gather(*futures)
+        for (level_index, equation), result in zip(requests, results):
+            result["level"] = level_index + 1
+            result["equation"] = equation
+        return results if isinstance(body, list) else results[0]
+
+    def _check_origin(self, headers):
+        """
+        Turn away requests a web page could have made.
+
+        Browsers let any page send a simple POST to localhost, so requests
+        from another origin (an Origin header) or through a hostname that
+        only resolves here (DNS rebinding) are refused.
+        """
+        origin = headers.get("origin")
+        if origin is not None and origin.removeprefix("http://") not in self._hosts:
+            raise RequestError(403, "cross-origin requests are not allowed")
+        if headers.get("host", "") not in self._hosts:
+            raise RequestError(403, "unknown Host")
+
+    async def _route(self, method, path, headers, body):
+        """Handle one HTTP request and get its (status, response object)"""
+        self._check_origin(headers)
+        if path == "/grade":
+            if method != "POST":
+                raise RequestError(405, "use POST")
+            if headers.get("content-type", "").split(";")[0].strip().lower() != "application/json":
+                raise RequestError(415, "Content-Type must be application/json")
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise RequestError(400, "body is not valid JSON")
+            return 200, await self.grade(data)
+        if path == "/metrics":
+            return 200, self.metrics.report(self.queue.qsize(), self.in_flight)
+        if path == "/health":
+            return 200, {"status": "ok", "workers": self.workers, "levels": len(self.pack)}
+        raise RequestError(404, f"no such endpoint: {path}")
+
+    async def _handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (kept alive unless asked not to)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length", 0))
+                extra_headers = ""
+                try:
+                    if length > MAX_BODY:
+                        keep_alive = False  # The body is never read
+                        raise RequestError(413, f"body larger than {MAX_BODY} bytes")
+                    body = await reader.readexactly(length)
+                    status, payload = await self._route(method, path.split("?")[0], headers, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    if status == 400:
+                        self.metrics.bad_requests += 1
+                    elif status == 503:
+                        extra_headers = "Retry-After: 1\r\n"
+
+                data = json.dumps(payload).encode("utf-8")
+                writer.write((f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                              f"Content-Type: application/json\r\n"
+                              f"Content-Length: {len(data)}\r\n"
+                              f"{extra_headers}"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # Client went away or sent something that isn't HTTP
+        finally:
+            writer.close()
+
+async def serve(args):
+    """Run the service until interrupted"""
+    service = GradingService(args.pack, args.workers, args.queue_size, args.batch_size, args.batch_wait / 1000,
+                             args.max_requests)
+    try:
+        server = await service.start(args.host, args.port)
+        print(f"Grading {len(service.pack)} levels on http://{args.host}:{args.port} ({service.workers} worker processes)")
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+async def _post(reader, writer, host, path, payload):
+    """Send one keep-alive request to host ("address:port") and get (status, response object)"""
+    data = json.dumps(payload).encode("utf-8")
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(data)}\r\n\r\n").encode("latin-1") + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def _get(host, port, path):
+    """Fetch a JSON endpoint on a fresh connection"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+def load_test_requests(pack, count, seed=0):
+    """
+    Build a mix of grading requests: solutions, wrong answers and parse errors.
+
+    Returns:
+        List of request objects
+    """
+    rng = random.Random(seed)
+    levels = [i for i in range(len(pack)) if not pack.is_free(i)]
+    requests = []
+    for _ in range(count):
+        level_index = rng.choice(levels)
+        solution = pack[level_index].get("solution") or "0"
+        kind = rng.random()
+        if kind < 0.5:
+            equation = solution
+        elif kind < 0.9:
+            equation = f"{solution} + {rng.uniform(-60, 60):.2f}"  # Usually misses some stars
+        else:
+            equation = f"{solution} + ("  # Parse error
+        requests.append({"level": level_index + 1, "equation": equation})
+    return requests
+
+async def load_test(args):
+    """Send requests from several connections at once and print client and server figures"""
+    pack = load_levels(args.pack)
+    requests = load_test_requests(pack, args.requests, args.seed)
+    statuses = {}
+    latencies = []
+    outcomes = {"passed": 0, "failed": 0, "parse_error": 0}
+
+    async def client(share):
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+        try:
+            for request in share:
+                start = time.perf_counter()
+                status, response = await _post(reader, writer, f"{args.host}:{args.port}", "/grade", request)
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    outcome = "parse_error" if response["error"] else "passed" if response["passed"] else "failed"
+                    outcomes[outcome] += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(requests[i::args.concurrency]) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    summary = ServiceMetrics._percentiles(latencies)
+    print(f"Sent {len(requests)} requests over {args.concurrency} connections in {elapsed:.2f} s "
+          f"({len(requests) / elapsed:.0f} per second)")
+    print(f"  status codes: {dict(sorted(statuses.items()))}")
+    print(f"  results: {outcomes}")
+    print(f"  client latency ms: p50 {summary['p50']}  p90 {summary['p90']}  p99 {summary['p99']}  max {summary['max']}")
+    print(f"Server metrics: {json.dumps(await _get(args.host, args.port, '/metrics'), indent=2)}")
+    return 0 if statuses.get(200, 0) == len(requests) else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local equation grading service")
+    parser.add_argument("--host", default=HOST, help="address to serve on or connect to")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--pack", help="level pack to grade against instead of the built-in levels")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the grading service")
+    serve_parser.add_argument("--workers", type=int, help="worker processes (default: CPU count, at most 8)")
+    serve_parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="requests queued before 503")
+    serve_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="most requests per worker batch")
+    serve_parser.add_argument("--batch-wait", type=float, default=BATCH_WAIT * 1000,
+                              help="milliseconds to wait for a batch to fill")
+    serve_parser.add_argument("--max-requests", type=int, default=MAX_BATCH_REQUESTS,
+                              help="most grading requests in one list body (larger ones get 413)")
+
+    load_parser = commands.add_parser("loadtest", help="send a burst of requests to a running service")
+    load_parser.add_argument("--requests", type=int, default=2000)
+    load_parser.add_argument("--concurrency", type=int, default=32, help="connections sending at once")
+    load_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        return asyncio.run(serve(args) if args.command == "serve" else load_test(args))
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
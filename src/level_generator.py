@@ -0,0 +1,359 @@
+"""
+Procedural level generator for Equation Quest
+
+Samples solution equations from the families the built-in levels use
+(linear, quadratic, sine, exponential and mixed), places stars on the
+curve inside the visible window, rejects levels that a simpler family
+already solves, and keeps only levels the ball simulation can complete.
+Batches are generated across a process pool and written as level packs.
+
+Usage:
+    python -m src.level_generator --count 1000 --output generated.eqpack
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.settings import Y_MIN, Y_MAX
+from src.utils import safe_eval
+from src.simulation import COLLECT_RADIUS, BALL_START_X, BALL_END_X
+from src.level_verifier import verify_level
+from src.level_pack import write_level_pack
+
+FAMILIES = ["linear", "quadratic", "sine", "exponential", "mixed"]
+
+# Free parameters of each family - a family is simpler than another if it has fewer
+FAMILY_PARAMETERS = {"linear": 2, "quadratic": 3, "sine": 3, "exponential": 3, "mixed": 4}
+
+FAMILY_NAMES = {
+    "linear": "Linear Challenge",
+    "quadratic": "Parabolic Path",
+    "sine": "Sine Wave",
+    "exponential": "Exponential Curve",
+    "mixed": "Mixed Challenge"
+}
+
+FAMILY_HINTS = {
+    "linear": "Try a simple linear equation: y = mx + b",
+    "quadratic": "A parabola: y = ax² + bx + c",
+    "sine": "A trigonometric function: y = A*sin(B*x) + C",
+    "exponential": "An exponential function: y = A*exp(B*x) + C",
+    "mixed": "Combine polynomial and trigonometric: y = ax² + B*sin(C*x) + D"
+}
+
+# Curves must stay this far inside the window over the whole run
+CURVE_MARGIN = 40
+
+# Stars go between these x values, at least STAR_SPACING apart
+STAR_X_RANGE = (-480, 480)
+STAR_SPACING = 80
+STAR_COUNTS = (4, 6)
+
+# The ball trails the path by roughly 50 times its slope (see PATH_FOLLOW),
+# so stars only go where the curve is flat enough for the ball to catch up
+MAX_STAR_SLOPE = 0.4
+
+# Best fits of simpler families that pass this close to every star are run
+# through the simulation - if one collects every star the level is rejected
+SIMPLER_TOLERANCE = 2 * COLLECT_RADIUS
+
+# Smallest distance every star must be able to move and still be collected
+MIN_TOLERANCE = 3.0
+
+# Frequencies and rates tried when fitting the nonlinear families
+SINE_RATES = np.linspace(0.003, 0.04, 75)
+EXP_RATES = np.concatenate((-np.linspace(0.0005, 0.006, 45), np.linspace(0.0005, 0.006, 45)))
+
+def _coefficient(value, digits=3):
+    """Format a coefficient with the given number of significant digits"""
+    text = f"{value:.{digits}g}"
+    return text if "e" not in text else f"{value:.{digits + 6}f}".rstrip("0").rstrip(".")
+
+def _join_terms(terms, digits=3):
+    """Join (coefficient, term) pairs into an equation string"""
+    parts = []
+    for value, term in terms:
+        text = _coefficient(value, digits)
+        if float(text) == 0:
+            continue
+        parts.append(text + (f"*{term}" if term else ""))
+    return " + ".join(parts).replace("+ -", "- ") if parts else "0"
+
+def _shape_terms(family, rng):
+    """Sample the non-constant terms of a family as (coefficient, term) pairs"""
+    sign = rng.choice([-1, 1])
+    if family == "linear":
+        return [(sign * rng.uniform(0.05, 0.4), "x")]
+    if family == "quadratic":
+        a = sign * rng.uniform(0.0003, 0.0012)
+        return [(a, "x^2"), (-2 * a * rng.uniform(-200, 200), "x")]
+    if family == "sine":
+        rate = rng.uniform(0.005, 0.03)
+        return [(sign * rng.uniform(40, 150), f"sin({_coefficient(rate)}*x)")]
+    if family == "exponential":
+        rate = sign * rng.uniform(0.0015, 0.004)
+        # As steep as the ball can follow at the outermost stars
+        amplitude = rng.uniform(0.3, 0.5) / (abs(rate) * np.exp(abs(rate) * STAR_X_RANGE[1]))
+        return [(rng.choice([-1, 1]) * amplitude, f"exp({_coefficient(rate)}*x)")]
+    if family == "mixed":
+        rate = rng.uniform(0.01, 0.03)
+        return [(sign * rng.uniform(0.0003, 0.001), "x^2"),
+                (rng.uniform(30, 80), f"sin({_coefficient(rate)}*x)")]
+    raise ValueError(f"Unknown family: {family}")
+
+def sample_equation(family, rng):
+    """
+    Sample a solution equation from a family.
+
+    The constant term is chosen so the curve fits in the window.
+
+    Args:
+        family: One of FAMILIES
+        rng: NumPy random Generator
+
+    Returns:
+        Equation string in the syntax players type, or None if the sampled
+        curve is too tall for the window
+    """
+    terms = _shape_terms(family, rng)
+    x = np.linspace(BALL_START_X, BALL_END_X, 200)
+    with np.errstate(all="ignore"):
+        y = np.asarray(safe_eval(_join_terms(terms), x), dtype=float) * np.ones_like(x)
+    low = Y_MIN + CURVE_MARGIN - y.min()
+    high = Y_MAX - CURVE_MARGIN - y.max()
+    if not np.isfinite(y).all() or low > high:
+        return None
+    return _join_terms(terms + [(rng.uniform(low, high), "")])
+
+def _fits_in_window(equation):
+    """Check that a curve stays inside the window over the whole ball run"""
+    if equation is None:
+        return False
+    x = np.linspace(BALL_START_X, BALL_END_X, 200)
+    with np.errstate(all="ignore"):
+        y = np.asarray(safe_eval(equation, x), dtype=float)
+    return (y.shape == x.shape and np.isfinite(y).all() and
+            y.min() > Y_MIN + CURVE_MARGIN and y.max() < Y_MAX - CURVE_MARGIN)
+
+def place_stars(equation, rng):
+    """
+    Place stars on the curve at random, well separated x positions where
+    the curve is flat enough for the ball to follow.
+
+    Returns:
+        List of (x, y) stars, fewer than STAR_COUNTS[0] if there is no room
+    """
+    count = rng.integers(STAR_COUNTS[0], STAR_COUNTS[1] + 1)
+    x = np.arange(STAR_X_RANGE[0], STAR_X_RANGE[1] + 1, 5, dtype=float)
+    y = np.asarray(safe_eval(equation, x), dtype=float)
+    slope = np.abs(np.gradient(y, x))
+    candidates = rng.permutation(x[slope <= MAX_STAR_SLOPE])
+
+    chosen = []
+    for star_x in candidates:
+        if all(abs(star_x - other) >= STAR_SPACING for other in chosen):
+            chosen.append(star_x)
+            if len(chosen) == count:
+                break
+    chosen = np.sort(np.array(chosen))
+    star_y = np.round(np.asarray(safe_eval(equation, chosen), dtype=float) * np.ones_like(chosen))
+    return [(int(sx), int(sy)) for sx, sy in zip(chosen, star_y)]
+
+def _family_basis(family, x, rate=None):
+    """Basis functions of a family for linear least squares (rate fixed) and their terms"""
+    one = np.ones_like(x)
+    if family == "linear":
+        return np.column_stack((x, one)), ["x", ""]
+    if family == "quadratic":
+        return np.column_stack((x * x, x, one)), ["x^2", "x", ""]
+    if family == "sine":
+        return np.column_stack((np.sin(rate * x), one)), [f"sin({rate!r}*x)", ""]
+    if family == "exponential":
+        return np.column_stack((np.exp(rate * x), one)), [f"exp({rate!r}*x)", ""]
+    return np.column_stack((x * x, np.sin(rate * x), one)), ["x^2", f"sin({rate!r}*x)", ""]
+
+def family_fit(family, stars):
+    """
+    Fit the curve of a family that passes closest to the stars.
+
+    Nonlinear rates are searched over a grid, the remaining coefficients
+    are fitted by least squares.
+
+    Returns:
+        Tuple containing (largest vertical distance from a star to the
+        curve, equation of the curve)
+    """
+    points = np.asarray(stars, dtype=float)
+    x, y = points[:, 0], points[:, 1]
+    if family in ("linear", "quadratic"):
+        rates = [None]
+    elif family == "exponential":
+        rates = EXP_RATES
+    else:
+        rates = SINE_RATES
+
+    best, best_terms = np.inf, None
+    with np.errstate(all="ignore"):
+        for rate in rates:
+            basis, terms = _family_basis(family, x, rate)
+            coeffs = np.linalg.lstsq(basis, y, rcond=None)[0]
+            residual = np.abs(basis @ coeffs - y).max()
+            if residual < best:
+                best, best_terms = residual, list(zip(coeffs, terms))
+    return best, _join_terms(best_terms, digits=8) if best_terms else "0"
+
+def _solved_by(level, family):
+    """Check if the best fitting curve of a (simpler) family solves a level"""
+    residual, equation = family_fit(family, level["stars"])
+    return residual < SIMPLER_TOLERANCE and verify_level(level, equation)["solvable"]
+
+def generate_level(family, rng, max_attempts=50):
+    """
+    Generate one verified level of a family.
+
+    Returns:
+        Tuple containing (level dictionary or None, dictionary of rejection counts)
+    """
+    rejected = {"window": 0, "simpler": 0, "unsolvable": 0}
+    simpler = [other for other in FAMILIES if FAMILY_PARAMETERS[other] < FAMILY_PARAMETERS[family]]
+    for _ in range(max_attempts):
+        equation = sample_equation(family, rng)
+        stars = place_stars(equation, rng) if _fits_in_window(equation) else []
+        if len(stars) < STAR_COUNTS[0]:
+            rejected["window"] += 1
+            continue
+
+        level = {
+            "name": FAMILY_NAMES[family],
+            "equation": "0",
+            "stars": stars,
+            "solution": equation,
+            "hint": FAMILY_HINTS[family],
+            "family": family
+        }
+        report = verify_level(level)
+        if not report["solvable"] or report["tolerance"] < MIN_TOLERANCE:
+            rejected["unsolvable"] += 1
+            continue
+
+        if any(_solved_by(level, other) for other in simpler):
+            rejected["simpler"] += 1
+            continue
+        return level, rejected
+    return None, rejected
+
+def generate_batch(seed, count, families=FAMILIES):
+    """
+    Generate a batch of levels (runs in a worker process).
+
+    Args:
+        seed: numpy SeedSequence (or int) for this batch
+        count: Number of levels to generate
+        families: Families to draw from, in turn
+
+    Returns:
+        Tuple containing (list of levels, dictionary of rejection counts)
+    """
+    rng = np.random.default_rng(seed)
+    levels = []
+    rejected = {"window": 0, "simpler": 0, "unsolvable": 0, "gave_up": 0}
+    for i in range(count):
+        level, counts = generate_level(families[i % len(families)], rng)
+        for reason, n in counts.items():
+            rejected[reason] += n
+        if level is None:
+            rejected["gave_up"] += 1
+        else:
+            levels.append(level)
+    return levels, rejected
+
+def generate_levels(count, seed=0, workers=None, batch_size=50, families=FAMILIES):
+    """
+    Generate levels across a process pool.
+
+    Args:
+        count: Number of levels to attempt
+        seed: Seed for the whole run (the output only depends on it and count)
+        workers: Worker processes (None for one per CPU, 0 to run in this process)
+        batch_size: Levels per task
+        families: Families to draw from
+
+    Returns:
+        Tuple containing (list of levels, dictionary of rejection counts)
+    """
+    sizes = [min(batch_size, count - start) for start in range(0, count, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    family_lists = [families] * len(sizes)
+
+    if workers == 0 or len(sizes) < 2:
+        results = list(map(generate_batch, seeds, sizes, family_lists))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(generate_batch, seeds, sizes, family_lists))
+
+    levels = []
+    rejected = {}
+    for batch_levels, batch_rejected in results:
+        levels.extend(batch_levels)
+        for reason, n in batch_rejected.items():
+            rejected[reason] = rejected.get(reason, 0) + n
+
+    # Number the levels of each family in generation order
+    numbers = {}
+    for level in levels:
+        numbers[level["family"]] = numbers.get(level["family"], 0) + 1
+        level["name"] = f"{level['name']} {numbers[level['family']]}"
+    return levels, rejected
+
+def write_packs(levels, output, pack_size=None):
+    """
+    Write levels to one pack, or to numbered packs of pack_size levels.
+
+    Returns:
+        List of written file paths
+    """
+    if not pack_size or len(levels) <= pack_size:
+        write_level_pack(output, levels, name=os.path.basename(output))
+        return [output]
+
+    stem, ext = os.path.splitext(output)
+    paths = []
+    for number, start in enumerate(range(0, len(levels), pack_size), 1):
+        path = f"{stem}-{number:03d}{ext}"
+        write_level_pack(path, levels[start:start + pack_size], name=os.path.basename(path))
+        paths.append(path)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate verified levels into level packs")
+    parser.add_argument("--count", type=int, default=1000, help="number of levels to generate")
+    parser.add_argument("--output", default="generated.eqpack", help="level pack to write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--serial", action="store_true", help="don't use a process pool")
+    parser.add_argument("--pack-size", type=int, help="split the output into packs of this many levels")
+    parser.add_argument("--families", default=",".join(FAMILIES),
+                        help="comma separated families to generate (default: all)")
+    args = parser.parse_args(argv)
+
+    families = [family.strip() for family in args.families.split(",") if family.strip()]
+    unknown = [family for family in families if family not in FAMILIES]
+    if unknown:
+        parser.error(f"unknown families: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    levels, rejected = generate_levels(args.count, seed=args.seed,
+                                       workers=0 if args.serial else args.workers, families=families)
+    paths = write_packs(levels, args.output, args.pack_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"Generated {len(levels)} levels in {elapsed:.1f} s ({len(levels) / elapsed * 60:.0f} per minute)")
+    print("Rejected candidates: " + ", ".join(f"{reason} {n}" for reason, n in rejected.items()))
+    for path in paths:
+        print(f"Wrote {path}")
+    return 0 if levels else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
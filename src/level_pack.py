@@ -0,0 +1,160 @@
+"""
+Level packs for Equation Quest
+
+A level pack is a JSON lines file. The first line is a header holding an
+index of every level (name, star count, type and where its record is), and
+each following line is one full level record. Opening a pack only reads
+the header, so menus can list thousands of levels; a level's stars and
+solution are read when the level is loaded.
+
+Usage:
+    python -m src.level_pack build OUTPUT   (write the built-in levels to a pack)
+    python -m src.level_pack info PACK
+"""
+import sys
+import json
+import argparse
+from src.levels import LEVELS, is_free_level
+
+PACK_FORMAT = "eqpack"
+PACK_VERSION = 1
+
+# Number of full level records kept in memory per pack
+LEVEL_CACHE_SIZE = 32
+
+def _index_entry(level):
+    """Build the header index entry for a level"""
+    entry = {"name": level["name"], "stars": len(level["stars"])}
+    if "type" in level:
+        entry["type"] = level["type"]
+    return entry
+
+class LevelPack:
+    """
+    Sequence of levels backed by a pack file or an in-memory list.
+
+    len() and the index (names, star counts) are always available;
+    pack[i] returns the full level dictionary, reading it on first use.
+    """
+
+    def __init__(self, index, path=None, levels=None, body_start=0, name=""):
+        self.index = index
+        self.path = path
+        self.name = name
+        self._levels = levels  # Full levels when the pack is in memory
+        self._body_start = body_start
+        self._cache = {}
+
+    @classmethod
+    def from_levels(cls, levels, name="built-in"):
+        """Wrap a list of level dictionaries"""
+        return cls([_index_entry(level) for level in levels], levels=levels, name=name)
+
+    @classmethod
+    def open(cls, path):
+        """Open a pack file, reading only its header"""
+        with open(path, "rb") as f:
+            header_line = f.readline()
+        try:
+            header = json.loads(header_line)
+        except ValueError:
+            raise ValueError(f"{path} is not a level pack")
+        if header.get("format") != PACK_FORMAT:
+            raise ValueError(f"{path} is not a level pack")
+        if header.get("version", 0) > PACK_VERSION:
+            raise ValueError(f"{path} needs a newer version of Equation Quest")
+        return cls(header["levels"], path=path, body_start=len(header_line), name=header.get("name", ""))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, level_index):
+        if not 0 <= level_index < len(self.index):
+            raise IndexError(f"Level {level_index} is not in the pack")
+        if self._levels is not None:
+            return self._levels[level_index]
+
+        level = self._cache.get(level_index)
+        if level is None:
+            level = self._read(level_index)
+            if len(self._cache) >= LEVEL_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))  # Drop the oldest
+            self._cache[level_index] = level
+        return level
+
+    def _read(self, level_index):
+        """Read one level record from the pack file"""
+        entry = self.index[level_index]
+        with open(self.path, "rb") as f:
+            f.seek(self._body_start + entry["offset"])
+            level = json.loads(f.read(entry["length"]))
+        level["stars"] = [tuple(star) for star in level["stars"]]
+        return level
+
+    def level_name(self, level_index):
+        """Get a level's name without loading the level"""
+        return self.index[level_index]["name"]
+
+    def star_count(self, level_index):
+        """Get a level's number of stars without loading the level"""
+        return self.index[level_index]["stars"]
+
+    def is_free(self, level_index):
+        """Check if a level is a free exploration level without loading it"""
+        return is_free_level(self.index[level_index])
+
+def write_level_pack(path, levels, name=""):
+    """
+    Write levels to a pack file.
+
+    Args:
+        path: Output file
+        levels: Iterable of level dictionaries (name, equation, stars and
+            optionally solution, hint and type)
+        name: Pack name stored in the header
+    """
+    index = []
+    records = []
+    offset = 0
+    for level in levels:
+        record = json.dumps(level, separators=(",", ":")).encode("utf-8") + b"\n"
+        entry = _index_entry(level)
+        entry["offset"] = offset
+        entry["length"] = len(record)
+        index.append(entry)
+        records.append(record)
+        offset += len(record)
+
+    header = {"format": PACK_FORMAT, "version": PACK_VERSION, "name": name, "levels": index}
+    with open(path, "wb") as f:
+        f.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        f.writelines(records)
+
+def load_levels(path=None):
+    """Open a level pack, or the built-in levels when path is None"""
+    if path is None:
+        return LevelPack.from_levels(LEVELS)
+    return LevelPack.open(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and inspect level packs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="write the built-in levels to a pack")
+    build.add_argument("output")
+    info = commands.add_parser("info", help="list the levels in a pack")
+    info.add_argument("pack")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        write_level_pack(args.output, LEVELS, name="built-in")
+        print(f"Wrote {len(LEVELS)} levels to {args.output}")
+    else:
+        pack = LevelPack.open(args.pack)
+        print(f"{args.pack}: {pack.name or 'unnamed pack'}, {len(pack)} levels")
+        for i in range(len(pack)):
+            kind = "free" if pack.is_free(i) else f"{pack.star_count(i)} stars"
+            print(f"  {i + 1}. {pack.level_name(i)} ({kind})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Level solvability verifier for Equation Quest
+
+Runs each level's solution through the ball simulation and reports which
+stars are missed, how close the ball passes to every star and how far each
+star could move before the level stops being solvable.
+
+Usage:
+    python -m src.level_verifier [--serial] [--pack FILE]
+"""
+import sys
+import time
+import argparse
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.level_pack import load_levels
+from src.utils import safe_eval
+from src.simulation import COLLECT_RADIUS, run_trajectory, star_clearance
+
+def verify_level(level_data, equation=None):
+    """
+    Check that a level can be solved with its solution equation.
+
+    Args:
+        level_data: Level definition dictionary
+        equation: Equation to test instead of the level's own solution
+
+    Returns:
+        Dictionary with the verification report for the level
+    """
+    equation = equation if equation is not None else level_data.get("solution")
+    stars = level_data["stars"]
+    report = {
+        "name": level_data["name"],
+        "equation": equation,
+        "finished": False,
+        "collected": 0,
+        "total": len(stars),
+        "missed": [],
+        "clearance": [],  # Closest approach of the ball centre to each star
+        "slack": [],      # How far each star can move before it is missed
+        "tolerance": 0.0, # Smallest slack over all stars
+        "solvable": False
+    }
+    if equation is None:
+        return report
+
+    positions, finished = run_trajectory(lambda x: safe_eval(equation, x))
+    report["finished"] = finished
+
+    if len(positions) == 0 or len(stars) == 0:
+        return report
+
+    clearance = star_clearance(np.asarray(stars, dtype=float), positions)
+    slack = COLLECT_RADIUS - clearance
+
+    report["clearance"] = [round(float(c), 2) for c in clearance]
+    report["slack"] = [round(float(s), 2) for s in slack]
+    report["missed"] = [tuple(star) for star, c in zip(stars, clearance) if c >= COLLECT_RADIUS]
+    report["collected"] = len(stars) - len(report["missed"])
+    report["tolerance"] = round(float(slack.min()), 2)
+    report["solvable"] = finished and not report["missed"]
+    return report
+
+@lru_cache(maxsize=None)
+def _pack(pack_path):
+    """Open a level pack once per process"""
+    return load_levels(pack_path)
+
+def _verify_index(level_index, pack_path=None):
+    """Verify a level by its index (used by worker processes)"""
+    return verify_level(_pack(pack_path)[level_index])
+
+def verify_levels(levels=None, serial=False, pack_path=None):
+    """
+    Verify all challenge levels, in parallel by default.
+
+    Args:
+        levels: Level indices to check (all challenge levels if None)
+        serial: Run in the current process instead of a process pool
+        pack_path: Level pack to check (the built-in levels if None)
+
+    Returns:
+        List of (level index, report) tuples
+    """
+    if levels is None:
+        pack = _pack(pack_path)
+        levels = [i for i in range(len(pack)) if not pack.is_free(i)]
+
+    verify = partial(_verify_index, pack_path=pack_path)
+    if serial or len(levels) < 2:
+        reports = [verify(i) for i in levels]
+    else:
+        with ProcessPoolExecutor(max_workers=min(len(levels), 8)) as pool:
+            reports = list(pool.map(verify, levels, chunksize=max(1, len(levels) // 64)))
+
+    return list(zip(levels, reports))
+
+def print_report(results, pack_path=None):
+    """Print a human readable verification report"""
+    pack = _pack(pack_path)
+    for level_index, report in results:
+        status = "OK" if report["solvable"] else "BROKEN"
+        print(f"Level {level_index + 1}: {report['name']} [{status}]")
+        print(f"  solution: {report['equation']}")
+        print(f"  collected {report['collected']}/{report['total']} stars"
+              + ("" if report["finished"] else " (ball left the screen)"))
+        for star, clearance, slack in zip(pack[level_index]["stars"], report["clearance"], report["slack"]):
+            marker = "missed" if slack <= 0 else f"can move {slack:.1f}"
+            print(f"    star {star}: clearance {clearance:.1f} ({marker})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify that every level can be solved")
+    parser.add_argument("--serial", action="store_true", help="don't use a process pool")
+    parser.add_argument("--pack", help="level pack to check instead of the built-in levels")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = verify_levels(serial=args.serial, pack_path=args.pack)
+    elapsed = time.perf_counter() - start
+
+    print_report(results, args.pack)
+    print(f"Verified {len(results)} levels in {elapsed * 1000:.0f} ms")
+    return 0 if all(report["solvable"] for _, report in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Fit comparison overlay for free exploration mode
+
+Draws every fitting method's curve at once, each in its own color with
+its residuals at the user's points, so methods can be compared without
+cycling through them. All curves are evaluated on one shared grid (the
+visible x-range plus the user's points): polynomial fits are stacked
+into a single Vandermonde product and the rest are evaluated on the same
+array. Each curve's fit is cached against its own inputs, so changing
+the least-squares degree refits and re-evaluates just that curve, and a
+custom equation is never refitted when points are added.
+"""
+import numpy as np
+from src.settings import WIDTH, NEON_BLUE, NEON_PURPLE, NEON_PINK, NEON_GREEN
+from src.rootfinding import FitResult
+from src.viewport import SAMPLE_PIXELS
+
+# Method key -> (label, color), in legend order
+OVERLAY_CURVES = {
+    "least_squares": ("Least Squares", NEON_BLUE),
+    "auto": ("Auto", NEON_PURPLE),
+    "lagrange": ("Lagrange", NEON_PINK),
+    "spline": ("Spline", NEON_GREEN),
+    "custom": ("Custom", (255, 165, 0))
+}
+
+def _polynomial_values(fits, x_vals):
+    """Evaluate several FitResults (sharing one center and scale) with a single matrix product"""
+    degree = max(fit.degree for fit in fits)
+    coefficients = np.zeros((degree + 1, len(fits)))
+    for column, fit in enumerate(fits):
+        coefficients[degree - fit.degree:, column] = fit.scaled_coefficients  # Highest power first
+    return np.vander((x_vals - fits[0].center) / fits[0].scale, degree + 1) @ coefficients
+
+class FitOverlay:
+    """Cached curves and residual stats for every fitting method"""
+
+    def __init__(self):
+        self.x_vals = np.zeros(0)  # Shared grid across the screen
+        self._grid_key = None
+        self._points_key = None
+        self._curves = {}  # Method -> cache entry (inputs key, function, y values, stats)
+
+    def update(self, specs, view, points):
+        """
+        Bring the curves up to date.
+
+        Args:
+            specs: List of (method, inputs key, build) for the curves to show,
+                where build() returns the fitted function; a curve is only
+                rebuilt when its inputs key changes
+            view: Viewport the curves are drawn in
+            points: User points (x, y) the residuals are measured at
+
+        Returns:
+            List of (label, color, x values, y values, stats) in legend order,
+            where stats has "rmse" and "max_error" (None when unknown)
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        grid_key = (view.zoom, view.center_x, view.center_y)
+        points_key = points.tobytes()
+        if grid_key != self._grid_key or points_key != self._points_key:
+            # Every curve has to be sampled again (custom equations for their residuals)
+            self._grid_key = grid_key
+            self._points_key = points_key
+            self.x_vals = np.linspace(*view.x_range(), WIDTH // SAMPLE_PIXELS + 1)
+            for entry in self._curves.values():
+                entry["y"] = None
+
+        # Rebuild the functions whose inputs changed
+        shown = []
+        for method, key, build in specs:
+            entry = self._curves.get(method)
+            if entry is None or entry["key"] != key:
+                try:
+                    func = build()
+                except Exception as e:
+                    print(f"Error fitting {method} for the overlay: {e}")
+                    func = None
+                entry = self._curves[method] = {"key": key, "func": func, "y": None}
+            if entry["func"] is not None:
+                shown.append(method)
+
+        # Evaluate every stale curve on the grid and the points in one pass
+        stale = [method for method in shown if self._curves[method]["y"] is None]
+        if stale:
+            x_all = np.concatenate((self.x_vals, points[:, 0]))
+            values = {}
+            polynomials = {}  # (center, scale) -> methods, each group evaluated with one product
+            for method in stale:
+                func = self._curves[method]["func"]
+                if isinstance(func, FitResult):
+                    polynomials.setdefault((func.center, func.scale), []).append(method)
+            for methods in polynomials.values():
+                product = _polynomial_values([self._curves[method]["func"] for method in methods], x_all)
+                values.update(zip(methods, product.T))
+            with np.errstate(all="ignore"):
+                for method in stale:
+                    if method not in values:
+                        try:
+                            values[method] = np.broadcast_to(
+                                np.asarray(self._curves[method]["func"](x_all), dtype=float), x_all.shape)
+                        except Exception as e:
+                            print(f"Error evaluating {method} for the overlay: {e}")
+                            values[method] = np.full(x_all.shape, np.nan)
+
+            for method in stale:
+                entry = self._curves[method]
+                y_all = values[method]
+                entry["y"] = y_all[:len(self.x_vals)]
+                entry["stats"] = self._stats(entry["func"], y_all[len(self.x_vals):], points[:, 1])
+
+        return [(*OVERLAY_CURVES[method], self.x_vals, self._curves[method]["y"], self._curves[method]["stats"])
+                for method in OVERLAY_CURVES if method in shown]
+
+    @staticmethod
+    def _stats(func, predicted, actual):
+        """Residual stats of a curve at the user's points"""
+        if len(actual):
+            residuals = predicted - actual
+            if np.all(np.isfinite(residuals)):
+                return {"rmse": float(np.sqrt(np.mean(residuals ** 2))),
+                        "max_error": float(np.abs(residuals).max())}
+        elif isinstance(func, FitResult):
+            # Imported datasets aren't kept in memory, but the fit knows its own error
+            return {"rmse": float(func.rmse), "max_error": None}
+        return {"rmse": None, "max_error": None}
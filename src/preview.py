@@ -0,0 +1,123 @@
+"""
+Live curve preview for the equation input
+
+While the player types, the text being edited is compiled and sampled on
+a worker thread, so a slow or broken expression never holds up a frame.
+Work starts once typing pauses for DEBOUNCE seconds, and a result that
+finishes after a newer keystroke is thrown away. The latest expression
+that parsed and produced numbers is kept, so the ghost curve stays on
+screen while the text is half-typed.
+"""
+import threading
+import numpy as np
+from src.settings import X_MIN, X_MAX
+from src.utils import compile_equation, evaluate_equation
+
+DEBOUNCE = 0.15   # Seconds without a keystroke before the text is compiled
+SAMPLES = 400     # Points sampled across the screen (same as draw_path)
+
+def sample_equation(text, x_vals):
+    """
+    Compile and sample an equation.
+
+    Args:
+        text: Equation text
+        x_vals: Array of x values to sample at
+
+    Returns:
+        Array of y values, NaN where the equation isn't defined
+
+    Raises:
+        Exception: If the equation doesn't parse or can't be evaluated
+    """
+    code = compile_equation(text)
+    with np.errstate(all="ignore"):
+        y_vals = evaluate_equation(code, x_vals)
+        y_vals = np.broadcast_to(np.asarray(y_vals, dtype=float), x_vals.shape)
+    y_vals = np.where(np.isfinite(y_vals), y_vals, np.nan)
+    if np.isnan(y_vals).all():
+        raise ValueError("Equation has no values on screen")
+    return y_vals
+
+class CurvePreview:
+    """Samples the equation being typed on a background thread"""
+
+    def __init__(self, debounce=DEBOUNCE, samples=SAMPLES):
+        self.debounce = debounce
+        self.samples = samples
+
+        # Latest valid preview: (text, x values, y values), and the error for the latest text
+        self.curve = None
+        self.error = None
+
+        self._text = None       # Latest text asked for
+        self._x_range = None    # Visible x-range it was asked for
+        self._generation = 0    # Bumped on every new text, so stale results can be spotted
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread = None
+
+    def start(self):
+        """Start the preview worker"""
+        self._thread = threading.Thread(target=self._run, name="curve-preview", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=1.0):
+        """Stop the preview worker"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def request(self, text, x_range=(X_MIN, X_MAX)):
+        """Ask for a preview of text over an x-range (cheap to call every frame, repeats are ignored)"""
+        with self._cond:
+            if text == self._text and x_range == self._x_range:
+                return
+            self._text = text
+            self._x_range = x_range
+            self._generation += 1
+            self._cond.notify()
+
+    def clear(self):
+        """Forget the current preview, e.g. when the input box closes"""
+        with self._cond:
+            if self._text is None and self.curve is None:
+                return
+            self._text = None
+            self._generation += 1
+            self.curve = None
+            self.error = None
+
+    def _run(self):
+        """Worker thread: wait for typing to pause, then sample the latest text"""
+        generation = 0
+        while True:
+            with self._cond:
+                while self._generation == generation and not self._closing:
+                    self._cond.wait()
+                # Keep waiting while keystrokes are still arriving
+                while not self._closing:
+                    generation = self._generation
+                    self._cond.wait(self.debounce)
+                    if self._generation == generation:
+                        break
+                if self._closing:
+                    return
+                text = self._text
+                x_vals = np.linspace(*self._x_range, self.samples) if text is not None else None
+            if text is None:
+                continue
+
+            try:
+                curve, error = (text, x_vals, sample_equation(text, x_vals)), None
+            except Exception as e:
+                curve, error = None, str(e) or type(e).__name__
+
+            with self._cond:
+                if self._generation != generation:
+                    continue  # The text changed while this one was being sampled
+                if curve is not None:
+                    self.curve = curve
+                self.error = error
@@ -0,0 +1,204 @@
+"""
+Saved progress for Equation Quest
+
+Progress (unlocked levels and per-level stats) is kept in a small
+append-only journal. A background thread loads it at startup and appends
+changes, so the frame loop never waits on the disk. Repeated updates with
+the same value are dropped and changes made close together are written
+in one go. Every journal line carries a checksum, so a line torn by a
+crash is detected and ignored, and the journal is periodically compacted
+by atomically replacing it with just the current state.
+"""
+import os
+import re
+import json
+import zlib
+import time
+import threading
+from src.settings import SAVE_DIR
+
+FLUSH_INTERVAL = 0.5  # Seconds to wait so bursts of changes share one write
+COMPACT_EVERY = 200   # Journal records appended before the journal is compacted
+
+def progress_path(pack_name):
+    """Get the journal file for a level pack"""
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", pack_name or "levels")
+    return os.path.join(SAVE_DIR, f"{name}.journal")
+
+def _encode(record):
+    """Encode a record as a journal line: checksum, space, JSON"""
+    data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(data), data)
+
+def _merge(old, new):
+    """Combine two records for the same key - progress is never lost"""
+    if old is None:
+        return new
+    if "unlocked" in new:
+        return {"unlocked": max(old["unlocked"], new["unlocked"])}
+    return {"level": new["level"], "completed": old["completed"] or new["completed"],
+            "stars": max(old["stars"], new["stars"])}
+
+def _key(record):
+    """Get the key a record is stored under"""
+    return record.get("level", "unlocked")
+
+def _decode(line):
+    """Decode a journal line, returning None if it is torn or corrupt"""
+    if not line.endswith(b"\n") or len(line) < 10:
+        return None
+    checksum, data = line[:8], line[9:-1]
+    try:
+        if int(checksum, 16) != zlib.crc32(data):
+            return None
+        return json.loads(data)
+    except ValueError:
+        return None
+
+class ProgressStore:
+    """Journaled progress store written from a background thread"""
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+
+        # Set once the journal has been read (see progress())
+        self.loaded = threading.Event()
+
+        self._latest = {}   # Key -> merged record (what the journal will hold)
+        self._pending = {}  # Key -> record not yet written
+        self._cond = threading.Condition()
+        self._closing = False
+        self._appended = 0  # Records appended since the last compaction
+        self._thread = None
+
+    def start(self):
+        """Start loading the journal and writing changes in the background"""
+        self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=2.0):
+        """Write any pending changes, compact the journal and stop the writer"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def progress(self):
+        """
+        Get the saved progress merged with everything recorded since.
+
+        Returns:
+            Tuple containing (unlocked levels, dictionary of level index -> stats)
+        """
+        with self._cond:
+            records = list(self._latest.values())
+        unlocked_levels = 1
+        level_stats = {}
+        for record in records:
+            if "unlocked" in record:
+                unlocked_levels = record["unlocked"]
+            else:
+                level_stats[record["level"]] = {"completed": record["completed"], "stars": record["stars"]}
+        return unlocked_levels, level_stats
+
+    def record_unlocked(self, unlocked_levels):
+        """Record the number of unlocked levels"""
+        self._record("unlocked", {"unlocked": unlocked_levels})
+
+    def record_level(self, level_index, completed, stars):
+        """Record the stats of a level"""
+        self._record(level_index, {"level": level_index, "completed": completed, "stars": stars})
+
+    def _record(self, key, record):
+        """Queue a record unless it adds nothing to the latest value for its key"""
+        with self._cond:
+            merged = _merge(self._latest.get(key), record)
+            if self._latest.get(key) == merged:
+                return  # Called every frame of the complete screen - nothing to write
+            self._latest[key] = merged
+            self._pending[key] = merged
+            self._cond.notify()
+
+    def _load(self):
+        """Read the journal, dropping anything after a torn or corrupt line"""
+        valid_length = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    record = _decode(line)
+                    if record is None:
+                        break
+                    with self._cond:
+                        key = _key(record)
+                        self._latest[key] = _merge(self._latest.get(key), record)
+                        if key in self._pending:
+                            # Recorded before loading finished - write the combined value
+                            self._pending[key] = self._latest[key]
+                    valid_length += len(line)
+                    self._appended += 1
+                size = f.seek(0, os.SEEK_END)
+        except OSError:
+            return
+
+        if valid_length < size:
+            # Cut off the torn tail so new records don't get appended to it
+            print(f"Ignoring {size - valid_length} damaged bytes at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_length)
+
+    def _append(self, records):
+        """Append records to the journal and make sure they reach the disk"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(_encode(record) for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self._appended += len(records)
+
+    def _compact(self):
+        """Replace the journal with one record per key"""
+        with self._cond:
+            records = list(self._latest.values())
+        if self._appended <= len(records):
+            return  # Nothing to drop
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(_encode(record) for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._appended = len(records)
+
+    def _run(self):
+        """Writer thread: load the journal, then write changes as they come in"""
+        self._load()
+        self.loaded.set()
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                # Give related changes a moment to arrive and share the write
+                # (each one notifies, so wait out the whole window)
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                records = list(self._pending.values())
+                self._pending.clear()
+                closing = self._closing
+
+            try:
+                if records:
+                    self._append(records)
+                if closing or self._appended >= self.compact_every:
+                    self._compact()
+            except OSError as e:
+                print(f"Could not save progress: {e}")
+            if closing:
+                return
@@ -0,0 +1,396 @@
+"""
+Replay recording and playback for Equation Quest
+
+A replay is an append-only binary file of fixed-size records: one FRAME
+record per main loop iteration, the input events handled during that frame,
+equation submissions, the saved progress merged into the game (on the frame
+it finished loading) and the ball position after every simulation step.
+Fixed-size records let playback memory-map the file and jump to any frame
+without reading the rest of it.
+
+Usage:
+    python -m src.replay FILE [--verify] [--frame N] [--pack FILE]
+"""
+import os
+import sys
+import json
+import bisect
+import argparse
+import threading
+import numpy as np
+
+REPLAY_MAGIC = b"EQRP"
+REPLAY_VERSION = 1
+HEADER_SIZE = 16
+
+# Record layout - the 16 bytes after the frame number double as raw text
+# storage for TEXT continuation records
+RECORD_DTYPE = np.dtype([
+    ("kind", "u1"),
+    ("pad", "u1"),
+    ("mod", "u2"),     # Keyboard modifiers
+    ("frame", "u4"),   # Main loop iteration the record belongs to
+    ("code", "i4"),    # Key code, mouse button or frame time in ms
+    ("arg", "i4"),     # Unicode code point or text length
+    ("x", "f4"),       # Mouse or ball x
+    ("y", "f4")        # Mouse or ball y
+])
+TEXT_OFFSET = 8
+TEXT_CHUNK = RECORD_DTYPE.itemsize - TEXT_OFFSET
+
+# Record kinds
+KIND_FRAME = 0
+KIND_KEYDOWN = 1
+KIND_KEYUP = 2
+KIND_MOUSEDOWN = 3
+KIND_QUIT = 4
+KIND_EQUATION = 5
+KIND_TEXT = 6
+KIND_BALL = 7
+KIND_MOUSEUP = 8
+KIND_MOUSEDRAG = 9   # Mouse motion with a button held (plain motion isn't recorded)
+KIND_MOUSEWHEEL = 10
+KIND_LEVEL_PACK = 11 # Level pack the run was played with, before the first frame
+KIND_PROGRESS = 12   # Saved progress (JSON) merged into the game during this frame
+
+INPUT_KINDS = (KIND_KEYDOWN, KIND_KEYUP, KIND_MOUSEDOWN, KIND_QUIT, KIND_MOUSEUP, KIND_MOUSEDRAG, KIND_MOUSEWHEEL)
+
+class ReplayRecorder:
+    """Append replay records to a file, buffering them in a record array"""
+
+    def __init__(self, path, buffer_size=4096, flush_frames=60):
+        self.path = path
+        self.frame = 0
+        self.flush_frames = flush_frames
+        self.buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self.count = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            header = REPLAY_MAGIC + np.array([REPLAY_VERSION, RECORD_DTYPE.itemsize, 0], dtype="<u4").tobytes()
+            self.file.write(header)
+
+    def _append(self, kind, code=0, arg=0, x=0.0, y=0.0, mod=0):
+        """Add one record to the buffer"""
+        if self.count == len(self.buffer):
+            self.flush()
+        record = self.buffer[self.count]
+        record["kind"] = kind
+        record["mod"] = mod & 0xFFFF
+        record["frame"] = self.frame
+        record["code"] = code
+        record["arg"] = arg
+        record["x"] = x
+        record["y"] = y
+        self.count += 1
+
+    def begin_frame(self, ticks):
+        """Start a new main loop iteration"""
+        self.frame += 1
+        if self.frame % self.flush_frames == 0:
+            self.flush()
+        self._append(KIND_FRAME, code=ticks)
+
+    def record_event(self, event, mods, mouse_pos):
+        """Record an input event handled by the main loop"""
+        import pygame
+        if event.type == pygame.KEYDOWN:
+            self._append(KIND_KEYDOWN, code=event.key, arg=ord(event.unicode) if event.unicode else 0, mod=mods)
+        elif event.type == pygame.KEYUP:
+            self._append(KIND_KEYUP, code=event.key, mod=mods)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self._append(KIND_MOUSEDOWN, code=event.button, x=mouse_pos[0], y=mouse_pos[1], mod=mods)
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self._append(KIND_MOUSEUP, code=event.button, x=mouse_pos[0], y=mouse_pos[1], mod=mods)
+        elif event.type == pygame.MOUSEMOTION and any(event.buttons):
+            self._append(KIND_MOUSEDRAG, x=mouse_pos[0], y=mouse_pos[1], mod=mods)
+        elif event.type == pygame.MOUSEWHEEL:
+            self._append(KIND_MOUSEWHEEL, code=event.y, arg=event.x, x=mouse_pos[0], y=mouse_pos[1], mod=mods)
+        elif event.type == pygame.QUIT:
+            self._append(KIND_QUIT)
+
+    def _append_text(self, kind, text):
+        """Add a header record of the given kind followed by text records"""
+        data = text.encode("utf-8")
+        self._append(kind, arg=len(data))
+        for start in range(0, len(data), TEXT_CHUNK):
+            self._append(KIND_TEXT)
+            chunk = data[start:start + TEXT_CHUNK].ljust(TEXT_CHUNK, b"\0")
+            self.buffer[self.count - 1:self.count].view(np.uint8)[TEXT_OFFSET:] = np.frombuffer(chunk, dtype=np.uint8)
+
+    def record_equation(self, equation):
+        """Record a submitted equation as a header record plus text records"""
+        self._append_text(KIND_EQUATION, equation)
+
+    def record_level_pack(self, pack_path):
+        """Record the level pack file the run is played with (call before the first frame)"""
+        self._append_text(KIND_LEVEL_PACK, pack_path)
+
+    def record_progress(self, unlocked_levels, level_stats):
+        """Record the saved progress merged into the game in the current frame"""
+        levels = {str(level_index): stats for level_index, stats in level_stats.items()}
+        self._append_text(KIND_PROGRESS, json.dumps({"unlocked": unlocked_levels, "levels": levels}))
+
+    def record_ball(self, ball_pos):
+        """Record the ball position after a simulation step"""
+        self._append(KIND_BALL, x=ball_pos[0], y=ball_pos[1])
+
+    def flush(self):
+        """Write buffered records to the end of the file"""
+        if self.count:
+            self.file.write(self.buffer[:self.count].tobytes())
+            self.file.flush()
+            self.count = 0
+
+    def close(self):
+        """Flush and close the replay file"""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+class _FrameColumn:
+    """Sequence view over the frame numbers of a memory-mapped record array"""
+
+    def __init__(self, records):
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return int(self.records[index]["frame"])
+
+class ReplayReader:
+    """Memory-mapped access to a replay file"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:4] != REPLAY_MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        version, record_size, _ = np.frombuffer(header[4:], dtype="<u4")
+        if version != REPLAY_VERSION or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Unsupported replay version {version}")
+
+        # A run killed mid-write can leave a partial record at the end
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._frames = _FrameColumn(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def frame_count(self):
+        """Number of recorded main loop iterations"""
+        return self._frames[len(self.records) - 1] if len(self.records) else 0
+
+    def seek(self, frame):
+        """Get the index of the first record of a frame (binary search)"""
+        return bisect.bisect_left(self._frames, frame)
+
+    def frame_records(self, frame):
+        """Get the records belonging to a single frame"""
+        return self.records[self.seek(frame):self.seek(frame + 1)]
+
+    def trajectory(self, start_frame=1, end_frame=None):
+        """Get recorded ball positions as an (N, 2) float32 array"""
+        end = len(self.records) if end_frame is None else self.seek(end_frame + 1)
+        records = self.records[self.seek(start_frame):end]
+        balls = records[records["kind"] == KIND_BALL]
+        return np.column_stack((balls["x"], balls["y"])).astype(np.float32)
+
+    def equations(self, start_frame=1, end_frame=None):
+        """Get (frame, equation) for every equation submission in a frame range"""
+        start = self.seek(start_frame)
+        end = len(self.records) if end_frame is None else self.seek(end_frame + 1)
+        return self._texts(self.records[start:end], KIND_EQUATION)
+
+    def level_pack(self):
+        """Get the level pack file the run was played with (None for the built-in levels)"""
+        texts = self._texts(self.records[:self.seek(1)], KIND_LEVEL_PACK)
+        return texts[0][1] if texts else None
+
+    def saved_progress(self):
+        """
+        Get the saved progress merged into the game during the run.
+
+        Returns:
+            Dictionary of frame -> (unlocked levels, dictionary of level index -> stats)
+        """
+        result = {}
+        for frame, text in self._texts(self.records, KIND_PROGRESS):
+            data = json.loads(text)
+            result[frame] = (data["unlocked"], {int(k): v for k, v in data["levels"].items()})
+        return result
+
+    @staticmethod
+    def _texts(records, kind):
+        """Get (frame, text) for every text header record of a kind"""
+        result = []
+        for index in np.flatnonzero(records["kind"] == kind):
+            length = int(records[index]["arg"])
+            chunks = -(-length // TEXT_CHUNK)
+            raw = np.ascontiguousarray(records[index + 1:index + 1 + chunks]).view(np.uint8)
+            raw = raw.reshape(chunks, RECORD_DTYPE.itemsize)[:, TEXT_OFFSET:].tobytes()[:length]
+            result.append((int(records[index]["frame"]), raw.decode("utf-8")))
+        return result
+
+    def frames(self, start_frame=1):
+        """
+        Iterate over recorded frames.
+
+        Yields:
+            Tuple of (frame, ticks, input records, ball positions)
+        """
+        index = self.seek(start_frame)
+        while index < len(self.records):
+            frame = int(self.records[index]["frame"])
+            end = self.seek(frame + 1)
+            records = self.records[index:end]
+            kinds = records["kind"]
+            frame_rows = records[kinds == KIND_FRAME]
+            ticks = int(frame_rows[0]["code"]) if len(frame_rows) else 0
+            inputs = records[np.isin(kinds, INPUT_KINDS)]
+            balls = records[kinds == KIND_BALL]
+            yield frame, ticks, inputs, np.column_stack((balls["x"], balls["y"])).astype(np.float32)
+            index = end
+
+def record_to_event(record):
+    """Rebuild the pygame event for an input record"""
+    import pygame
+    kind = record["kind"]
+    if kind == KIND_KEYDOWN:
+        unicode = chr(record["arg"]) if record["arg"] else ""
+        return pygame.event.Event(pygame.KEYDOWN, key=int(record["code"]), unicode=unicode, mod=int(record["mod"]))
+    if kind == KIND_KEYUP:
+        return pygame.event.Event(pygame.KEYUP, key=int(record["code"]), mod=int(record["mod"]))
+    if kind == KIND_MOUSEDOWN:
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=int(record["code"]), pos=(int(record["x"]), int(record["y"])))
+    if kind == KIND_MOUSEUP:
+        return pygame.event.Event(pygame.MOUSEBUTTONUP, button=int(record["code"]), pos=(int(record["x"]), int(record["y"])))
+    if kind == KIND_MOUSEDRAG:
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=(int(record["x"]), int(record["y"])), rel=(0, 0), buttons=(1, 0, 0))
+    if kind == KIND_MOUSEWHEEL:
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=int(record["arg"]), y=int(record["code"]), flipped=False)
+    return pygame.event.Event(pygame.QUIT)
+
+class _TrajectoryCapture:
+    """Stand-in recorder that keeps the ball positions of the current frame"""
+
+    def __init__(self):
+        self.positions = []
+
+    def record_ball(self, ball_pos):
+        self.positions.append((ball_pos[0], ball_pos[1]))
+
+    def record_equation(self, equation):
+        pass
+
+    def record_progress(self, unlocked_levels, level_stats):
+        pass
+
+class _ReplayedProgress:
+    """Stand-in progress store that finishes loading on the recorded frame"""
+
+    def __init__(self):
+        self.loaded = threading.Event()
+        self.saved = (1, {})
+
+    def finish_loading(self, saved):
+        self.saved = saved
+        self.loaded.set()
+
+    def progress(self):
+        return self.saved
+
+    def record_unlocked(self, unlocked_levels):
+        pass
+
+    def record_level(self, level_index, completed, stars):
+        pass
+
+def verify_replay(path, pack_path=None):
+    """
+    Re-simulate a replay from its recorded inputs and compare the ball path.
+
+    Args:
+        path: Replay file to check
+        pack_path: Level pack to play the replay with (defaults to the pack
+            recorded in the replay, or the built-in levels)
+
+    Returns:
+        Dictionary with the frame count, number of compared positions and
+        the first frame whose ball positions differ (None if all match)
+    """
+    from src.game import Game
+    from src.controls import handle_event, handle_held_keys, new_backspace_state
+    from src.level_pack import load_levels
+
+    reader = ReplayReader(path)
+    game = Game(load_levels(pack_path or reader.level_pack()))
+    capture = _TrajectoryCapture()
+    game.recorder = capture
+    saved_progress = reader.saved_progress()
+    if saved_progress:
+        game.progress = _ReplayedProgress()
+    backspace = new_backspace_state()
+
+    compared = 0
+    first_mismatch = None
+    for frame, ticks, inputs, recorded in reader.frames():
+        for record in inputs:
+            mouse_pos = (int(record["x"]), int(record["y"]))
+            handle_event(game, record_to_event(record), int(record["mod"]), mouse_pos, ticks, backspace)
+        handle_held_keys(game, ticks, backspace)
+        if frame in saved_progress:
+            game.progress.finish_loading(saved_progress[frame])
+
+        capture.positions = []
+        game.update()
+        simulated = np.array(capture.positions, dtype=np.float32).reshape(-1, 2)
+
+        compared += len(recorded)
+        if first_mismatch is None and (simulated.shape != recorded.shape or not np.array_equal(simulated, recorded)):
+            first_mismatch = frame
+
+    return {"frames": reader.frame_count, "positions": compared, "first_mismatch": first_mismatch}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or verify an Equation Quest replay")
+    parser.add_argument("path", help="replay file")
+    parser.add_argument("--verify", action="store_true", help="re-simulate the run and compare ball positions")
+    parser.add_argument("--frame", type=int, help="show the records of a single frame")
+    parser.add_argument("--pack", help="level pack to verify with instead of the one the run was recorded with")
+    args = parser.parse_args(argv)
+
+    reader = ReplayReader(args.path)
+    print(f"{args.path}: {reader.frame_count} frames, {len(reader)} records")
+    if reader.level_pack():
+        print(f"  level pack: {reader.level_pack()}")
+
+    if args.frame is not None:
+        for record in reader.frame_records(args.frame):
+            print(record)
+
+    for frame, equation in reader.equations():
+        print(f"  frame {frame}: f(x) = {equation}")
+
+    if args.verify:
+        result = verify_replay(args.path, args.pack)
+        if result["first_mismatch"] is None:
+            print(f"Re-simulation matches all {result['positions']} ball positions")
+        else:
+            print(f"Re-simulation diverges at frame {result['first_mismatch']}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
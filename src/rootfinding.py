@@ -1,21 +1,81 @@
+import time
 import numpy as np
-from typing import Callable, List, Tuple
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterator, List, Tuple
 
-def bisection_method(f: Callable[[float], float], a: float, b: float, tol: float = 1e-6, max_iter: int = 100) -> Tuple[float, int, List[float]]:
+# Instrumentation hooks - called with a stats dictionary after every scalar solve
+_solver_hooks = []
+
+def add_solver_hook(hook: Callable[[dict], None]):
+    """
+    Register a function to be called after every scalar solve.
+    
+    The hook receives a dictionary with the solver name, iterations,
+    function evaluations, elapsed seconds and whether the solve converged.
+    """
+    _solver_hooks.append(hook)
+
+def remove_solver_hook(hook: Callable[[dict], None]):
+    """Unregister a hook added with add_solver_hook"""
+    _solver_hooks.remove(hook)
+
+@contextmanager
+def collect_solver_stats():
+    """Collect the stats of every solve inside a with block into a list"""
+    records = []
+    add_solver_hook(records.append)
+    try:
+        yield records
+    finally:
+        remove_solver_hook(records.append)
+
+def _report_solve(method: str, start: float, iterations: int, evals: int, converged: bool):
+    """Pass the stats of a finished solve to the registered hooks"""
+    if _solver_hooks:
+        stats = {
+            "method": method,
+            "iterations": iterations,
+            "evals": evals,
+            "seconds": time.perf_counter() - start,
+            "converged": converged
+        }
+        for hook in list(_solver_hooks):
+            hook(stats)
+
+def _solve_result(root, iterations, approximations, evals, history, return_evals):
+    """Build the return value shared by the scalar solvers"""
+    if not history:
+        approximations = [root]
+    return (root, iterations, approximations, evals) if return_evals else (root, iterations, approximations)
+
+def bisection_method(f: Callable[[float], float], a: float, b: float, tol: float = 1e-6, max_iter: int = 100,
+                     return_evals: bool = False, history: bool = True) -> Tuple[float, int, List[float]]:
     """
     Find the root of a function using the bisection method.
     
+    Endpoint values are carried forward, so each iteration costs a single
+    function evaluation.
+    
     Args:
         f: The function to find the root of
         a: Lower bound of the interval
         b: Upper bound of the interval
         tol: Tolerance for convergence
         max_iter: Maximum number of iterations
+        return_evals: Also return the number of function evaluations
+        history: Keep every approximation (if False only the final one is returned)
         
     Returns:
-        Tuple containing (root approximation, number of iterations, list of approximations)
+        Tuple containing (root approximation, number of iterations, list of approximations),
+        plus the number of function evaluations if return_evals is set
     """
-    if f(a) * f(b) > 0:
+    start = time.perf_counter()
+    fa = f(a)
+    fb = f(b)
+    evals = 2
+    if fa * fb > 0:
+        _report_solve("bisection", start, 0, evals, False)
         raise ValueError("Function must have opposite signs at interval endpoints")
     
     iterations = 0
@@ -23,23 +83,118 @@ def bisection_method(f: Callable[[float], float], a: float, b: float, tol: float
     
     while (b - a) / 2 > tol and iterations < max_iter:
         c = (a + b) / 2
-        approximations.append(c)
+        if history:
+            approximations.append(c)
+        fc = f(c)
+        evals += 1
         
-        if f(c) == 0:
-            return c, iterations, approximations
-        elif f(a) * f(c) < 0:
+        if fc == 0:
+            _report_solve("bisection", start, iterations, evals, True)
+            return _solve_result(c, iterations, approximations, evals, history, return_evals)
+        elif fa * fc < 0:
             b = c
         else:
             a = c
+            fa = fc
             
         iterations += 1
     
     root = (a + b) / 2
     approximations.append(root)
-    return root, iterations, approximations
+    _report_solve("bisection", start, iterations, evals, (b - a) / 2 <= tol)
+    return _solve_result(root, iterations, approximations, evals, history, return_evals)
+
+def brent_method(f: Callable[[float], float], a: float, b: float, tol: float = 1e-6, max_iter: int = 100,
+                 return_evals: bool = False, history: bool = True) -> Tuple[float, int, List[float]]:
+    """
+    Find the root of a function using Brent's method.
+    
+    Uses inverse quadratic interpolation or secant steps while they make good
+    progress and falls back to bisection otherwise, so it keeps the
+    guaranteed convergence of bisection with far fewer function evaluations.
+    
+    Args:
+        f: The function to find the root of
+        a: Lower bound of the interval
+        b: Upper bound of the interval
+        tol: Tolerance for convergence
+        max_iter: Maximum number of iterations
+        return_evals: Also return the number of function evaluations
+        history: Keep every approximation (if False only the final one is returned)
+        
+    Returns:
+        Tuple containing (root approximation, number of iterations, list of approximations),
+        plus the number of function evaluations if return_evals is set
+    """
+    start = time.perf_counter()
+    fa = f(a)
+    fb = f(b)
+    evals = 2
+    if fa * fb > 0:
+        _report_solve("brent", start, 0, evals, False)
+        raise ValueError("Function must have opposite signs at interval endpoints")
+    
+    # b is the best estimate, a the previous one and c the other end of the bracket
+    c, fc = b, fb
+    d = e = b - a
+    iterations = 0
+    approximations = []
+    converged = False
+    
+    while iterations < max_iter:
+        if (fb > 0 and fc > 0) or (fb < 0 and fc < 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        
+        tol1 = 2 * np.finfo(float).eps * abs(b) + 0.5 * tol
+        xm = 0.5 * (c - b)
+        if abs(xm) <= tol1 or fb == 0:
+            converged = True
+            break
+        
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # Secant step
+                p = 2 * xm * s
+                q = 1 - s
+            else:
+                # Inverse quadratic interpolation
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * xm * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            
+            # Accept the interpolation only if it stays in the bracket and converges fast enough
+            if 2 * p < min(3 * xm * q - abs(tol1 * q), abs(e * q)):
+                e = d
+                d = p / q
+            else:
+                d = e = xm
+        else:
+            # Fall back to bisection
+            d = e = xm
+        
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else (tol1 if xm > 0 else -tol1)
+        fb = f(b)
+        evals += 1
+        if history:
+            approximations.append(b)
+        iterations += 1
+    
+    _report_solve("brent", start, iterations, evals, converged)
+    return _solve_result(b, iterations, approximations, evals, history, return_evals)
 
 def newton_raphson(f: Callable[[float], float], df: Callable[[float], float], x0: float, 
-                  tol: float = 1e-6, max_iter: int = 100) -> Tuple[float, int, List[float]]:
+                  tol: float = 1e-6, max_iter: int = 100, return_evals: bool = False,
+                  history: bool = True) -> Tuple[float, int, List[float]]:
     """
     Find the root of a function using the Newton-Raphson method.
     
@@ -49,97 +204,954 @@ def newton_raphson(f: Callable[[float], float], df: Callable[[float], float], x0
         x0: Initial guess
         tol: Tolerance for convergence
         max_iter: Maximum number of iterations
+        return_evals: Also return the number of function evaluations (f and df)
+        history: Keep every approximation (if False only the final one is returned)
         
     Returns:
-        Tuple containing (root approximation, number of iterations, list of approximations)
+        Tuple containing (root approximation, number of iterations, list of approximations),
+        plus the number of function evaluations if return_evals is set
     """
+    start = time.perf_counter()
     x = x0
     iterations = 0
-    approximations = [x0]
+    evals = 0
+    approximations = [x0] if history else []
     
     while iterations < max_iter:
+        dfx = df(x)
+        evals += 1
+        
         # Avoid division by zero
-        if abs(df(x)) < 1e-10:
+        if abs(dfx) < 1e-10:
+            _report_solve("newton_raphson", start, iterations, evals, False)
             raise ValueError("Derivative too close to zero")
             
-        x_new = x - f(x) / df(x)
-        approximations.append(x_new)
+        x_new = x - f(x) / dfx
+        evals += 1
+        if history:
+            approximations.append(x_new)
         
         if abs(x_new - x) < tol:
-            return x_new, iterations, approximations
+            _report_solve("newton_raphson", start, iterations, evals, True)
+            return _solve_result(x_new, iterations, approximations, evals, history, return_evals)
             
         x = x_new
         iterations += 1
     
-    return x, iterations, approximations
+    _report_solve("newton_raphson", start, iterations, evals, False)
+    return _solve_result(x, iterations, approximations, evals, history, return_evals)
 
 def secant_method(f: Callable[[float], float], x0: float, x1: float, 
-                 tol: float = 1e-6, max_iter: int = 100) -> Tuple[float, int, List[float]]:
+                 tol: float = 1e-6, max_iter: int = 100, return_evals: bool = False,
+                 history: bool = True) -> Tuple[float, int, List[float]]:
     """
     Find the root of a function using the secant method.
     
+    Function values are carried forward, so each iteration costs a single
+    function evaluation.
+    
     Args:
         f: The function to find the root of
         x0: First initial guess
         x1: Second initial guess
         tol: Tolerance for convergence
         max_iter: Maximum number of iterations
+        return_evals: Also return the number of function evaluations
+        history: Keep every approximation (if False only the final one is returned)
         
     Returns:
-        Tuple containing (root approximation, number of iterations, list of approximations)
+        Tuple containing (root approximation, number of iterations, list of approximations),
+        plus the number of function evaluations if return_evals is set
     """
+    start = time.perf_counter()
     iterations = 0
-    approximations = [x0, x1]
+    approximations = [x0, x1] if history else []
+    f_x0 = f(x0)
+    f_x1 = f(x1)
+    evals = 2
     
     while iterations < max_iter:
-        f_x0 = f(x0)
-        f_x1 = f(x1)
-        
         # Avoid division by (almost) zero
         if abs(f_x1 - f_x0) < 1e-10:
+            _report_solve("secant", start, iterations, evals, False)
             raise ValueError("Function values too close, cannot continue secant method")
             
         x_new = x1 - f_x1 * (x1 - x0) / (f_x1 - f_x0)
-        approximations.append(x_new)
+        if history:
+            approximations.append(x_new)
         
         if abs(x_new - x1) < tol:
-            return x_new, iterations, approximations
+            _report_solve("secant", start, iterations, evals, True)
+            return _solve_result(x_new, iterations, approximations, evals, history, return_evals)
             
-        x0 = x1
+        x0, f_x0 = x1, f_x1
         x1 = x_new
+        f_x1 = f(x1)
+        evals += 1
         iterations += 1
     
-    return x1, iterations, approximations
+    _report_solve("secant", start, iterations, evals, False)
+    return _solve_result(x1, iterations, approximations, evals, history, return_evals)
 
-def polynomial_from_points(points: List[Tuple[float, float]]) -> Callable[[float], float]:
+def bisection_iter(f: Callable[[float], float], a: float, b: float, tol: float = 1e-6,
+                   max_iter: int = 100) -> Iterator[Tuple[float, float, int]]:
     """
-    Create a polynomial function that passes through the given points.
-    Uses Lagrange interpolation.
+    Run the bisection method lazily, one iteration at a time.
+    
+    Nothing is kept between iterations, so memory use is constant and the
+    caller can stop whenever it likes. Stats are reported to the solver
+    hooks when the generator finishes or is closed.
     
     Args:
-        points: List of (x, y) coordinate pairs
+        f: The function to find the root of
+        a: Lower bound of the interval
+        b: Upper bound of the interval
+        tol: Tolerance for convergence
+        max_iter: Maximum number of iterations
         
-    Returns:
-        A function representing the polynomial that passes through the points
+    Yields:
+        Tuple of (iterate, residual f(iterate), function evaluations so far)
     """
-    def lagrange_polynomial(x):
-        n = len(points)
-        result = 0.0
+    start = time.perf_counter()
+    fa = f(a)
+    fb = f(b)
+    evals = 2
+    iterations = 0
+    converged = False
+    try:
+        if fa * fb > 0:
+            raise ValueError("Function must have opposite signs at interval endpoints")
         
-        for i in range(n):
-            xi, yi = points[i]
-            term = yi
+        while (b - a) / 2 > tol and iterations < max_iter:
+            c = (a + b) / 2
+            fc = f(c)
+            evals += 1
+            iterations += 1
+            yield c, fc, evals
             
-            for j in range(n):
-                if i != j:
-                    xj, _ = points[j]
-                    term *= (x - xj) / (xi - xj)
+            if fc == 0:
+                converged = True
+                break
+            elif fa * fc < 0:
+                b = c
+            else:
+                a = c
+                fa = fc
+        converged = converged or (b - a) / 2 <= tol
+    finally:
+        _report_solve("bisection", start, iterations, evals, converged)
+
+def newton_raphson_iter(f: Callable[[float], float], df: Callable[[float], float], x0: float,
+                        tol: float = 1e-6, max_iter: int = 100) -> Iterator[Tuple[float, float, int]]:
+    """
+    Run the Newton-Raphson method lazily, one iteration at a time.
+    
+    Args:
+        f: The function to find the root of
+        df: The derivative of the function
+        x0: Initial guess
+        tol: Tolerance for convergence
+        max_iter: Maximum number of iterations
+        
+    Yields:
+        Tuple of (iterate, residual f(iterate), function evaluations so far),
+        starting with the initial guess
+    """
+    start = time.perf_counter()
+    x = x0
+    fx = f(x)
+    evals = 1
+    iterations = 0
+    converged = False
+    try:
+        yield x, fx, evals
+        
+        while iterations < max_iter:
+            dfx = df(x)
+            evals += 1
+            
+            # Avoid division by zero
+            if abs(dfx) < 1e-10:
+                raise ValueError("Derivative too close to zero")
+            
+            x_new = x - fx / dfx
+            fx = f(x_new)
+            evals += 1
+            iterations += 1
+            yield x_new, fx, evals
+            
+            if abs(x_new - x) < tol:
+                converged = True
+                break
+            x = x_new
+    finally:
+        _report_solve("newton_raphson", start, iterations, evals, converged)
+
+def secant_iter(f: Callable[[float], float], x0: float, x1: float,
+                tol: float = 1e-6, max_iter: int = 100) -> Iterator[Tuple[float, float, int]]:
+    """
+    Run the secant method lazily, one iteration at a time.
+    
+    Args:
+        f: The function to find the root of
+        x0: First initial guess
+        x1: Second initial guess
+        tol: Tolerance for convergence
+        max_iter: Maximum number of iterations
+        
+    Yields:
+        Tuple of (iterate, residual f(iterate), function evaluations so far)
+    """
+    start = time.perf_counter()
+    f_x0 = f(x0)
+    f_x1 = f(x1)
+    evals = 2
+    iterations = 0
+    converged = False
+    try:
+        while iterations < max_iter:
+            # Avoid division by (almost) zero
+            if abs(f_x1 - f_x0) < 1e-10:
+                raise ValueError("Function values too close, cannot continue secant method")
+            
+            x_new = x1 - f_x1 * (x1 - x0) / (f_x1 - f_x0)
+            x0, f_x0 = x1, f_x1
+            x1 = x_new
+            f_x1 = f(x1)
+            evals += 1
+            iterations += 1
+            yield x1, f_x1, evals
             
-            result += term
+            if abs(x1 - x0) < tol:
+                converged = True
+                break
+    finally:
+        _report_solve("secant", start, iterations, evals, converged)
+
+def bisection_batch(f: Callable[[np.ndarray], np.ndarray], a: np.ndarray, b: np.ndarray, tol: float = 1e-6,
+                    max_iter: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run the bisection method on many brackets at once.
+    
+    Each bracket is a lane; lanes that have converged are frozen while the
+    others keep iterating, and f is only evaluated on the active lanes.
+    
+    Args:
+        f: Vectorized function to find the roots of (takes and returns arrays)
+        a: Array of lower bounds
+        b: Array of upper bounds
+        tol: Tolerance for convergence
+        max_iter: Maximum number of iterations
+        
+    Returns:
+        Tuple containing (root approximations, iterations per lane, converged mask).
+        Brackets without a sign change give NaN and are not converged.
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    a = a.astype(float).ravel()
+    b = b.astype(float).ravel()
+    fa = np.broadcast_to(np.asarray(f(a), dtype=float), a.shape).copy()
+    fb = np.broadcast_to(np.asarray(f(b), dtype=float), b.shape)
+    
+    valid = fa * fb <= 0
+    exact = np.zeros(a.shape, dtype=bool)
+    roots = np.full(a.shape, np.nan)
+    iterations = np.zeros(a.shape, dtype=int)
+    
+    for _ in range(max_iter):
+        active = valid & ~exact & ((b - a) / 2 > tol)
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        c = (a[idx] + b[idx]) / 2
+        fc = np.broadcast_to(np.asarray(f(c), dtype=float), c.shape)
+        
+        hit = fc == 0
+        roots[idx[hit]] = c[hit]
+        exact[idx[hit]] = True
+        
+        left = ~hit & (fa[idx] * fc < 0)
+        right = ~hit & ~left
+        b[idx[left]] = c[left]
+        a[idx[right]] = c[right]
+        fa[idx[right]] = fc[right]
+        iterations[idx[~hit]] += 1
+    
+    done = valid & ~exact
+    roots[done] = (a[done] + b[done]) / 2
+    converged = valid & (exact | ((b - a) / 2 <= tol))
+    return roots, iterations, converged
+
+def newton_raphson_batch(f: Callable[[np.ndarray], np.ndarray], df: Callable[[np.ndarray], np.ndarray],
+                         x0: np.ndarray, tol: float = 1e-6,
+                         max_iter: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run the Newton-Raphson method from many starting points at once.
+    
+    Args:
+        f: Vectorized function to find the roots of
+        df: Vectorized derivative of the function
+        x0: Array of initial guesses
+        tol: Tolerance for convergence
+        max_iter: Maximum number of iterations
+        
+    Returns:
+        Tuple containing (root approximations, iterations per lane, converged mask).
+        Lanes that hit a near-zero derivative stop there and are not converged.
+    """
+    x = np.array(x0, dtype=float).ravel()
+    iterations = np.zeros(x.shape, dtype=int)
+    converged = np.zeros(x.shape, dtype=bool)
+    failed = np.zeros(x.shape, dtype=bool)
+    
+    for _ in range(max_iter):
+        idx = np.flatnonzero(~converged & ~failed)
+        if len(idx) == 0:
+            break
+        xi = x[idx]
+        fx = np.broadcast_to(np.asarray(f(xi), dtype=float), xi.shape)
+        dfx = np.broadcast_to(np.asarray(df(xi), dtype=float), xi.shape)
+        
+        # Avoid division by zero
+        flat = np.abs(dfx) < 1e-10
+        failed[idx[flat]] = True
+        
+        step = ~flat
+        x_new = xi[step] - fx[step] / dfx[step]
+        moved = idx[step]
+        done = np.abs(x_new - xi[step]) < tol
+        x[moved] = x_new
+        converged[moved[done]] = True
+        iterations[moved[~done]] += 1
+    
+    return x, iterations, converged
+
+def secant_batch(f: Callable[[np.ndarray], np.ndarray], x0: np.ndarray, x1: np.ndarray,
+                 tol: float = 1e-6, max_iter: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run the secant method from many pairs of starting points at once.
+    
+    Args:
+        f: Vectorized function to find the roots of
+        x0: Array of first initial guesses
+        x1: Array of second initial guesses
+        tol: Tolerance for convergence
+        max_iter: Maximum number of iterations
+        
+    Returns:
+        Tuple containing (root approximations, iterations per lane, converged mask).
+        Lanes whose function values become too close stop there and are not converged.
+    """
+    x0, x1 = np.broadcast_arrays(np.asarray(x0, dtype=float), np.asarray(x1, dtype=float))
+    x0 = x0.astype(float).ravel()
+    x1 = x1.astype(float).ravel()
+    f0 = np.broadcast_to(np.asarray(f(x0), dtype=float), x0.shape).copy()
+    f1 = np.broadcast_to(np.asarray(f(x1), dtype=float), x1.shape).copy()
+    iterations = np.zeros(x0.shape, dtype=int)
+    converged = np.zeros(x0.shape, dtype=bool)
+    failed = np.zeros(x0.shape, dtype=bool)
+    
+    for _ in range(max_iter):
+        idx = np.flatnonzero(~converged & ~failed)
+        if len(idx) == 0:
+            break
+        denom = f1[idx] - f0[idx]
+        
+        # Avoid division by (almost) zero
+        flat = np.abs(denom) < 1e-10
+        failed[idx[flat]] = True
+        
+        idx = idx[~flat]
+        x_new = x1[idx] - f1[idx] * (x1[idx] - x0[idx]) / denom[~flat]
+        done = np.abs(x_new - x1[idx]) < tol
         
+        x0[idx] = x1[idx]
+        f0[idx] = f1[idx]
+        x1[idx] = x_new
+        converged[idx[done]] = True
+        
+        # Only lanes that keep going need the new function value
+        going = idx[~done]
+        f1[going] = np.broadcast_to(np.asarray(f(x1[going]), dtype=float), going.shape)
+        iterations[going] += 1
+    
+    return x1, iterations, converged
+
+class BarycentricInterpolator:
+    """
+    Lagrange interpolating polynomial in barycentric form.
+    
+    The weights are computed once, evaluation is O(n) per x and works on
+    whole arrays, and adding or removing a point updates the weights in O(n)
+    instead of rebuilding them.
+    """
+    
+    def __init__(self, points: List[Tuple[float, float]] = ()):
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.weights = np.zeros(0)
+        # Weights are only defined up to a common factor; they are stored
+        # rescaled to a maximum of 1 and log_factor tracks the rescaling, so
+        # large point sets neither overflow nor underflow
+        self.log_factor = 0.0
+        self.scale = max([abs(p[0]) for p in points] + [1.0])
+        
+        if len(points):
+            x = np.array([p[0] for p in points], dtype=float)
+            if len(np.unique(x)) != len(x):
+                raise ValueError("Interpolation points must have distinct x values")
+            diffs = (x[:, None] - x[None, :]) / self.scale
+            np.fill_diagonal(diffs, 1.0)
+            log_abs = np.log(np.abs(diffs)).sum(axis=1)
+            sign = np.prod(np.sign(diffs), axis=1)
+            self.x = x
+            self.y = np.array([p[1] for p in points], dtype=float)
+            self.weights = sign * np.exp(log_abs.min() - log_abs)
+            self.log_factor = log_abs.min()
+    
+    def __len__(self):
+        return len(self.x)
+    
+    def _normalize(self):
+        """Rescale the weights so the largest has magnitude 1"""
+        if len(self.weights):
+            largest = np.abs(self.weights).max()
+            self.weights /= largest
+            self.log_factor -= np.log(largest)
+    
+    def add_point(self, x: float, y: float):
+        """Add an interpolation point in O(n)"""
+        if np.any(self.x == x):
+            raise ValueError("Interpolation points must have distinct x values")
+        diffs = (self.x - x) / self.scale
+        new_weight = np.prod(-np.sign(diffs)) * np.exp(self.log_factor - np.log(np.abs(diffs)).sum())
+        self.weights = np.append(self.weights / diffs, new_weight)
+        self.x = np.append(self.x, float(x))
+        self.y = np.append(self.y, float(y))
+        self._normalize()
+    
+    def remove_point(self, x: float):
+        """Remove the interpolation point at x in O(n)"""
+        matches = np.flatnonzero(self.x == x)
+        if len(matches) == 0:
+            raise ValueError(f"No interpolation point at x={x}")
+        k = matches[0]
+        keep = np.arange(len(self.x)) != k
+        self.weights = self.weights[keep] * ((self.x[keep] - self.x[k]) / self.scale)
+        self.x = self.x[keep]
+        self.y = self.y[keep]
+        self._normalize()
+    
+    def __call__(self, x):
+        """Evaluate the polynomial at a scalar or an array of x values"""
+        x_arr = np.asarray(x, dtype=float)
+        if len(self.x) == 0:
+            return np.zeros_like(x_arr) if x_arr.ndim else 0.0
+        
+        flat = x_arr.reshape(-1)
+        diffs = flat[:, None] - self.x[None, :]
+        exact = diffs == 0
+        diffs[exact] = 1.0  # Avoid division by zero, fixed up below
+        terms = self.weights / diffs
+        result = (terms @ self.y) / terms.sum(axis=1)
+        
+        # At an interpolation point the formula is 0/0 - use the point's y
+        hit_rows, hit_cols = np.nonzero(exact)
+        result[hit_rows] = self.y[hit_cols]
+        
+        if x_arr.ndim == 0:
+            return float(result[0])
+        return result.reshape(x_arr.shape)
+
+def find_roots_in_samples(f: Callable[[np.ndarray], np.ndarray], x: np.ndarray, y: np.ndarray = None,
+                          tol: float = 1e-6, merge_tol: float = None) -> np.ndarray:
+    """
+    Find every root of a function that shows up on a sampled grid.
+    
+    Sign changes between neighbouring samples are found in one vectorized
+    scan, all of the brackets are refined together with bisection_batch and
+    roots closer together than merge_tol are merged.
+    
+    Args:
+        f: Vectorized function to find the roots of
+        x: Sorted sample x values
+        y: Function values at x (computed if not given)
+        tol: Tolerance for refining each root
+        merge_tol: Roots closer than this are treated as one (default: a
+            thousandth of the sample spacing)
+        
+    Returns:
+        Sorted array of roots. Sign changes caused by poles (where the
+        function blows up instead of crossing zero) and stretches where the
+        function is zero are left out.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.broadcast_to(np.asarray(f(x) if y is None else y, dtype=float), x.shape)
+    if len(x) < 2:
+        return np.zeros(0)
+    if merge_tol is None:
+        merge_tol = (x[-1] - x[0]) / (len(x) - 1) * 1e-3
+    
+    finite = np.isfinite(y)
+    
+    # Samples that hit zero exactly, unless the function is zero over a
+    # whole stretch (e.g. a flat line on the axis)
+    zero = finite & (y == 0)
+    next_zero = np.append(zero[1:], False)
+    prev_zero = np.insert(zero[:-1], 0, False)
+    exact = x[zero & ~next_zero & ~prev_zero]
+    
+    left, right = y[:-1], y[1:]
+    crossing = finite[:-1] & finite[1:] & (left * right < 0)
+    idx = np.flatnonzero(crossing)
+    roots, _, converged = bisection_batch(f, x[idx], x[idx + 1], tol=tol)
+    
+    # A pole flips sign too, but the function is large there instead of ~0
+    bound = np.maximum(np.abs(left[idx]), np.abs(right[idx]))
+    value = np.abs(np.broadcast_to(np.asarray(f(roots), dtype=float), roots.shape)) if len(roots) else roots
+    roots = roots[converged & (value <= bound)]
+    
+    roots = np.sort(np.concatenate((exact, roots)))
+    if len(roots) > 1:
+        keep = np.concatenate(([True], np.diff(roots) > merge_tol))
+        roots = roots[keep]
+    return roots
+
+@lru_cache(maxsize=256)
+def _real_roots_cached(coefficients: Tuple[float, ...], scale: float) -> Tuple[float, ...]:
+    """Real roots of a polynomial in x / scale (cached per coefficient set)"""
+    coeffs = np.array(coefficients, dtype=float)
+    
+    # Drop leading coefficients that are zero (or negligible)
+    nonzero = np.flatnonzero(np.abs(coeffs) > np.finfo(float).eps * np.abs(coeffs).max(initial=0.0))
+    if len(nonzero) == 0:
+        return ()
+    coeffs = coeffs[nonzero[0]:]
+    degree = len(coeffs) - 1
+    if degree < 1:
+        return ()
+    
+    # Companion matrix of the monic polynomial - its eigenvalues are the roots
+    companion = np.zeros((degree, degree))
+    companion[0, :] = -coeffs[1:] / coeffs[0]
+    companion[1:, :-1] = np.eye(degree - 1)
+    eigenvalues = np.linalg.eigvals(companion)
+    
+    real = eigenvalues[np.abs(eigenvalues.imag) <= 1e-7 * np.maximum(1.0, np.abs(eigenvalues))].real
+    return tuple(np.sort(real) * scale)
+
+def polynomial_roots(coefficients: np.ndarray, scale: float = None) -> np.ndarray:
+    """
+    Find all real roots of a polynomial with one eigenvalue solve.
+    
+    The roots are the eigenvalues of the companion matrix. The polynomial
+    is first rescaled to x = scale * t so its coefficients are balanced,
+    which keeps the eigenvalue problem well conditioned for x values in the
+    hundreds. Results are cached per coefficient set.
+    
+    Args:
+        coefficients: Polynomial coefficients, highest power first (np.polyfit order)
+        scale: Domain scale (estimated from the coefficients if not given)
+        
+    Returns:
+        Sorted array of real roots
+    """
+    coeffs = np.trim_zeros(np.asarray(coefficients, dtype=float), "f")
+    degree = len(coeffs) - 1
+    if degree < 1:
+        return np.zeros(0)
+    
+    if scale is None:
+        # Fujiwara bound on the root magnitudes
+        ratios = np.abs(coeffs[1:] / coeffs[0]) ** (1.0 / np.arange(1, degree + 1))
+        scale = max(2 * ratios.max(), 1e-12)
+    
+    scaled = coeffs * scale ** np.arange(degree, -1, -1)
+    return np.array(_real_roots_cached(tuple(scaled), float(scale)))
+
+def polynomial_extrema(coefficients: np.ndarray, scale: float = None) -> np.ndarray:
+    """Get the x values of all local extrema (real roots of the derivative)"""
+    return polynomial_roots(np.polyder(np.asarray(coefficients, dtype=float)), scale)
+
+def polynomial_inflection_points(coefficients: np.ndarray, scale: float = None) -> np.ndarray:
+    """Get the x values of all inflection points (real roots of the second derivative)"""
+    return polynomial_roots(np.polyder(np.asarray(coefficients, dtype=float), 2), scale)
+
+class FitResult:
+    """
+    Result of a least-squares polynomial fit: the coefficients, residual
+    statistics and the fitted polynomial itself (instances are callable).
+    
+    The polynomial is stored in t = (x - center) / scale, which keeps it
+    accurate for data far from x = 0.
+    """
+    
+    def __init__(self, scaled_coefficients: np.ndarray, scale: float, n: int, sse: float, sst: float,
+                 center: float = 0.0):
+        self.scaled_coefficients = scaled_coefficients  # Highest power first, in (x - center) / scale
+        self.scale = scale
+        self.center = center
+        self.degree = len(scaled_coefficients) - 1
+        self.n = n
+        self.sse = max(sse, 0.0)
+        self.rmse = np.sqrt(self.sse / n) if n else 0.0
+        self.r_squared = 1.0 - self.sse / sst if sst > 0 else 1.0
+        
+        # Coefficients in the original x units, in np.polyfit order
+        expanded = np.poly1d([0.0])
+        t = np.poly1d([1.0 / scale, -center / scale])
+        for c in scaled_coefficients:
+            expanded = expanded * t + c
+        self.coefficients = np.concatenate((np.zeros(self.degree + 1 - len(expanded.coeffs)), expanded.coeffs))
+    
+    def __call__(self, x):
+        """Evaluate the polynomial (in scaled x for accuracy)"""
+        return np.polyval(self.scaled_coefficients, (np.asarray(x, dtype=float) - self.center) / self.scale)
+    
+    def _roots(self, coefficients: np.ndarray) -> np.ndarray:
+        """Real roots of a polynomial in t, mapped back to x"""
+        return self.center + polynomial_roots(coefficients, 1.0) * self.scale
+    
+    def roots(self) -> np.ndarray:
+        """Get all real roots of the fitted polynomial"""
+        return self._roots(self.scaled_coefficients)
+    
+    def extrema(self) -> np.ndarray:
+        """Get the x values of the local extrema of the fitted polynomial"""
+        return self._roots(np.polyder(self.scaled_coefficients))
+    
+    def inflection_points(self) -> np.ndarray:
+        """Get the x values of the inflection points of the fitted polynomial"""
+        return self._roots(np.polyder(self.scaled_coefficients, 2))
+
+def fit_polynomial(x: np.ndarray, y: np.ndarray, degree: int) -> FitResult:
+    """
+    Least-squares polynomial fit of a set of points in one go (like np.polyfit).
+    
+    x is centred on its mean and scaled by its half-range before the
+    Vandermonde matrix is built, so the fit stays accurate wherever the
+    data lies, and the residuals give the exact sum of squared errors.
+    
+    Args:
+        x: x-coordinates
+        y: y-coordinates
+        degree: Polynomial degree
+        
+    Returns:
+        FitResult with the coefficients, residual statistics and callable
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < 1:
+        raise ValueError("Need at least 1 point to fit a curve")
+    center = float(x.mean())
+    scale = max(float(np.abs(x - center).max()), 1e-12)
+    vander = np.vander((x - center) / scale, degree + 1)
+    coeffs = np.linalg.lstsq(vander, y, rcond=None)[0]
+    residuals = vander @ coeffs - y
+    sst = float(((y - y.mean()) ** 2).sum())
+    return FitResult(coeffs, scale, len(x), float(residuals @ residuals), sst, center)
+
+class PolynomialFitter:
+    """
+    Incremental least-squares polynomial fitter.
+    
+    Keeps running power sums of the points (the normal-equation factors for
+    every degree up to max_degree), so adding or removing a point is an
+    O(max_degree) update rather than a full refit, and fitting any degree
+    only solves a small (degree + 1) square system built from the sums.
+    
+    The sums are of t = (x - center) / scale; center and scale should put
+    the data in about [-1, 1] (the middle and half-width of its x-range),
+    otherwise high degrees lose accuracy.
+    """
+    
+    def __init__(self, points: List[Tuple[float, float]] = (), max_degree: int = 10, scale: float = 1.0,
+                 center: float = 0.0):
+        self.max_degree = max_degree
+        self.scale = scale  # x is shifted by center and divided by scale to keep the sums well conditioned
+        self.center = center
+        self.n = 0
+        self.x_moments = np.zeros(2 * max_degree + 1)  # sum of x^k
+        self.xy_moments = np.zeros(max_degree + 1)     # sum of y * x^k
+        self.y_sum = 0.0
+        self.y_sq_sum = 0.0
+        self._results = {}  # Fit results by degree for the current points
+        
+        if len(points):
+            x = np.array([p[0] for p in points], dtype=float)
+            y = np.array([p[1] for p in points], dtype=float)
+            self._update(x, y, 1.0)
+    
+    def _update(self, x: np.ndarray, y: np.ndarray, sign: float):
+        """Add (sign=1) or remove (sign=-1) points from the running sums"""
+        # Build the powers one at a time so only a single column is ever held
+        power = np.ones_like(x)
+        x = (x - self.center) / self.scale
+        for k in range(2 * self.max_degree + 1):
+            self.x_moments[k] += sign * power.sum()
+            if k <= self.max_degree:
+                self.xy_moments[k] += sign * (y @ power)
+            power *= x
+        self.y_sum += sign * y.sum()
+        self.y_sq_sum += sign * (y @ y)
+        self.n += int(sign) * len(x)
+        self._results = {}
+        
+        if self.n == 0:
+            # Start from exact zeros again instead of accumulated rounding
+            self.x_moments[:] = 0
+            self.xy_moments[:] = 0
+            self.y_sum = self.y_sq_sum = 0.0
+    
+    def add_point(self, x: float, y: float):
+        """Add a point to the fit"""
+        self._update(np.array([x], dtype=float), np.array([y], dtype=float), 1.0)
+    
+    def remove_point(self, x: float, y: float):
+        """Remove a previously added point from the fit"""
+        self._update(np.array([x], dtype=float), np.array([y], dtype=float), -1.0)
+    
+    def add_points(self, x: np.ndarray, y: np.ndarray, chunk_size: int = 1 << 18):
+        """
+        Add many points to the fit.
+        
+        Args:
+            x: x-coordinates (any array-like, including a memory-mapped column)
+            y: y-coordinates
+            chunk_size: Number of points folded into the sums at a time
+        """
+        for start in range(0, len(x), chunk_size):
+            self._update(np.asarray(x[start:start + chunk_size], dtype=float),
+                         np.asarray(y[start:start + chunk_size], dtype=float), 1.0)
+    
+    def fit(self, degree: int = 2, points: List[Tuple[float, float]] = None) -> FitResult:
+        """
+        Fit a polynomial of the given degree to the current points.
+        
+        Args:
+            degree: Polynomial degree (at most max_degree)
+            points: The points in the fit, if they are at hand - the sum of
+                squared errors is then taken from the residuals instead of
+                the power sums, which lose accuracy to cancellation
+            
+        Returns:
+            FitResult with the coefficients, residual statistics and callable
+        """
+        if degree > self.max_degree:
+            raise ValueError(f"Degree must be at most {self.max_degree}")
+        if self.n < 1:
+            raise ValueError("Need at least 1 point to fit a curve")
+        key = (degree, points is not None)
+        if key in self._results:
+            return self._results[key]
+        
+        # Normal equations G c = b with G[i][j] = sum x^(i+j), lowest power first
+        k = np.arange(degree + 1)
+        gram = self.x_moments[k[:, None] + k[None, :]]
+        rhs = self.xy_moments[:degree + 1]
+        try:
+            coeffs = np.linalg.solve(gram, rhs)
+        except np.linalg.LinAlgError:
+            # Fewer distinct points than coefficients - take the minimum norm solution
+            coeffs = np.linalg.lstsq(gram, rhs, rcond=None)[0]
+        
+        sst = self.y_sq_sum - self.y_sum ** 2 / self.n
+        if points is not None:
+            points = np.asarray(points, dtype=float).reshape(-1, 2)
+            residuals = np.polyval(coeffs[::-1], (points[:, 0] - self.center) / self.scale) - points[:, 1]
+            sse = residuals @ residuals
+        else:
+            sse = self.y_sq_sum - 2 * (coeffs @ rhs) + coeffs @ gram @ coeffs
+        result = FitResult(coeffs[::-1], self.scale, self.n, sse, sst, self.center)
+        self._results[key] = result
         return result
+
+def cross_validate_degree(points: List[Tuple[float, float]], max_degree: int = 10,
+                          folds: int = 5) -> Tuple[int, np.ndarray]:
+    """
+    Choose a least-squares polynomial degree by k-fold cross-validation.
+    
+    Every degree from 1 to max_degree and every fold is fitted in one batch:
+    a single Chebyshev-Vandermonde matrix gives the normal equations of each
+    fold, lower degrees are the leading blocks of those systems, and all of
+    them are solved by one stacked solve.
+    
+    Args:
+        points: List of (x, y) coordinate pairs
+        max_degree: Highest degree to consider
+        folds: Number of folds (reduced when there are fewer points)
+        
+    Returns:
+        Tuple containing (chosen degree, mean squared validation error for
+        degrees 1..max_degree, inf where a degree has too few points)
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    order = np.argsort(points[:, 0], kind="stable")
+    x, y = points[order, 0], points[order, 1]
+    n = len(x)
+    folds = min(folds, n)
+    errors = np.full(max_degree, np.inf)
+    if folds < 2:
+        return 1, errors
+    
+    # Map x onto [-1, 1] so the Chebyshev basis stays well conditioned
+    center = (x.max() + x.min()) / 2
+    half_width = max((x.max() - x.min()) / 2, 1e-12)
+    vander = np.polynomial.chebyshev.chebvander((x - center) / half_width, max_degree)
+    
+    # Interleave folds along x so each one spans the whole range
+    fold = np.arange(n) % folds
+    one_hot = np.eye(folds)[fold]
+    gram = vander.T @ vander
+    rhs = vander.T @ y
+    train_gram = gram - np.einsum("nf,ni,nj->fij", one_hot, vander, vander)
+    train_rhs = rhs - np.einsum("nf,ni,n->fi", one_hot, vander, y)
+    
+    # One (degree, fold) system per entry; unused basis functions get an
+    # identity block so their coefficients come out as zero
+    size = max_degree + 1
+    degrees = np.arange(1, max_degree + 1)
+    used = np.arange(size)[None, :] <= degrees[:, None]
+    mask = used[:, :, None] & used[:, None, :]
+    systems = np.where(mask[:, None], train_gram[None], np.eye(size))
+    rhs_all = np.where(used[:, None], train_rhs[None], 0.0)
+    try:
+        coeffs = np.linalg.solve(systems, rhs_all[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        coeffs = (np.linalg.pinv(systems) @ rhs_all[..., None])[..., 0]
+    
+    # Predict every point from the fit that did not see it
+    predictions = np.einsum("ni,dni->dn", vander, coeffs[:, fold])
+    squared = (predictions - y) ** 2
+    errors = squared.mean(axis=1)
+    fold_sizes = np.bincount(fold, minlength=folds)
+    fold_errors = (squared @ one_hot) / fold_sizes
+    
+    # A degree needs more training points than coefficients in every fold
+    valid = degrees + 1 <= n - fold_sizes.max()
+    errors[~valid] = np.inf
+    if not valid.any():
+        return 1, errors
+    
+    # One-standard-error rule: take the lowest degree whose error is within
+    # one standard error of the best, so noise alone can't add wiggles
+    best = np.argmin(errors)
+    std_error = fold_errors[best].std(ddof=1) / np.sqrt(folds)
+    return int(degrees[np.argmax(errors <= errors[best] + std_error)]), errors
+
+def solve_tridiagonal(lower: np.ndarray, diag: np.ndarray, upper: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Solve a tridiagonal linear system by cyclic reduction.
     
-    return lagrange_polynomial
+    Each round eliminates every other unknown with whole-array operations,
+    halving the system, so an n-point system takes log2(n) vectorized
+    rounds instead of an n-step Python loop. Like the Thomas algorithm it
+    needs no pivoting for diagonally dominant systems (such as splines).
+    
+    Args:
+        lower: Sub-diagonal (length n - 1)
+        diag: Main diagonal (length n)
+        upper: Super-diagonal (length n - 1)
+        rhs: Right-hand side (length n)
+        
+    Returns:
+        Solution vector
+    """
+    diag = np.asarray(diag, dtype=float)
+    # Equation i: a[i] x[i-1] + b[i] x[i] + c[i] x[i+1] = d[i], with a[0] = c[n-1] = 0
+    a = np.concatenate(([0.0], np.asarray(lower, dtype=float)))
+    c = np.concatenate((np.asarray(upper, dtype=float), [0.0]))
+    return _cyclic_reduction(a, diag, c, np.asarray(rhs, dtype=float))
+
+def _cyclic_reduction(a: np.ndarray, b: np.ndarray, c: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """One round of cyclic reduction, recursing on the even-numbered equations"""
+    n = len(b)
+    if n == 1:
+        return d / b
+    
+    # Pad with identity equations so every even equation has two neighbours
+    a_pad = np.concatenate(([0.0], a, [0.0, 0.0]))
+    b_pad = np.concatenate(([1.0], b, [1.0, 1.0]))
+    c_pad = np.concatenate(([0.0], c, [0.0, 0.0]))
+    d_pad = np.concatenate(([0.0], d, [0.0, 0.0]))
+    i = np.arange(0, n, 2) + 1  # Even equations, in padded indices
+    
+    # Eliminate the odd unknowns from the even equations
+    alpha = -a_pad[i] / b_pad[i - 1]
+    gamma = -c_pad[i] / b_pad[i + 1]
+    x = np.empty(n)
+    x[0::2] = _cyclic_reduction(alpha * a_pad[i - 1],
+                                b_pad[i] + alpha * c_pad[i - 1] + gamma * a_pad[i + 1],
+                                gamma * c_pad[i + 1],
+                                d_pad[i] + alpha * d_pad[i - 1] + gamma * d_pad[i + 1])
+    
+    # Back-substitute the odd unknowns from their even neighbours
+    odd = np.arange(1, n, 2)
+    x_next = np.append(x, 0.0)[np.minimum(odd + 1, n)]
+    x[odd] = (d[odd] - a[odd] * x[odd - 1] - c[odd] * x_next) / b[odd]
+    return x
+
+class CubicSpline:
+    """
+    Natural cubic spline through a set of points.
+    
+    Building it is a single O(n) tridiagonal solve and evaluation finds the
+    interval of every x at once with searchsorted, so it handles tens of
+    thousands of points and stays smooth where high-degree polynomials
+    oscillate. Points sharing an x value are averaged.
+    """
+    
+    def __init__(self, points: List[Tuple[float, float]]):
+        if len(points) < 2:
+            raise ValueError("Need at least 2 points to fit a curve")
+        points = np.asarray(points, dtype=float)
+        x = points[:, 0]
+        y = points[:, 1]
+        
+        # Sort and average duplicate x values
+        x, inverse, counts = np.unique(x, return_inverse=True, return_counts=True)
+        y = np.bincount(inverse, weights=y) / counts
+        if len(x) < 2:
+            raise ValueError("Need at least 2 distinct x values to fit a spline")
+        
+        h = np.diff(x)
+        slopes = np.diff(y) / h
+        
+        # Second derivatives, zero at both ends for a natural spline
+        m = np.zeros(len(x))
+        if len(x) > 2:
+            m[1:-1] = solve_tridiagonal(h[1:-1], 2 * (h[:-1] + h[1:]), h[1:-1], 6 * np.diff(slopes))
+        
+        self.x = x
+        self.y = y
+        self.h = h
+        self.m = m
+    
+    def __call__(self, x):
+        """Evaluate the spline at a scalar or an array of x values"""
+        x_arr = np.asarray(x, dtype=float)
+        i = np.clip(np.searchsorted(self.x, x_arr, side="right") - 1, 0, len(self.x) - 2)
+        h = self.h[i]
+        t_right = self.x[i + 1] - x_arr
+        t_left = x_arr - self.x[i]
+        result = ((self.m[i] * t_right ** 3 + self.m[i + 1] * t_left ** 3) / (6 * h)
+                  + (self.y[i] / h - self.m[i] * h / 6) * t_right
+                  + (self.y[i + 1] / h - self.m[i + 1] * h / 6) * t_left)
+        return float(result) if x_arr.ndim == 0 else result
+
+def polynomial_from_points(points: List[Tuple[float, float]]) -> Callable[[float], float]:
+    """
+    Create a polynomial function that passes through the given points.
+    Uses Lagrange interpolation in barycentric form.
+    
+    Args:
+        points: List of (x, y) coordinate pairs
+        
+    Returns:
+        A function representing the polynomial that passes through the points
+    """
+    return BarycentricInterpolator(points)
 
 def find_best_fit(points: List[Tuple[float, float]], method: str = "least_squares", degree: int = 2) -> Callable[[float], float]:
     """
@@ -147,8 +1159,9 @@ def find_best_fit(points: List[Tuple[float, float]], method: str = "least_square
     
     Args:
         points: List of (x, y) coordinate pairs
-        method: Method to use ('least_squares' or 'lagrange')
-        degree: Polynomial degree for least squares method
+        method: Method to use ('least_squares', 'auto', 'lagrange' or 'spline')
+        degree: Polynomial degree for least squares method ('auto' picks it
+            by cross-validation)
         
     Returns:
         A function representing the best fit curve
@@ -161,11 +1174,10 @@ def find_best_fit(points: List[Tuple[float, float]], method: str = "least_square
     
     if method == "lagrange":
         return polynomial_from_points(points)
+    elif method == "spline":
+        return CubicSpline(points)
     else:  # Default to least squares
+        if method == "auto":
+            degree = cross_validate_degree(points)[0]
         # Polynomial fit using least squares
-        coefficients = np.polyfit(x_vals, y_vals, degree)
-        
-        def polynomial(x):
-            return np.polyval(coefficients, x)
-        
-        return polynomial
\ No newline at end of file
+        return fit_polynomial(x_vals, y_vals, degree)
\ No newline at end of file
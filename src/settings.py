@@ -1,9 +1,7 @@
-import pygame
 from src.levels import get_default_equation, get_default_stars
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()  # Initialize sound mixer
+# Settings are plain constants - importing this module must stay free of
+# side effects (pygame is initialized by main, fonts are loaded in src/fonts.py)
 
 # Window settings
 WIDTH, HEIGHT = 1200, 675
@@ -53,40 +51,23 @@ SOUND_ENABLED = True
 SOUND_VOLUME = 0.5  # 0.0 to 1.0
 UI_SOUND_PATH = "assets/sfx/ui click.mp3"
 STAR_SOUND_PATH = "assets/sfx/star collect.mp3"
+SOUND_CACHE_DIR = ".cache/sfx"  # Decoded samples, so later launches skip MP3 decoding
 
-# Improved font loading
-def load_font(font_name, size):
-    """Attempt to load a font with fallbacks"""
-    try:
-        # Try system font by name
-        available_fonts = pygame.font.get_fonts()
-        
-        # Common fallback options
-        fallbacks = [
-            font_name.lower(),
-            'arial',
-            'freesans',
-            'liberationsans',
-            'dejavu',
-            'ubuntu',
-            None  # None will use the default font
-        ]
-        
-        # Try each font name in the fallbacks list
-        for font in fallbacks:
-            if font is None:
-                return pygame.font.Font(None, size)  # Default pygame font
-            
-            if font.lower() in available_fonts:
-                return pygame.font.SysFont(font, size)
-        
-        # If we get here, use default
-        return pygame.font.Font(None, size)
-    except:
-        # Last resort
-        return pygame.font.Font(None, size)
+# Font settings
+FONT_CACHE_PATH = ".cache/fonts.json"  # Resolved font paths, so later launches skip the system font scan
 
-# Load fonts with proper fallback
-TITLE_FONT = load_font('Arial', 48)
-MAIN_FONT = load_font('Arial', 28)
-SMALL_FONT = load_font('Arial', 22)
\ No newline at end of file
+# Startup budget checked by python -m src.startup_report
+STARTUP_TARGET_MS = 500
+
+# Frame rate settings
+ACTIVE_FPS = 60  # While the ball moves or the player types (0 = uncapped)
+IDLE_FPS = 4     # Most redraws per second on screens that only change on input
+
+# Replay settings
+REPLAY_DIR = "replays"  # Every run is recorded here (disable with --no-record)
+
+# Save settings
+SAVE_DIR = "saves"  # Progress journals, one per level pack (disable with --no-save)
+
+# Level select settings
+LEVELS_PER_PAGE = 5  # Rows drawn on the level select screen at a time
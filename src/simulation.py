@@ -0,0 +1,168 @@
+"""
+Ball simulation for Equation Quest
+
+The stepping rules here are shared by Game.update and the offline tools so
+that both always agree on where the ball goes.
+"""
+import numpy as np
+from src.settings import X_MIN, X_MAX, Y_MIN, Y_MAX, BALL_RADIUS, BALL_SPEED, GRAVITY, STATE_MENU
+
+# Distance between ball centre and star centre at which a star is collected
+COLLECT_RADIUS = BALL_RADIUS + 8
+
+# Ball starts near the left edge and finishes near the right edge
+BALL_START_X = X_MIN + 50
+BALL_END_X = X_MAX - 50
+
+# How strongly the ball is pulled towards the path each step
+PATH_FOLLOW = 0.1
+
+def start_position(path_func):
+    """Get the starting ball position for the given path"""
+    try:
+        return [BALL_START_X, path_func(BALL_START_X)]
+    except Exception:
+        return [BALL_START_X, 0]  # Default to center height
+
+def advance_ball(ball_pos, path_func, ball_speed=BALL_SPEED):
+    """Move the ball one step along the path (updates ball_pos in place)"""
+    ball_pos[0] += ball_speed
+    try:
+        target_y = path_func(ball_pos[0])
+        # Apply some "gravity" effect to make the ball follow the path smoothly
+        ball_pos[1] += (target_y - ball_pos[1]) * PATH_FOLLOW
+    except Exception:
+        # If there's an error evaluating the path, let the ball fall
+        ball_pos[1] -= GRAVITY  # In real coordinates, gravity decreases y
+    return ball_pos
+
+def reached_end(ball_pos):
+    """Check if the ball has reached the right side of the screen"""
+    return ball_pos[0] >= BALL_END_X
+
+def out_of_bounds(ball_pos):
+    """Check if the ball is out of bounds vertically or on the left side"""
+    return ball_pos[0] < X_MIN or ball_pos[1] > Y_MAX or ball_pos[1] < Y_MIN
+
+def star_hit(ball_pos, star):
+    """Check if the ball is close enough to collect a star"""
+    return np.sqrt((ball_pos[0] - star[0])**2 + (ball_pos[1] - star[1])**2) < COLLECT_RADIUS
+
+def run_trajectory(path_func, ball_speed=BALL_SPEED, max_steps=10000):
+    """
+    Run one pass of the ball from the start to the end of the screen.
+
+    Args:
+        path_func: Function giving the path y-coordinate for an x-coordinate
+        ball_speed: Horizontal distance moved per step
+        max_steps: Safety limit on the number of steps
+
+    Returns:
+        Tuple containing (array of ball positions after each step, whether the run finished)
+
+    A run that leaves the screen stops early and is reported as unfinished;
+    in the game the ball would restart from the left edge instead.
+    """
+    ball_pos = start_position(path_func)
+    positions = []
+
+    for _ in range(max_steps):
+        advance_ball(ball_pos, path_func, ball_speed)
+        positions.append((float(ball_pos[0]), float(ball_pos[1])))
+
+        if reached_end(ball_pos):
+            return np.array(positions, dtype=float), True
+        if out_of_bounds(ball_pos):
+            break
+
+    return np.array(positions, dtype=float).reshape(-1, 2), False
+
+def star_clearance(stars, positions):
+    """
+    Get how close a run of the ball comes to each star.
+
+    Args:
+        stars: (S, 2) array of star positions
+        positions: (N, 2) array of ball positions from run_trajectory
+
+    Returns:
+        Array with the closest approach of the ball centre to each star
+        (a star is collected when this is below COLLECT_RADIUS)
+    """
+    if len(positions) == 0:
+        return np.full(len(stars), np.inf)
+    # Distance from every star to every ball position in one go
+    diffs = stars[:, None, :] - positions[None, :, :]
+    return np.sqrt((diffs ** 2).sum(axis=2)).min(axis=1)
+
+class SimState:
+    """
+    Simulation part of the game state, kept apart from UI state and sound
+    handles so it can be copied and restored cheaply.
+    """
+    __slots__ = (
+        "game_state",
+        "current_level",
+        "is_free_mode",
+        "current_equation",
+        "has_attempted",
+        "ball_pos",
+        "ball_speed",
+        "on_path",
+        "reset_ball",
+        "level_completed",
+        "stars",
+        "total_stars",
+        "collected_stars"
+    )
+
+    def __init__(self, game_state=STATE_MENU, current_level=0):
+        self.game_state = game_state
+        self.current_level = current_level
+        self.is_free_mode = False
+        self.current_equation = ""
+        self.has_attempted = False
+        self.ball_pos = [-350, 0]  # Start position left side in real coordinates
+        self.ball_speed = BALL_SPEED
+        self.on_path = False
+        self.reset_ball = True
+        self.level_completed = False
+        self.stars = []
+        self.total_stars = 0
+        self.collected_stars = 0
+
+    def snapshot(self):
+        """Get an immutable copy of the state (a plain tuple)"""
+        return (
+            self.game_state,
+            self.current_level,
+            self.is_free_mode,
+            self.current_equation,
+            self.has_attempted,
+            tuple(self.ball_pos),
+            self.ball_speed,
+            self.on_path,
+            self.reset_ball,
+            self.level_completed,
+            tuple(self.stars),
+            self.total_stars,
+            self.collected_stars
+        )
+
+    def restore(self, snapshot):
+        """Restore the state from a snapshot() tuple"""
+        (self.game_state,
+         self.current_level,
+         self.is_free_mode,
+         self.current_equation,
+         self.has_attempted,
+         ball_pos,
+         self.ball_speed,
+         self.on_path,
+         self.reset_ball,
+         self.level_completed,
+         stars,
+         self.total_stars,
+         self.collected_stars) = snapshot
+        self.ball_pos = list(ball_pos)
+        self.stars = list(stars)
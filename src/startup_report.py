@@ -0,0 +1,63 @@
+"""
+Startup time report for Equation Quest
+
+Imports each module in a fresh interpreter and reports how long it took,
+then times a full cold start (pygame init, game modules and the first font)
+against STARTUP_TARGET_MS.
+
+Usage:
+    python -m src.startup_report
+"""
+import os
+import sys
+import subprocess
+from src.settings import STARTUP_TARGET_MS
+
+MODULES = [
+    "src.settings",
+    "src.levels",
+    "src.utils",
+    "src.rootfinding",
+    "src.simulation",
+    "src.game",
+    "src.ui"
+]
+
+# Everything main() does before the first frame, apart from opening the window
+COLD_START = """
+import pygame
+pygame.init()
+import src.game, src.ui
+src.game.Game()
+src.ui.MAIN_FONT.size("x")
+"""
+
+def time_code(code):
+    """Run code in a fresh interpreter and return the time it took in ms"""
+    timer = (
+        "import time\n"
+        "_start = time.perf_counter()\n"
+        f"exec({code!r})\n"
+        "print('elapsed_ms', (time.perf_counter() - _start) * 1000)\n"
+    )
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run([sys.executable, "-c", timer], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    for line in result.stdout.splitlines():
+        if line.startswith("elapsed_ms "):
+            return float(line.split()[1])
+    raise RuntimeError("No timing output")
+
+def main():
+    print("Import times (fresh interpreter each):")
+    for module in MODULES:
+        print(f"  {module:<18} {time_code(f'import {module}'):8.1f} ms")
+
+    cold_start = time_code(COLD_START)
+    status = "OK" if cold_start <= STARTUP_TARGET_MS else "OVER TARGET"
+    print(f"Cold start: {cold_start:.1f} ms (target {STARTUP_TARGET_MS} ms) {status}")
+    return 0 if cold_start <= STARTUP_TARGET_MS else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,14 @@ import pygame.gfxdraw
 import numpy as np
 import math 
 from src.settings import *
-from src.utils import real_to_screen, screen_to_real
+from src.fonts import TITLE_FONT, MAIN_FONT, SMALL_FONT
+from src.viewport import Viewport, SAMPLE_PIXELS
+
+# The standard 1:1 view, used when a drawing function isn't given one
+STANDARD_VIEW = Viewport()
+
+# Screen points of the last curve drawn (grown as needed, see _screen_points)
+_point_buffer = np.empty((0, 2), dtype=np.int32)
 
 def draw_text(screen, text, position, color=NEON_GREEN, font_to_use=MAIN_FONT, glow_effect=False):
     """Draw text with optional glow effect"""
@@ -42,63 +49,161 @@ def draw_panel(screen, rect, border_color=NEON_BLUE, fill_color=DARKER_BLUE, alp
     # Draw main border
     pygame.draw.rect(screen, border_color, rect, 2)
 
-def draw_path(screen, path_func, color=NEON_BLUE):
-    """Draw the equation path with neon glow effect - updated for real coordinates"""
-    # Generate x values across the real coordinate space
-    x_vals = np.linspace(X_MIN, X_MAX, 400)
+def _screen_points(view, x_vals, y_vals):
+    """Convert curve samples to screen points, reusing one int32 buffer between calls"""
+    global _point_buffer
+    if len(_point_buffer) < len(x_vals):
+        _point_buffer = np.empty((len(x_vals), 2), dtype=np.int32)
+    return view.to_screen_array(x_vals, y_vals, out=_point_buffer[:len(x_vals)])
+
+def _visible_runs(points):
+    """Split screen points into unbroken runs that stay on screen"""
+    inside = ((points[:, 0] >= 0) & (points[:, 0] < WIDTH) &
+              (points[:, 1] >= 0) & (points[:, 1] < HEIGHT))
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], inside.view(np.int8), [0]))))
+    return [points[start:end] for start, end in zip(edges[::2], edges[1::2]) if end - start >= 2]
+
+def draw_path(screen, path_func, color=NEON_BLUE, view=STANDARD_VIEW, samples=None):
+    """Draw the equation path with neon glow effect - updated for real coordinates
     
+    samples can be (x values, y values) already sampled for the view (see
+    Game.sample_path); otherwise the visible x-range is sampled here.
+    Returns the sampled (x values, y values) so overlays can reuse them
+    """
     try:
-        # Calculate y values using the equation function
-        y_vals = [path_func(x) for x in x_vals]
+        if samples is not None:
+            x_vals, y_vals = samples
+        else:
+            # Sample the visible x-range at the same density as the tile cache
+            x_min, x_max = view.x_range()
+            x_vals = np.linspace(x_min, x_max, WIDTH // SAMPLE_PIXELS + 1)
+            # Calculate y values using the equation function, for the whole
+            # array at once when the function supports it
+            try:
+                y_vals = np.broadcast_to(np.asarray(path_func(x_vals), dtype=float), x_vals.shape)
+            except Exception:
+                y_vals = [path_func(x) for x in x_vals]
         
-        # Convert real coordinates to screen coordinates for drawing
-        screen_points = [real_to_screen(x_vals[i], y_vals[i]) for i in range(len(x_vals))]
+        # Convert real coordinates to screen coordinates for drawing, and
+        # only draw the parts of the curve that are on screen
+        runs = _visible_runs(_screen_points(view, x_vals, y_vals))
         
         # Draw glow effect (wider line underneath)
-        for i in range(len(screen_points) - 1):
-            screen_x1, screen_y1 = screen_points[i]
-            screen_x2, screen_y2 = screen_points[i + 1]
-            
-            # Check if points are within screen bounds before drawing
-            if (0 <= screen_x1 < WIDTH and 0 <= screen_y1 < HEIGHT and
-                0 <= screen_x2 < WIDTH and 0 <= screen_y2 < HEIGHT):
-                # Draw glow (thick line)
-                pygame.draw.line(screen, (*color[:3], 100), 
-                                (int(screen_x1), int(screen_y1)), 
-                                (int(screen_x2), int(screen_y2)), 4)
+        for run in runs:
+            pygame.draw.lines(screen, (*color[:3], 100), False, run, 4)
         
         # Draw main line (thin bright line)
-        for i in range(len(screen_points) - 1):
-            screen_x1, screen_y1 = screen_points[i]
-            screen_x2, screen_y2 = screen_points[i + 1]
-            
-            if (0 <= screen_x1 < WIDTH and 0 <= screen_y1 < HEIGHT and
-                0 <= screen_x2 < WIDTH and 0 <= screen_y2 < HEIGHT):
-                pygame.draw.line(screen, color, 
-                                (int(screen_x1), int(screen_y1)), 
-                                (int(screen_x2), int(screen_y2)), 2)
+        for run in runs:
+            pygame.draw.lines(screen, color, False, run, 2)
+        
+        return x_vals, np.asarray(y_vals, dtype=float)
     except Exception as e:
         print(f"Error drawing path: {e}")
+        return None
+
+def draw_preview_curve(screen, x_vals, y_vals, color=(30, 120, 15), view=STANDARD_VIEW):
+    """Draw a dim ghost curve for the equation being typed (y values may contain NaN gaps)"""
+    for run in _visible_runs(_screen_points(view, x_vals, y_vals)):
+        pygame.draw.lines(screen, color, False, run, 2)
+
+def _format_error(value):
+    """Format a residual stat for the overlay legend"""
+    if value is None:
+        return "-"
+    return f"{value:.3g}" if abs(value) < 1e5 else f"{value:.1e}"
+
+def draw_fit_overlay(screen, curves, view=STANDARD_VIEW):
+    """Draw every fitting method's curve with a legend of their residuals at the points
+    
+    curves is the list returned by Game.overlay_curves()
+    """
+    for label, color, x_vals, y_vals, stats in curves:
+        draw_path(screen, None, color, view, samples=(x_vals, y_vals))
+    
+    if not curves:
+        return
+    legend_panel = (WIDTH - 370, 75, 360, 45 + 25 * len(curves))
+    draw_panel(screen, legend_panel, NEON_PURPLE)
+    draw_text(screen, "Method", (WIDTH - 355, 85), WHITE, SMALL_FONT)
+    draw_text(screen, "RMS error", (WIDTH - 190, 85), WHITE, SMALL_FONT)
+    draw_text(screen, "Max error", (WIDTH - 100, 85), WHITE, SMALL_FONT)
+    for row, (label, color, x_vals, y_vals, stats) in enumerate(curves):
+        y = 110 + 25 * row
+        pygame.draw.line(screen, color, (WIDTH - 355, y + 8), (WIDTH - 335, y + 8), 3)
+        draw_text(screen, label, (WIDTH - 325, y), color, SMALL_FONT)
+        draw_text(screen, _format_error(stats["rmse"]), (WIDTH - 190, y), WHITE, SMALL_FONT)
+        draw_text(screen, _format_error(stats["max_error"]), (WIDTH - 100, y), WHITE, SMALL_FONT)
 
-def draw_stars(screen, stars):
+def draw_roots(screen, roots, color=NEON_GREEN, view=STANDARD_VIEW):
+    """Draw markers where the path crosses the x-axis"""
+    points = view.to_screen_array(roots, np.zeros(len(roots)))
+    for screen_x, screen_y in points.tolist():
+        if not (0 <= screen_x < WIDTH and 0 <= screen_y < HEIGHT):
+            continue
+        
+        # Draw glow ring and center dot
+        pygame.gfxdraw.aacircle(screen, screen_x, screen_y, 7, (*color[:3], 120))
+        pygame.draw.circle(screen, color, (screen_x, screen_y), 3)
+
+def draw_stars(screen, stars, view=STANDARD_VIEW):
     """Draw stars with neon glow effect - updated for real coordinates"""
-    for star in stars:  # stars are now in real coordinates
-        # Convert from real to screen coordinates
-        screen_x, screen_y = real_to_screen(star[0], star[1])
+    if not stars:
+        return
+    
+    # Convert all stars (in real coordinates) to screen coordinates at once
+    points = view.to_screen_array(np.asarray(stars, dtype=float).reshape(-1, 2))
+    for screen_x, screen_y in points.tolist():
+        if not (-20 < screen_x < WIDTH + 20 and -20 < screen_y < HEIGHT + 20):
+            continue  # Off screen after zooming or panning
         
         # Draw glow
         for radius in range(15, 5, -3):
             alpha = 50 if radius > 10 else 100
             glow_color = (*NEON_YELLOW[:3], alpha)
-            pygame.gfxdraw.filled_circle(screen, int(screen_x), int(screen_y), radius, glow_color)
+            pygame.gfxdraw.filled_circle(screen, screen_x, screen_y, radius, glow_color)
         
         # Draw main star
-        pygame.draw.circle(screen, NEON_YELLOW, (int(screen_x), int(screen_y)), 8)
+        pygame.draw.circle(screen, NEON_YELLOW, (screen_x, screen_y), 8)
 
-def draw_ball(screen, ball_pos, ball_radius=BALL_RADIUS):
+def draw_point_cloud(screen, cloud, color=NEON_YELLOW, view=STANDARD_VIEW):
+    """Draw imported points, one pixel per covered grid cell
+    
+    The cloud is decimated to a screen-sized grid over its bounding box, so
+    each view shows a scaled copy of the part of the grid that is visible
+    (cached per view).
+    """
+    if cloud.surface is None:
+        # Render the cell mask once - it only changes when points are imported
+        pixels = np.zeros((WIDTH, HEIGHT, 3), dtype=np.uint8)
+        pixels[cloud.mask] = color[:3]
+        cloud.surface = pygame.Surface((WIDTH, HEIGHT))
+        cloud.surface.set_colorkey((0, 0, 0))
+        pygame.surfarray.blit_array(cloud.surface, pixels)
+        cloud.view_surface = None
+    
+    if cloud.view_surface is None or cloud.view_surface[0] != (view, view.version):
+        # Grid cells covered by the screen, rounded out to whole cells
+        (x_min, x_max), (y_min, y_max) = view.x_range(), view.y_range()
+        left, top = cloud.to_cells(x_min, y_max)
+        right, bottom = cloud.to_cells(x_max, y_min)
+        left, top = max(0, math.floor(left)), max(0, math.floor(top))
+        right, bottom = min(WIDTH, math.ceil(right)), min(HEIGHT, math.ceil(bottom))
+        surface, position = None, (0, 0)
+        if left < right and top < bottom:
+            position = view.to_screen(*cloud.to_real(left, top))
+            size = (max(1, round((right - left) * cloud.cell_width * view.scale)),
+                    max(1, round((bottom - top) * cloud.cell_height * view.scale)))
+            surface = pygame.transform.scale(cloud.surface.subsurface((left, top, right - left, bottom - top)), size)
+        cloud.view_surface = ((view, view.version), surface, (round(position[0]), round(position[1])))
+    
+    _, surface, position = cloud.view_surface
+    if surface is not None:
+        screen.blit(surface, position)
+
+def draw_ball(screen, ball_pos, ball_radius=BALL_RADIUS, view=STANDARD_VIEW):
     """Draw the ball with neon glow effect - updated for real coordinates"""
     # Convert from real to screen coordinates
-    screen_x, screen_y = real_to_screen(ball_pos[0], ball_pos[1])
+    screen_x, screen_y = view.to_screen(ball_pos[0], ball_pos[1])
     
     # Check if ball is off-screen to avoid overflow errors
     if (screen_x < -100 or screen_x > WIDTH + 100 or 
@@ -163,12 +268,14 @@ def draw_game_ui(screen, collected_stars, total_stars, current_equation, input_a
     if is_free_mode and game:
         # Draw free mode specific UI elements
         draw_free_exploration_ui(screen, game.user_points, game.selected_method, 
-                                game.polynomial_degree, game.rootfinding_methods)
+                                game.polynomial_degree, game.rootfinding_methods, game.imported,
+                                game.auto_degree)
     else:
         # Draw challenge mode UI with hint/answer options
         draw_challenge_mode_ui(screen, game)
 
-def draw_free_exploration_ui(screen, user_points, selected_method, polynomial_degree, method_names):
+def draw_free_exploration_ui(screen, user_points, selected_method, polynomial_degree, method_names, imported=None,
+                             auto_degree=None):
     """Draw UI specific to the free exploration mode"""
     # Draw free mode info panel
     info_panel = (10, 75, 270, 200)
@@ -189,9 +296,17 @@ def draw_free_exploration_ui(screen, user_points, selected_method, polynomial_de
     if selected_method == 0:  # Least Squares
         draw_text(screen, f"Polynomial Degree: {polynomial_degree}", (20, 180), WHITE, SMALL_FONT)
         draw_text(screen, "UP/DOWN to change degree", (20, 200), NEON_BLUE, SMALL_FONT)
+    elif method_names[selected_method] == "Auto" and auto_degree is not None:
+        draw_text(screen, f"Polynomial Degree: {auto_degree}", (20, 180), WHITE, SMALL_FONT)
+        draw_text(screen, "Picked by cross-validation", (20, 200), NEON_BLUE, SMALL_FONT)
+    
+    # Imported datasets are always fitted with least squares
+    if imported is not None:
+        skipped = f" ({imported.skipped:,} skipped)" if imported.skipped else ""
+        draw_text(screen, f"Imported: {imported.count:,} points{skipped}", (20, 235), NEON_YELLOW, SMALL_FONT)
     
     # Draw free mode controls panel
-    controls_panel = (10, 285, 270, 170)
+    controls_panel = (10, 285, 270, 220)
     draw_panel(screen, controls_panel, NEON_GREEN)
     
     # Draw controls
@@ -201,11 +316,13 @@ def draw_free_exploration_ui(screen, user_points, selected_method, polynomial_de
     draw_text(screen, "Ctrl+C - Clear all points", (20, 380), NEON_GREEN, SMALL_FONT)
     draw_text(screen, "Ctrl+M - Change fitting method", (20, 405), NEON_GREEN, SMALL_FONT)
     draw_text(screen, "Ctrl+E - Custom equation", (20, 430), NEON_GREEN, SMALL_FONT)
+    draw_text(screen, "Drop .npy/.csv - Import points", (20, 455), NEON_GREEN, SMALL_FONT)
+    draw_text(screen, "Ctrl+O - Compare all fits", (20, 480), NEON_GREEN, SMALL_FONT)
 
-def draw_point_coordinates(screen, mouse_pos):
+def draw_point_coordinates(screen, mouse_pos, view=STANDARD_VIEW):
     """Draw the coordinates of the mouse position for precise point placement"""
     # Convert screen coordinates to real coordinates
-    real_x, real_y = screen_to_real(mouse_pos[0], mouse_pos[1])
+    real_x, real_y = view.to_real(mouse_pos[0], mouse_pos[1])
     
     # Format coordinates as text
     coord_text = f"({real_x:.1f}, {real_y:.1f})"
@@ -218,36 +335,58 @@ def draw_point_coordinates(screen, mouse_pos):
     # Draw coordinate text
     draw_text(screen, coord_text, (mouse_pos[0] + 25, mouse_pos[1] - 20), NEON_BLUE, SMALL_FONT)
 
-def draw_coordinate_system(screen):
+def _tick_step(scale, min_pixels=80):
+    """Get a round tick spacing (1, 2 or 5 times a power of ten) at least min_pixels apart"""
+    raw = min_pixels / scale
+    power = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 5, 10):
+        if multiple * power >= raw:
+            return multiple * power
+
+def _ticks(low, high, step):
+    """Get the multiples of step between low and high"""
+    return np.arange(math.ceil(low / step), math.floor(high / step) + 1) * step
+
+def draw_coordinate_system(screen, view=STANDARD_VIEW):
     """Draw coordinate axes to visualize the real coordinate system"""
+    axis_x, axis_y = view.to_screen(0, 0)
+    axis_x, axis_y = int(round(axis_x)), int(round(axis_y))
+    
     # Draw x-axis
-    pygame.draw.line(screen, WHITE, (0, ORIGIN_Y), (WIDTH, ORIGIN_Y), 1)
+    if 0 <= axis_y < HEIGHT:
+        pygame.draw.line(screen, WHITE, (0, axis_y), (WIDTH, axis_y), 1)
     # Draw y-axis
-    pygame.draw.line(screen, WHITE, (ORIGIN_X, 0), (ORIGIN_X, HEIGHT), 1)
+    if 0 <= axis_x < WIDTH:
+        pygame.draw.line(screen, WHITE, (axis_x, 0), (axis_x, HEIGHT), 1)
     
     # Draw origin point
-    pygame.draw.circle(screen, NEON_GREEN, (ORIGIN_X, ORIGIN_Y), 3)
+    pygame.draw.circle(screen, NEON_GREEN, (axis_x, axis_y), 3)
+    
+    # Draw tick marks and labels - spaced for the zoom level, and kept at
+    # the screen edge when an axis is scrolled out of view
+    step = _tick_step(view.scale)
+    label_y = min(max(axis_y, 5), HEIGHT - 30)
+    label_x = min(max(axis_x, 5), WIDTH - 60)
     
-    # Draw tick marks and labels
     # X-axis ticks
-    for x in range(-600, 601, 100):
-        tick_x, tick_y = real_to_screen(x, 0)
+    x_ticks = _ticks(*view.x_range(), step)
+    for x, tick_x in zip(x_ticks, view.to_screen_array(x_ticks, np.zeros(len(x_ticks)))[:, 0].tolist()):
         # Draw tick mark
-        pygame.draw.line(screen, WHITE, (tick_x, tick_y - 5), (tick_x, tick_y + 5), 1)
+        pygame.draw.line(screen, WHITE, (tick_x, label_y - 5), (tick_x, label_y + 5), 1)
         # Draw label
         if x != 0:  # Skip zero to avoid cluttering the origin
-            label = SMALL_FONT.render(str(x), True, WHITE)
-            screen.blit(label, (tick_x - label.get_width()//2, tick_y + 10))
+            label = SMALL_FONT.render(f"{x:g}", True, WHITE)
+            screen.blit(label, (tick_x - label.get_width()//2, label_y + 10))
     
     # Y-axis ticks
-    for y in range(-400, 400, 100):
-        tick_x, tick_y = real_to_screen(0, y)
+    y_ticks = _ticks(*view.y_range(), step)
+    for y, tick_y in zip(y_ticks, view.to_screen_array(np.zeros(len(y_ticks)), y_ticks)[:, 1].tolist()):
         # Draw tick mark
-        pygame.draw.line(screen, WHITE, (tick_x - 5, tick_y), (tick_x + 5, tick_y), 1)
+        pygame.draw.line(screen, WHITE, (label_x - 5, tick_y), (label_x + 5, tick_y), 1)
         # Draw label
         if y != 0:  # Skip zero to avoid cluttering the origin
-            label = SMALL_FONT.render(str(y), True, WHITE)
-            screen.blit(label, (tick_x + 10, tick_y - label.get_height()//2))
+            label = SMALL_FONT.render(f"{y:g}", True, WHITE)
+            screen.blit(label, (label_x + 10, tick_y - label.get_height()//2))
 
 def draw_level_complete(screen, total_stars, next_level_available=True):
     """Draw level complete screen"""
@@ -295,7 +434,9 @@ def draw_help_screen(screen):
         "- Line: 2*x",
         "- Parabola: 0.01*x^2",
         "- Sine wave: 50*sin(0.05*x)",
-        "- Complex: 0.01*x^2 + 30*sin(0.1*x)"
+        "- Complex: 0.01*x^2 + 30*sin(0.1*x)",
+        "Ctrl+X - Show/hide where the path crosses the x-axis",
+        "Mouse wheel - Zoom, right-drag - Pan, Home - Reset view"
     ]
     
     y_pos = HEIGHT//6 + 80
@@ -382,11 +523,8 @@ def draw_main_menu(screen, selected_item, menu_items):
     text_width = SMALL_FONT.size(controls_text)[0]
     draw_text(screen, controls_text, (WIDTH//2 - text_width//2, 608), NEON_BLUE, SMALL_FONT)
 
-def draw_level_select(screen, selected_level, unlocked_levels, level_stats):
-    """Draw the level selection screen with proper spacing to avoid overlaps"""
-    # Import LEVELS here to avoid circular imports
-    from src.levels import LEVELS
-    
+def draw_level_select(screen, selected_level, unlocked_levels, level_stats, levels):
+    """Draw the level selection screen, one page of levels at a time"""
     # Draw title panel at the top
     title_panel = (WIDTH//4, 50, WIDTH//2, 70)
     draw_panel(screen, title_panel, NEON_GREEN)
@@ -396,52 +534,67 @@ def draw_level_select(screen, selected_level, unlocked_levels, level_stats):
     draw_text(screen, "SELECT LEVEL", (title_x, 65), 
              NEON_GREEN, TITLE_FONT, glow_effect=True)
     
+    # Only the page holding the selected level is drawn, so the cost doesn't
+    # grow with the number of unlocked levels
+    unlocked_count = min(unlocked_levels, len(levels))
+    page = selected_level // LEVELS_PER_PAGE
+    page_count = max(1, (unlocked_count + LEVELS_PER_PAGE - 1) // LEVELS_PER_PAGE)
+    first_level = page * LEVELS_PER_PAGE
+    last_level = min(first_level + LEVELS_PER_PAGE, unlocked_count)
+    
     # Calculate proper spacing for level items
-    visible_levels = min(unlocked_levels, len(level_stats))
     item_height = 50  # Height for each level item
-    panel_height = visible_levels * item_height + 30  # Add padding
+    panel_height = (last_level - first_level) * item_height + 30  # Add padding
     
     # Draw level selection panel
     level_panel = (WIDTH//4, 140, WIDTH//2, panel_height)
     draw_panel(screen, level_panel, NEON_BLUE)
     
+    if page_count > 1:
+        page_text = f"Page {page + 1}/{page_count}  PgUp/PgDn"
+        draw_text(screen, page_text, (WIDTH//4 + WIDTH//2 + 15, 150), NEON_BLUE, SMALL_FONT)
+    
     # Draw level items with proper spacing
-    for i in range(visible_levels):
+    for i in range(first_level, last_level):
+        row = i - first_level
+        stats = level_stats.get(i)
+        completed = stats is not None and stats["completed"]
+        
         # Determine color based on selection and completion
         if i == selected_level:
             color = NEON_GREEN  # Selected level but with reduced glow effect
             # Draw softer highlight background for selected level
-            highlight_rect = (WIDTH//4 + 5, 150 + i * item_height, WIDTH//2 - 10, item_height - 5)
+            highlight_rect = (WIDTH//4 + 5, 150 + row * item_height, WIDTH//2 - 10, item_height - 5)
             s = pygame.Surface((highlight_rect[2], highlight_rect[3]))
             s.set_alpha(40)  # Very subtle highlight
             s.fill(NEON_GREEN)
             screen.blit(s, (highlight_rect[0], highlight_rect[1]))
-        elif level_stats[i]["completed"]:
+        elif completed:
             color = NEON_YELLOW  # Completed level
         else:
             color = WHITE  # Unlocked but not completed
             
         # Calculate vertical position with proper spacing
-        y_pos = 155 + i * item_height
+        y_pos = 155 + row * item_height
         
-        # Draw level number and name
-        level_text = f"Level {i+1}: {LEVELS[i]['name']}"
+        # Draw level number and name (from the pack index, without loading the level)
+        level_text = f"Level {i+1}: {levels.level_name(i)}"
         draw_text(screen, level_text, (WIDTH//4 + 25, y_pos), color, MAIN_FONT, 
                  glow_effect=False)  # No glow effect for better readability
         
         # Draw stars if level has been completed
-        if level_stats[i]["completed"]:
-            stars_text = f"{level_stats[i]['stars']} ★"
+        if completed:
+            stars_text = f"{stats['stars']} ★"
             stars_x = WIDTH//4 + WIDTH//2 - 80  # Right-align stars
             draw_text(screen, stars_text, (stars_x, y_pos), NEON_YELLOW, MAIN_FONT)
     
     # Calculate position for locked levels panel
     locked_panel_y = level_panel[1] + level_panel[3] + 20
     
-    # Only show locked levels if there are any
-    if unlocked_levels < len(level_stats):
+    # Only show locked levels if there are any, after the last unlocked level
+    if unlocked_levels < len(levels) and page == page_count - 1:
         # Calculate height for locked levels panel
-        locked_count = min(3, len(level_stats) - unlocked_levels)  # Show up to 3 locked levels
+        locked_count = min(3, len(levels) - unlocked_levels)  # Show up to 3 locked levels
         locked_panel_height = locked_count * 40 + 20
         
         # Draw locked levels panel
@@ -449,7 +602,7 @@ def draw_level_select(screen, selected_level, unlocked_levels, level_stats):
         draw_panel(screen, locked_panel, (50, 50, 80))  # Darker color for locked panel
         
         # Draw locked level items
-        for i in range(unlocked_levels, min(len(level_stats), unlocked_levels + 3)):
+        for i in range(unlocked_levels, min(len(levels), unlocked_levels + 3)):
             y_pos = locked_panel_y + 20 + (i - unlocked_levels) * 40
             draw_text(screen, f"Level {i+1} (Locked)", (WIDTH//4 + 25, y_pos), 
                      (150, 150, 150), MAIN_FONT)
@@ -1,29 +1,115 @@
+import ast
 import numpy as np
 from src.settings import HEIGHT, ORIGIN_X, ORIGIN_Y
 
-def safe_eval(expr, x):
-    """Evaluate mathematical expression safely"""
+def _to_python(expr):
+    """Rewrite an equation as a Python expression over np"""
     # Replace common math functions with their numpy equivalents
     expr = expr.replace('sin', 'np.sin')
     expr = expr.replace('cos', 'np.cos')
     expr = expr.replace('tan', 'np.tan')
     expr = expr.replace('sqrt', 'np.sqrt')
     expr = expr.replace('abs', 'np.abs')
+    expr = expr.replace('exp', 'np.exp')
     expr = expr.replace('^', '**')
+    return expr
+
+def _equation_scope(x):
+    """Names an equation may use"""
+    return {
+        'x': x,
+        'np': np,
+        'pi': np.pi,
+        'e': np.e
+    }
+
+def safe_eval(expr, x):
+    """Evaluate mathematical expression safely"""
+    expr = _to_python(expr)
     
     try:
         # Create a dictionary with only the allowed variables and functions
-        safe_dict = {
-            'x': x,
-            'np': np,
-            'pi': np.pi,
-            'e': np.e
-        }
+        safe_dict = _equation_scope(x)
         return eval(expr, {"__builtins__": {}}, safe_dict)
     except Exception as e:
         print(f"Error evaluating expression: {e}")
         return HEIGHT // 2  # Default value if evaluation fails
 
+class _FloatLiterals(ast.NodeTransformer):
+    """Turn integer literals into floats"""
+
+    def visit_Constant(self, node):
+        if type(node.value) is int:
+            return ast.copy_location(ast.Constant(float(node.value)), node)
+        return node
+
+def compile_equation(expr):
+    """
+    Compile an equation once so it can be evaluated many times.
+    
+    Unlike safe_eval this raises on bad input instead of printing, and
+    integer literals become floats so something like 9^9^9^9 overflows
+    straight away instead of computing a huge integer.
+    
+    Args:
+        expr: Equation text, e.g. "0.5*x^2 - 3"
+    
+    Returns:
+        Code object for evaluate_equation
+    
+    Raises:
+        SyntaxError: If the equation can't be parsed
+    """
+    tree = ast.parse(_to_python(expr).strip(), mode="eval")
+    tree = ast.fix_missing_locations(_FloatLiterals().visit(tree))
+    return compile(tree, "<equation>", "eval")
+
+# What check_equation lets through
+EQUATION_NAMES = {"x", "pi", "e"}
+EQUATION_FUNCTIONS = {"sin", "cos", "tan", "sqrt", "abs", "exp"}  # Called as np.<name>
+_EQUATION_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow, ast.UAdd, ast.USub)
+
+def _check_node(node):
+    """Raise ValueError unless node only does equation arithmetic"""
+    if isinstance(node, ast.Expression):
+        _check_node(node.body)
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, _EQUATION_OPERATORS):
+        _check_node(node.left)
+        _check_node(node.right)
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, _EQUATION_OPERATORS):
+        _check_node(node.operand)
+    elif isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        pass
+    elif isinstance(node, ast.Name) and node.id in EQUATION_NAMES:
+        pass
+    elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+          and isinstance(node.func.value, ast.Name) and node.func.value.id == "np"
+          and node.func.attr in EQUATION_FUNCTIONS and len(node.args) == 1 and not node.keywords):
+        _check_node(node.args[0])
+    else:
+        raise ValueError(f"not allowed in an equation: {ast.unparse(node)}")
+
+def check_equation(expr):
+    """
+    Check that an equation is plain arithmetic before running untrusted input.
+    
+    Only numbers, x, pi, e, the arithmetic operators and the functions in
+    EQUATION_FUNCTIONS are allowed - no other names, attributes, lambdas or
+    comprehensions - so an equation can't reach anything but numpy math.
+    
+    Args:
+        expr: Equation text, e.g. "0.5*x^2 - 3"
+    
+    Raises:
+        SyntaxError: If the equation can't be parsed
+        ValueError: If the equation uses anything else
+    """
+    _check_node(ast.parse(_to_python(expr).strip(), mode="eval"))
+
+def evaluate_equation(code, x):
+    """Evaluate a compiled equation, raising on errors"""
+    return eval(code, {"__builtins__": {}}, _equation_scope(x))
+
 def real_to_screen(x, y):
     """Convert real coordinates to screen coordinates
     In real coordinates: 
@@ -0,0 +1,201 @@
+"""
+Zoomable, pannable view of the real coordinate plane
+
+The Viewport maps real coordinates to the screen. At zoom level 0 centred
+on the origin it matches real_to_screen (1 pixel per unit, ±600 by ±337
+visible). Zoom levels are integers - ZOOM_STEPS of them double the
+scale - so the same level always gives exactly the same scale, and
+sampled curves can be cached against it.
+
+CurveSampler samples a curve over just the visible x-range, about one
+point every SAMPLE_PIXELS pixels at the current zoom. The x-axis is cut
+into tiles of TILE_PIXELS pixels fixed in real space, each sampled once
+and cached, so panning only evaluates the tiles that scroll into view.
+"""
+import math
+import numpy as np
+from src.settings import WIDTH, HEIGHT, ORIGIN_X, ORIGIN_Y
+
+ZOOM_STEPS = 4         # Mouse wheel notches that double the scale
+MIN_ZOOM = -16         # Zoomed out to 1/16 pixel per unit
+MAX_ZOOM = 24          # Zoomed in to 64 pixels per unit
+
+TILE_PIXELS = 128      # Width of a cached sample tile on screen
+SAMPLE_PIXELS = 3      # Screen distance between curve samples
+MAX_CACHED_TILES = 256 # Tiles kept per curve
+
+OFF_SCREEN = 1 << 20   # Screen coordinate that NaN and huge values are clamped to
+
+class Viewport:
+    """Maps real coordinates to screen coordinates with zoom and pan"""
+
+    def __init__(self, center_x=0.0, center_y=0.0, zoom=0):
+        self.center_x = center_x  # Real coordinates shown at ORIGIN_X, ORIGIN_Y
+        self.center_y = center_y
+        self.zoom = zoom
+        self.scale = 2.0 ** (zoom / ZOOM_STEPS)  # Pixels per real unit
+        self.version = 0  # Bumped on every change, for caches that depend on the view
+
+    def to_screen(self, x, y):
+        """Convert real coordinates (numbers or arrays) to screen coordinates"""
+        screen_x = (x - self.center_x) * self.scale + ORIGIN_X
+        screen_y = ORIGIN_Y - (y - self.center_y) * self.scale  # Flip y-axis
+        return screen_x, screen_y
+
+    def to_real(self, screen_x, screen_y):
+        """Convert screen coordinates (numbers or arrays) to real coordinates"""
+        x = (screen_x - ORIGIN_X) / self.scale + self.center_x
+        y = (ORIGIN_Y - screen_y) / self.scale + self.center_y  # Flip y-axis
+        return x, y
+
+    def to_screen_array(self, x, y=None, out=None):
+        """
+        Convert many real points to integer screen points in one go.
+
+        Args:
+            x: Array of x values, or an (N, 2) array of points when y is None
+            y: Array of y values
+            out: Optional (N, 2) int32 array to write into, so a buffer can be
+                reused from frame to frame
+
+        Returns:
+            (N, 2) int32 array of screen points (out if given), ready for
+            pygame.draw.lines and friends. Coordinates are truncated like
+            int(); NaN and huge values become far off-screen points.
+        """
+        if y is None:
+            points = np.asarray(x, dtype=float)
+            x, y = points[:, 0], points[:, 1]
+        if out is None:
+            out = np.empty((len(x), 2), dtype=np.int32)
+
+        screen = np.empty((len(x), 2))
+        screen[:, 0] = x
+        screen[:, 1] = y
+        screen -= (self.center_x, self.center_y)
+        screen *= (self.scale, -self.scale)  # Flip y-axis
+        screen += (ORIGIN_X, ORIGIN_Y)
+        np.nan_to_num(screen, copy=False, nan=OFF_SCREEN)
+        np.clip(screen, -OFF_SCREEN, OFF_SCREEN, out=screen)
+        np.copyto(out, screen, casting="unsafe")
+        return out
+
+    def to_real_array(self, screen_x, screen_y=None):
+        """
+        Convert many screen points to real points in one go.
+
+        Args:
+            screen_x: Array of screen x values, or an (N, 2) array of points when screen_y is None
+            screen_y: Array of screen y values
+
+        Returns:
+            (N, 2) float array of real points
+        """
+        if screen_y is None:
+            points = np.asarray(screen_x, dtype=float)
+            screen_x, screen_y = points[:, 0], points[:, 1]
+        real = np.empty((len(screen_x), 2))
+        real[:, 0] = screen_x
+        real[:, 1] = screen_y
+        real -= (ORIGIN_X, ORIGIN_Y)
+        real *= (1 / self.scale, -1 / self.scale)  # Flip y-axis
+        real += (self.center_x, self.center_y)
+        return real
+
+    def x_range(self):
+        """Get the real x-range covered by the screen"""
+        return self.to_real(0, 0)[0], self.to_real(WIDTH, 0)[0]
+
+    def y_range(self):
+        """Get the real y-range covered by the screen"""
+        return self.to_real(0, HEIGHT)[1], self.to_real(0, 0)[1]
+
+    def is_default(self):
+        """Check if the view is the standard 1:1 view of the level"""
+        return self.zoom == 0 and self.center_x == 0 and self.center_y == 0
+
+    def zoom_at(self, screen_pos, steps):
+        """Zoom by a number of wheel notches, keeping the point under screen_pos in place"""
+        zoom = max(MIN_ZOOM, min(MAX_ZOOM, self.zoom + steps))
+        if zoom == self.zoom:
+            return
+        anchor_x, anchor_y = self.to_real(*screen_pos)
+        self.zoom = zoom
+        self.scale = 2.0 ** (zoom / ZOOM_STEPS)
+        self.center_x = anchor_x - (screen_pos[0] - ORIGIN_X) / self.scale
+        self.center_y = anchor_y - (ORIGIN_Y - screen_pos[1]) / self.scale
+        self.version += 1
+
+    def pan(self, dx, dy):
+        """Move the view by a screen distance (the plane follows the mouse)"""
+        if dx or dy:
+            self.center_x -= dx / self.scale
+            self.center_y += dy / self.scale
+            self.version += 1
+
+    def fit_to(self, x_min, x_max, y_min, y_max, margin=0.9):
+        """Centre the view on a box and zoom in as far as it still fits (within the zoom limits)"""
+        fit_scale = min(margin * WIDTH / max(x_max - x_min, 1e-9), margin * HEIGHT / max(y_max - y_min, 1e-9))
+        self.zoom = max(MIN_ZOOM, min(MAX_ZOOM, math.floor(ZOOM_STEPS * math.log2(fit_scale))))
+        self.scale = 2.0 ** (self.zoom / ZOOM_STEPS)
+        self.center_x = (x_min + x_max) / 2
+        self.center_y = (y_min + y_max) / 2
+        self.version += 1
+
+    def reset(self):
+        """Go back to the standard view"""
+        if not self.is_default():
+            self.__init__()
+            self.version += 1
+
+class CurveSampler:
+    """Samples a curve over the visible x-range, caching it tile by tile"""
+
+    def __init__(self, max_tiles=MAX_CACHED_TILES):
+        self.max_tiles = max_tiles
+        self._key = None
+        self._tiles = {}  # (zoom, tile index) -> (x values, y values)
+
+    def sample(self, path_func, view, key):
+        """
+        Sample a curve across the screen.
+
+        Args:
+            path_func: Function giving y for an array of x (or a single x)
+            view: Viewport the curve is drawn in
+            key: Identifies the curve - the cache is dropped when it changes
+
+        Returns:
+            Tuple containing (x values, y values) about SAMPLE_PIXELS apart on screen
+        """
+        if key != self._key:
+            self._key = key
+            self._tiles = {}
+
+        tile_width = TILE_PIXELS / view.scale
+        x_min, x_max = view.x_range()
+        tile_keys = [(view.zoom, i) for i in range(math.floor(x_min / tile_width),
+                                                    math.floor(x_max / tile_width) + 1)]
+
+        # Evaluate all newly exposed tiles in one call
+        missing = [tile_key for tile_key in tile_keys if tile_key not in self._tiles]
+        if missing:
+            tile_samples = TILE_PIXELS // SAMPLE_PIXELS
+            offsets = np.arange(tile_samples) * (tile_width / tile_samples)
+            x_new = np.concatenate([index * tile_width + offsets for _, index in missing])
+            y_new = _evaluate(path_func, x_new)
+            for tile_key, x_tile, y_tile in zip(missing, np.split(x_new, len(missing)), np.split(y_new, len(missing))):
+                if len(self._tiles) >= self.max_tiles:
+                    self._tiles.pop(next(iter(self._tiles)))  # Drop the oldest
+                self._tiles[tile_key] = (x_tile, y_tile)
+
+        tiles = [self._tiles[tile_key] for tile_key in tile_keys]
+        return np.concatenate([x for x, _ in tiles]), np.concatenate([y for _, y in tiles])
+
+def _evaluate(path_func, x_vals):
+    """Evaluate a curve for an array of x, one value at a time if it can't take arrays"""
+    try:
+        y_vals = np.broadcast_to(np.asarray(path_func(x_vals), dtype=float), x_vals.shape)
+    except Exception:
+        y_vals = np.array([path_func(x) for x in x_vals], dtype=float)
+    return np.array(y_vals, dtype=float)
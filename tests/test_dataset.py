@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from src.dataset import dataset_bounds, iter_point_chunks, load_point_cloud
+from src.rootfinding import PolynomialFitter
+
+def write_csv(path, points, extra=""):
+    np.savetxt(path, points, delimiter=",", header="x,y", comments="")
+    with open(path, "a") as f:
+        f.write(extra)
+
+def test_csv_rows_with_gaps_are_skipped(tmp_path):
+    path = tmp_path / "gaps.csv"
+    path.write_text("x,y\n1,2\n1,,3\nabc,4\n5\n6,7,8\n\n9,nan\n10,11\n")
+    cloud = load_point_cloud(str(path))
+    assert cloud.count == 3
+    assert cloud.skipped == 3
+    assert dataset_bounds(str(path)) == (1.0, 10.0, 2.0, 11.0)
+
+def test_csv_and_npy_chunks_agree(tmp_path):
+    points = np.random.default_rng(0).normal(size=(1000, 2))
+    write_csv(tmp_path / "points.csv", points)
+    np.save(tmp_path / "points.npy", points)
+    csv = np.concatenate([np.column_stack(c) for c in iter_point_chunks(str(tmp_path / "points.csv"), chunk_bytes=997)])
+    npy = np.concatenate([np.column_stack(c) for c in iter_point_chunks(str(tmp_path / "points.npy"), chunk_rows=97)])
+    np.testing.assert_allclose(csv, points)
+    np.testing.assert_array_equal(npy, points)
+
+def test_data_outside_the_window_is_kept_and_fitted(tmp_path):
+    rng = np.random.default_rng(1)
+    x = rng.uniform(1000, 1100, 5000)
+    y = 30 * np.sin(x / 10) + 500 + rng.normal(0, 2, len(x))
+    path = str(tmp_path / "far.csv")
+    write_csv(path, np.column_stack((x, y)))
+
+    bounds = dataset_bounds(path)
+    fitter = PolynomialFitter(max_degree=10, center=(bounds[0] + bounds[1]) / 2, scale=(bounds[1] - bounds[0]) / 2)
+    cloud = load_point_cloud(path, fitter, bounds)
+    assert cloud.count == len(x)
+    assert len(cloud.pixels()) > 1000
+
+    reference = np.polynomial.Polynomial.fit(x, y, 8)
+    np.testing.assert_allclose(fitter.fit(8)(x), reference(x), atol=1e-6)
+
+def test_empty_dataset_is_an_error(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("x,y\n,\n")
+    with pytest.raises(ValueError):
+        load_point_cloud(str(path))
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from src.rootfinding import PolynomialFitter, cross_validate_degree, find_best_fit, fit_polynomial
+
+def reference_fit(x, y, degree):
+    """Well-conditioned reference (np.polyfit doesn't center x)"""
+    return np.polynomial.Polynomial.fit(x, y, degree)
+
+@pytest.mark.parametrize("degree", [1, 2, 4, 6])
+def test_find_best_fit_matches_polyfit_for_window_data(degree):
+    rng = np.random.default_rng(degree)
+    x = rng.uniform(-600, 600, 200)
+    y = 0.0005 * x ** 2 + 40 * np.sin(x / 100) + rng.normal(0, 5, len(x))
+    fit = find_best_fit(list(zip(x, y)), degree=degree)
+    np.testing.assert_allclose(fit(x), np.polyval(np.polyfit(x, y, degree), x), atol=1e-6)
+    np.testing.assert_allclose(fit.coefficients, np.polyfit(x, y, degree), rtol=1e-6, atol=1e-12)
+
+@pytest.mark.parametrize("degree", [4, 6, 8])
+def test_find_best_fit_off_center(degree):
+    rng = np.random.default_rng(degree)
+    x = np.linspace(1000, 1050, 60)
+    y = 10 * np.sin(x / 10) + rng.normal(0, 0.1, len(x))
+    fit = find_best_fit(list(zip(x, y)), degree=degree)
+    reference = reference_fit(x, y, degree)
+    np.testing.assert_allclose(fit(x), reference(x), atol=1e-8)
+    assert fit.sse == pytest.approx(((reference(x) - y) ** 2).sum(), rel=1e-9)
+
+def test_find_best_fit_far_from_origin():
+    x = np.linspace(1.7e9, 1.7e9 + 100, 20)
+    y = 3 * (x - 1.7e9) + 5
+    fit = find_best_fit(list(zip(x, y)), degree=3)
+    np.testing.assert_allclose(fit(x), y, atol=1e-6)
+    np.testing.assert_allclose(fit.roots(), [1.7e9 - 5 / 3], rtol=1e-12)
+
+def test_fit_polynomial_sse_from_residuals():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(-600, 600, 100)
+    y = np.polyval(rng.normal(size=11), x / 600) + rng.normal(0, 1e-3, len(x))
+    fit = fit_polynomial(x, y, 10)
+    assert fit.sse == pytest.approx(((fit(x) - y) ** 2).sum(), rel=1e-12)
+
+def test_centered_fitter_matches_reference():
+    rng = np.random.default_rng(2)
+    x = rng.uniform(1000, 1100, 500)
+    y = np.cos(x / 15) * 20 + rng.normal(0, 0.5, len(x))
+    fitter = PolynomialFitter(max_degree=10, center=1050, scale=50)
+    fitter.add_points(x, y)
+    for degree in (2, 5, 8):
+        np.testing.assert_allclose(fitter.fit(degree)(x), reference_fit(x, y, degree)(x), atol=1e-6)
+
+def test_fitter_incremental_matches_batch_fit():
+    rng = np.random.default_rng(3)
+    points = [tuple(p) for p in rng.uniform(-600, 600, (40, 2))]
+    fitter = PolynomialFitter(max_degree=10, scale=600)
+    for x, y in points + [(1.0, 2.0), (3.0, 4.0)]:
+        fitter.add_point(x, y)
+    fitter.remove_point(3.0, 4.0)
+    fitter.remove_point(1.0, 2.0)
+    x, y = np.array(points).T
+    for degree in (1, 3, 6):
+        result = fitter.fit(degree, points)
+        np.testing.assert_allclose(result.coefficients, np.polyfit(x, y, degree), rtol=1e-6, atol=1e-12)
+        assert result.sse == pytest.approx(((np.polyval(np.polyfit(x, y, degree), x) - y) ** 2).sum(), rel=1e-9)
+
+def cross_validation_errors_reference(x, y, max_degree, folds):
+    """Reference: refit every (degree, fold) separately with np.polyfit"""
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+    fold = np.arange(len(x)) % folds
+    center, half_width = (x.max() + x.min()) / 2, (x.max() - x.min()) / 2
+    t = (x - center) / half_width
+    errors = []
+    for degree in range(1, max_degree + 1):
+        squared = np.zeros(len(x))
+        for k in range(folds):
+            test = fold == k
+            coeffs = np.polyfit(t[~test], y[~test], degree)
+            squared[test] = (np.polyval(coeffs, t[test]) - y[test]) ** 2
+        errors.append(squared.mean())
+    return np.array(errors)
+
+@pytest.mark.parametrize("true_degree", [1, 2, 3, 5])
+def test_cross_validate_degree_matches_refitting_each_fold(true_degree):
+    rng = np.random.default_rng(true_degree)
+    x = rng.uniform(-600, 600, 120)
+    roots = np.linspace(-450, 450, true_degree)
+    y = 200 * np.prod((x[:, None] - roots) / 600, axis=1) + rng.normal(0, 1, len(x))
+    degree, errors = cross_validate_degree(list(zip(x, y)), max_degree=8, folds=5)
+    np.testing.assert_allclose(errors, cross_validation_errors_reference(x, y, 8, 5), rtol=1e-6)
+    assert degree == true_degree
+
+def test_cross_validate_degree_rules_out_degrees_without_enough_points():
+    points = [(x, x ** 2) for x in range(-5, 5)]
+    degree, errors = cross_validate_degree(points, max_degree=10, folds=5)
+    assert degree == 2
+    assert np.isinf(errors[7:]).all()
+    assert cross_validate_degree([(0.0, 1.0)])[0] == 1
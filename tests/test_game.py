@@ -0,0 +1,48 @@
+from src.game import Game
+from src.settings import STATE_PLAYING
+from src.simulation import SimState
+
+def play(game, equation, frames):
+    """Submit an equation and run the simulation for a number of frames"""
+    game.input_text = equation
+    game.submit_equation()
+    for _ in range(frames):
+        game.update()
+
+def test_sim_state_snapshot_round_trip():
+    state = SimState(STATE_PLAYING, 3)
+    state.ball_pos = [12.5, -4.0]
+    state.stars = [(1, 2), (3, 4)]
+    state.collected_stars = 2
+    snapshot = state.snapshot()
+    
+    state.ball_pos[0] = 99.0
+    state.stars.pop()
+    copy = SimState()
+    copy.restore(snapshot)
+    assert copy.snapshot() == snapshot
+    assert copy.ball_pos == [12.5, -4.0] and copy.stars == [(1, 2), (3, 4)]
+    assert copy.snapshot() != state.snapshot()
+
+def test_reset_level_restores_the_loaded_level():
+    game = Game()
+    game.load_level(1)
+    game.game_state = STATE_PLAYING
+    fresh = game.snapshot()
+    play(game, "0.002*x**2 - 50", 150)
+    assert game.snapshot() != fresh
+    
+    game.reset_level()
+    assert game.snapshot() == fresh
+    assert game.stars == list(game.levels[1]["stars"])
+    assert game.collected_stars == 0 and game.input_active and game.input_text == ""
+
+def test_reset_level_after_switching_levels_loads_the_current_one():
+    game = Game()
+    game.load_level(0)
+    game.load_level(2)
+    game.current_level = 1  # Level changed without a load_level call
+    game.reset_level()
+    assert game.current_level == 1
+    assert game.stars == list(game.levels[1]["stars"])
+    assert game.level_start[0] == 1
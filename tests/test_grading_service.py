@@ -0,0 +1,71 @@
+import asyncio
+import numpy as np
+import pytest
+from src.grading_service import GradingService, _post, grade_equation
+from src.levels import LEVELS
+
+def run_service(test, **kwargs):
+    """Start a one-worker service on a free port, run test(host, port, service) against it"""
+    async def main():
+        service = GradingService(workers=1, **kwargs)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await test("127.0.0.1", port, service)
+        finally:
+            server.close()
+            service.close()
+    return asyncio.run(main())
+
+async def post(host, port, payload):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await _post(reader, writer, f"{host}:{port}", "/grade", payload)
+    finally:
+        writer.close()
+
+def test_list_longer_than_the_queue_is_graded_in_parts():
+    requests = [{"level": 1 + i % 3, "equation": LEVELS[i % 3]["solution"]} for i in range(100)]
+    
+    async def test(host, port, service):
+        return await post(host, port, requests)
+    
+    status, results = run_service(test, queue_size=8, batch_size=4)
+    assert status == 200
+    assert len(results) == 100
+    assert [r["level"] for r in results] == [r["level"] for r in requests]
+    for request, result in zip(requests, results):
+        expected = grade_equation(np.asarray(LEVELS[request["level"] - 1]["stars"], dtype=float), request["equation"])
+        assert {k: result[k] for k in expected} == expected
+
+def test_list_over_the_request_limit_is_refused():
+    async def test(host, port, service):
+        too_many = await post(host, port, [{"level": 1, "equation": "0.5*x"}] * 11)
+        at_limit = await post(host, port, [{"level": 1, "equation": "0.5*x"}] * 10)
+        return too_many, at_limit
+    
+    (status, response), (ok_status, results) = run_service(test, queue_size=4, max_requests=10)
+    assert status == 413 and "10" in response["error"]
+    assert ok_status == 200 and len(results) == 10
+
+def test_full_queue_answers_503():
+    async def test(host, port, service):
+        service._dispatcher.cancel()  # Nothing takes requests off the queue
+        await asyncio.sleep(0)
+        for _ in range(service.queue_size):
+            service.queue.put_nowait((0, "x", 0.0, asyncio.get_running_loop().create_future()))
+        return await post(host, port, {"level": 1, "equation": "0.5*x"})
+    
+    status, response = run_service(test, queue_size=4)
+    assert status == 503
+    assert "full" in response["error"]
+
+@pytest.mark.parametrize("equation, stars, passed", [("0.5*x", 5, True), ("0.5*x + 300", 0, False)])
+def test_grade_equation_matches_the_game(equation, stars, passed):
+    result = grade_equation(np.asarray(LEVELS[0]["stars"], dtype=float), equation)
+    assert (result["stars"], result["passed"], result["error"]) == (stars, passed, None)
+
+def test_grade_equation_reports_bad_equations():
+    stars = np.asarray(LEVELS[0]["stars"], dtype=float)
+    assert grade_equation(stars, "x + (")["error"].startswith("parse error")
+    assert grade_equation(stars, "__import__('os')")["error"]
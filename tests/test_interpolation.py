@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from src.rootfinding import BarycentricInterpolator
+
+def polyfit_through(x, y):
+    """Reference: the interpolating polynomial from a square Vandermonde solve"""
+    t = np.asarray(x) / 600
+    return lambda xs: np.polyval(np.linalg.solve(np.vander(t), y), np.asarray(xs) / 600)
+
+def test_barycentric_matches_vandermonde_interpolation():
+    x = np.array([-500.0, -320.0, -90.0, 40.0, 210.0, 480.0])
+    y = np.array([12.0, -30.0, 55.0, 8.0, -41.0, 90.0])
+    interp = BarycentricInterpolator(list(zip(x, y)))
+    xs = np.linspace(-600, 600, 101)
+    np.testing.assert_allclose(interp(xs), polyfit_through(x, y)(xs), rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(interp(x), y)
+    assert isinstance(interp(40.0), float)
+
+def test_barycentric_add_and_remove_match_rebuild():
+    rng = np.random.default_rng(3)
+    x = rng.permutation(np.linspace(-590, 590, 12))
+    y = rng.normal(0, 50, len(x))
+    interp = BarycentricInterpolator()
+    for xi, yi in zip(x, y):
+        interp.add_point(xi, yi)
+    xs = np.linspace(-600, 600, 57)
+    rebuilt = BarycentricInterpolator(list(zip(x, y)))
+    np.testing.assert_allclose(interp(xs), rebuilt(xs), rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(interp(xs), polyfit_through(x, y)(xs), rtol=1e-7, atol=1e-6)
+    
+    interp.remove_point(x[4])
+    keep = np.arange(len(x)) != 4
+    np.testing.assert_allclose(interp(xs), polyfit_through(x[keep], y[keep])(xs), rtol=1e-7, atol=1e-6)
+    assert len(interp) == len(x) - 1
+
+def test_barycentric_rejects_duplicate_and_missing_points():
+    interp = BarycentricInterpolator([(0.0, 1.0), (1.0, 2.0)])
+    with pytest.raises(ValueError):
+        interp.add_point(1.0, 5.0)
+    with pytest.raises(ValueError):
+        interp.remove_point(2.0)
+    with pytest.raises(ValueError):
+        BarycentricInterpolator([(0.0, 1.0), (0.0, 2.0)])
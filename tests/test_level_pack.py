@@ -0,0 +1,70 @@
+import json
+import pytest
+from src import level_pack
+from src.level_pack import LevelPack, load_levels, write_level_pack
+from src.levels import LEVELS
+
+def make_levels(count):
+    return [{"name": f"Level {i}", "equation": "0", "stars": [(i, 2 * i), (-i, 0.5)], "solution": f"{i}*x",
+             "hint": "é" * i} for i in range(count)]
+
+def test_pack_round_trip(tmp_path):
+    path = tmp_path / "many.eqpack"
+    levels = make_levels(50) + [{"name": "Sandbox", "equation": "x", "stars": [], "type": "free"}]
+    write_level_pack(str(path), levels, name="many")
+    
+    pack = LevelPack.open(str(path))
+    assert (pack.name, len(pack)) == ("many", 51)
+    for i, level in enumerate(levels):
+        assert pack[i] == level
+        assert pack.level_name(i) == level["name"]
+        assert pack.star_count(i) == len(level["stars"])
+    assert pack.is_free(50) and not pack.is_free(0)
+    with pytest.raises(IndexError):
+        pack[51]
+
+def test_opening_a_pack_reads_only_the_header(tmp_path, monkeypatch):
+    path = tmp_path / "many.eqpack"
+    write_level_pack(str(path), make_levels(1000))
+    reads = []
+    real_read = LevelPack._read
+    monkeypatch.setattr(LevelPack, "_read", lambda self, i: (reads.append(i), real_read(self, i))[1])
+    
+    pack = LevelPack.open(str(path))
+    assert [pack.level_name(i) for i in (0, 999)] == ["Level 0", "Level 999"]
+    assert reads == []
+    
+    # Each level record is read from its indexed offset, once while it's cached
+    assert pack[700]["solution"] == "700*x"
+    assert pack[700]["stars"] == [(700, 1400), (-700, 0.5)]
+    pack[700]
+    assert reads == [700]
+
+def test_level_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(level_pack, "LEVEL_CACHE_SIZE", 4)
+    path = tmp_path / "many.eqpack"
+    write_level_pack(str(path), make_levels(10))
+    pack = LevelPack.open(str(path))
+    for i in range(10):
+        assert pack[i]["name"] == f"Level {i}"
+    assert sorted(pack._cache) == [6, 7, 8, 9]
+
+def test_open_rejects_other_files(tmp_path):
+    not_json = tmp_path / "notes.txt"
+    not_json.write_text("hello\n")
+    other_json = tmp_path / "other.json"
+    other_json.write_text(json.dumps({"format": "something"}) + "\n")
+    newer = tmp_path / "newer.eqpack"
+    newer.write_text(json.dumps({"format": "eqpack", "version": 99, "levels": []}) + "\n")
+    for path in (not_json, other_json, newer):
+        with pytest.raises(ValueError):
+            LevelPack.open(str(path))
+
+def test_built_in_levels_match_a_written_pack(tmp_path):
+    path = tmp_path / "built-in.eqpack"
+    assert level_pack.main(["build", str(path)]) == 0
+    built_in, packed = load_levels(), load_levels(str(path))
+    assert len(built_in) == len(packed) == len(LEVELS)
+    for i in range(len(LEVELS)):
+        assert packed[i]["stars"] == [tuple(star) for star in built_in[i]["stars"]]
+        assert packed.level_name(i) == built_in.level_name(i)
@@ -0,0 +1,71 @@
+import os
+from src.progress import ProgressStore, _encode
+
+def open_store(path, **kwargs):
+    """Start a store and wait for it to finish loading"""
+    store = ProgressStore(str(path), flush_interval=0, **kwargs)
+    store.start()
+    assert store.loaded.wait(5)
+    return store
+
+def test_progress_survives_a_restart(tmp_path):
+    path = tmp_path / "levels.journal"
+    store = open_store(path)
+    store.record_level(0, True, 3)
+    store.record_level(1, False, 2)
+    store.record_level(1, True, 1)  # Merged: completed and the best star count
+    store.record_unlocked(3)
+    store.record_unlocked(2)        # Never goes backwards
+    store.close()
+    
+    store = open_store(path)
+    assert store.progress() == (3, {0: {"completed": True, "stars": 3}, 1: {"completed": True, "stars": 2}})
+    store.close()
+
+def test_torn_tail_is_truncated(tmp_path):
+    path = tmp_path / "levels.journal"
+    good = _encode({"unlocked": 2}) + _encode({"level": 0, "completed": True, "stars": 2})
+    path.write_bytes(good + _encode({"level": 1, "completed": True, "stars": 5})[:-7])
+    
+    store = open_store(path)
+    assert store.progress() == (2, {0: {"completed": True, "stars": 2}})
+    assert path.read_bytes() == good
+    store.record_level(1, False, 1)
+    store.close()
+    assert open_store(path).progress()[1][1] == {"completed": False, "stars": 1}
+
+def test_bad_checksum_drops_the_rest_of_the_journal(tmp_path):
+    path = tmp_path / "levels.journal"
+    good = _encode({"unlocked": 2})
+    corrupt = bytearray(_encode({"unlocked": 9}))
+    corrupt[-3] ^= 0x01  # Flip a bit in the JSON so the CRC no longer matches
+    path.write_bytes(good + bytes(corrupt) + _encode({"level": 0, "completed": True, "stars": 1}))
+    
+    store = open_store(path)
+    assert store.progress() == (2, {})
+    assert path.read_bytes() == good
+    store.close()
+
+def test_journal_is_compacted_by_replacing_it(tmp_path, monkeypatch):
+    path = tmp_path / "levels.journal"
+    path.write_bytes(b"".join(_encode({"level": level, "completed": False, "stars": stars})
+                              for stars in range(1, 4) for level in range(5)))
+    replaced = []
+    real_replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda src, dst: (replaced.append((src, dst)), real_replace(src, dst)))
+    
+    store = open_store(path, compact_every=10)
+    store.record_level(2, True, 3)
+    store.close()
+    
+    assert replaced and set(replaced) == {(str(path) + ".tmp", str(path))}
+    assert not os.path.exists(str(path) + ".tmp")
+    assert len(path.read_bytes().splitlines()) == 5  # One record per level
+    expected = {level: {"completed": level == 2, "stars": 3} for level in range(5)}
+    assert open_store(path).progress() == (1, expected)
+
+def test_missing_journal_loads_as_fresh_progress(tmp_path):
+    store = open_store(tmp_path / "saves" / "levels.journal")
+    assert store.progress() == (1, {})
+    store.close()
+    assert not (tmp_path / "saves" / "levels.journal").exists()
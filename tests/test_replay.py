@@ -0,0 +1,160 @@
+import numpy as np
+import pygame
+import pytest
+from src.controls import handle_event, handle_held_keys, new_backspace_state
+from src.game import Game
+from src.progress import ProgressStore
+from src.replay import KIND_BALL, RECORD_DTYPE, ReplayReader, ReplayRecorder, record_to_event, verify_replay
+
+def key(k, char=""):
+    return pygame.event.Event(pygame.KEYDOWN, key=k, unicode=char, mod=0)
+
+def typed(text):
+    return [key(ord(ch), ch) for ch in text]
+
+# Open Level Select, pick the third level (if it is unlocked), solve the first
+# level's equation and press Return again once the ball has reached the end,
+# which only moves on if the level was completed
+LEVEL_SELECT_SCRIPT = {
+    2: [key(pygame.K_DOWN), key(pygame.K_DOWN), key(pygame.K_RETURN, "\r")],
+    3: [key(pygame.K_DOWN), key(pygame.K_DOWN), key(pygame.K_RETURN, "\r")],
+    5: typed("0.5*x") + [key(pygame.K_RETURN, "\r")],
+    260: [key(pygame.K_RETURN, "\r")],
+}
+
+def record_run(path, script, frames=400, progress=None, progress_frame=1):
+    """Play a scripted run the way the main loop does, recording it"""
+    recorder = ReplayRecorder(str(path), buffer_size=64)
+    game = Game()
+    game.recorder = recorder
+    backspace = new_backspace_state()
+    ticks = 0
+    for frame in range(1, frames + 1):
+        ticks += 16
+        recorder.begin_frame(ticks)
+        for event in script.get(frame, []):
+            recorder.record_event(event, 0, (0, 0))
+            handle_event(game, event, 0, (0, 0), ticks, backspace)
+        handle_held_keys(game, ticks, backspace)
+        if frame == progress_frame and progress is not None:
+            progress.loaded.wait(5)  # The store finishes loading on this frame
+            game.progress = progress
+        game.update()
+    recorder.close()
+    return game
+
+@pytest.fixture
+def saved_progress(tmp_path):
+    """A progress journal with three unlocked levels"""
+    journal = tmp_path / "levels.journal"
+    store = ProgressStore(str(journal), flush_interval=0)
+    store.start()
+    store.loaded.wait(5)
+    store.record_level(0, True, 3)
+    store.record_level(1, True, 2)
+    store.record_unlocked(3)
+    store.close()
+    store = ProgressStore(str(journal), flush_interval=0)
+    store.start()
+    yield store
+    store.close()
+
+def test_replay_round_trip_and_seek(tmp_path):
+    path = tmp_path / "run.eqr"
+    game = record_run(path, {1: [key(pygame.K_RETURN, "\r")], 2: typed("0.5*x + 20") + [key(pygame.K_RETURN, "\r")]})
+    reader = ReplayReader(str(path))
+    assert reader.frame_count == 400
+    assert reader.equations() == [(2, "0.5*x + 20")]
+    assert reader.level_pack() is None
+    for frame in (1, 2, 150, 400):
+        records = reader.frame_records(frame)
+        assert len(records) and (records["frame"] == frame).all()
+        assert reader.seek(frame) == np.flatnonzero(reader.records["frame"] == frame)[0]
+    trajectory = reader.trajectory()
+    assert len(trajectory) == (reader.records["kind"] == KIND_BALL).sum() > 0
+    np.testing.assert_array_equal(trajectory[-1], np.float32(game.ball_pos))
+    assert verify_replay(str(path))["first_mismatch"] is None
+
+def test_replay_ignores_partial_trailing_record(tmp_path):
+    path = tmp_path / "run.eqr"
+    record_run(path, {1: [key(pygame.K_RETURN, "\r")]}, frames=20)
+    count = len(ReplayReader(str(path)))
+    with open(path, "ab") as f:
+        f.write(b"\1\2\3")
+    assert len(ReplayReader(str(path))) == count
+
+def test_text_records_span_several_chunks(tmp_path):
+    path = tmp_path / "run.eqr"
+    long_equation = "+".join(f"{i}*sin(x/{i + 1})" for i in range(40))
+    recorder = ReplayRecorder(str(path), buffer_size=4)
+    recorder.record_level_pack("/packs/ünïcode pack.eqpack")
+    recorder.begin_frame(16)
+    recorder.record_equation(long_equation)
+    recorder.record_equation("")
+    recorder.begin_frame(32)
+    recorder.record_ball((1.5, -2.25))
+    recorder.close()
+    
+    reader = ReplayReader(str(path))
+    assert reader.level_pack() == "/packs/ünïcode pack.eqpack"
+    assert reader.equations() == [(1, long_equation), (1, "")]
+    assert reader.equations(start_frame=2) == []
+    np.testing.assert_array_equal(reader.trajectory(), [[1.5, -2.25]])
+    assert reader.frame_count == 2
+
+def test_replay_events_survive_the_round_trip(tmp_path):
+    path = tmp_path / "run.eqr"
+    events = [
+        key(pygame.K_a, "a"),
+        pygame.event.Event(pygame.KEYUP, key=pygame.K_a, mod=0),
+        pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=3, pos=(120, 45)),
+        pygame.event.Event(pygame.MOUSEBUTTONUP, button=3, pos=(130, 50)),
+        pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-2, flipped=False),
+    ]
+    recorder = ReplayRecorder(str(path))
+    recorder.begin_frame(16)
+    for event in events:
+        recorder.record_event(event, pygame.KMOD_LSHIFT, getattr(event, "pos", (7, 8)))
+    recorder.record_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(1, 1), rel=(0, 0), buttons=(0, 0, 0)), 0, (1, 1))
+    recorder.close()
+    
+    _, ticks, inputs, _ = next(ReplayReader(str(path)).frames())
+    assert ticks == 16
+    assert len(inputs) == len(events)  # Plain mouse motion isn't recorded
+    for event, record in zip(events, inputs):
+        rebuilt = record_to_event(record)
+        assert rebuilt.type == event.type
+        for attribute in ("key", "unicode", "button", "pos", "y"):
+            if hasattr(event, attribute):
+                assert getattr(rebuilt, attribute) == getattr(event, attribute)
+        assert record["mod"] == pygame.KMOD_LSHIFT
+
+def test_replay_reader_rejects_other_files(tmp_path):
+    other = tmp_path / "notes.txt"
+    other.write_bytes(b"not a replay at all")
+    with pytest.raises(ValueError):
+        ReplayReader(str(other))
+    
+    path = tmp_path / "empty.eqr"
+    ReplayRecorder(str(path)).close()
+    reader = ReplayReader(str(path))
+    assert len(reader) == 0 and reader.frame_count == 0 and reader.equations() == []
+    assert path.stat().st_size == 16 + len(reader) * RECORD_DTYPE.itemsize
+
+@pytest.mark.parametrize("progress_frame", [1, 3, 40])
+def test_replay_with_saved_progress_verifies(tmp_path, saved_progress, progress_frame):
+    path = tmp_path / "run.eqr"
+    game = record_run(path, LEVEL_SELECT_SCRIPT, progress=saved_progress, progress_frame=progress_frame)
+    reader = ReplayReader(str(path))
+    assert reader.saved_progress() == {progress_frame: (3, {0: {"completed": True, "stars": 3},
+                                                            1: {"completed": True, "stars": 2}})}
+    assert verify_replay(str(path))["first_mismatch"] is None
+    if progress_frame < 3:
+        assert game.current_level == 2  # The saved progress changed what was played
+
+def test_saved_progress_changes_the_run(tmp_path, saved_progress):
+    with_progress = record_run(tmp_path / "saved.eqr", LEVEL_SELECT_SCRIPT, progress=saved_progress)
+    without = record_run(tmp_path / "fresh.eqr", LEVEL_SELECT_SCRIPT)
+    assert (with_progress.current_level, without.current_level) == (2, 1)
+    assert not np.array_equal(ReplayReader(str(tmp_path / "saved.eqr")).trajectory(),
+                              ReplayReader(str(tmp_path / "fresh.eqr")).trajectory())
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+from src.rootfinding import (bisection_batch, bisection_method, brent_method, fit_polynomial, newton_raphson,
+                             newton_raphson_batch, polynomial_extrema, polynomial_inflection_points,
+                             polynomial_roots, secant_batch, secant_method)
+
+def cubic(x):
+    return x ** 3 - 2 * x - 5
+
+def cubic_prime(x):
+    return 3 * x ** 2 - 2
+
+CUBIC_ROOT = next(r.real for r in np.roots([1, 0, -2, -5]) if abs(r.imag) < 1e-12)
+
+class Counted:
+    """Wrap a function and count how often it is called"""
+    
+    def __init__(self, f):
+        self.f = f
+        self.calls = 0
+    
+    def __call__(self, x):
+        self.calls += 1
+        return self.f(x)
+
+@pytest.mark.parametrize("solver", [bisection_method, brent_method])
+def test_reported_evals_match_actual_calls(solver):
+    f = Counted(cubic)
+    root, _, _, evals = solver(f, 2, 3, tol=1e-10, return_evals=True)
+    assert evals == f.calls
+    assert root == pytest.approx(CUBIC_ROOT, abs=1e-9)
+
+def test_bisection_evaluates_once_per_iteration():
+    _, iterations, _, evals = bisection_method(cubic, 2, 3, tol=1e-10, return_evals=True)
+    assert evals == iterations + 2
+
+@pytest.mark.parametrize("f, a, b", [
+    (cubic, 2, 3),
+    (np.cos, 0, 3),
+    (lambda x: np.exp(x) - 10, 0, 5),
+    (lambda x: np.polyval(np.poly([-250.0, -40.0, 75.0, 310.0]), x), 60, 110),
+])
+def test_brent_needs_fewer_evals_than_bisection(f, a, b):
+    brent_root, _, _, brent_evals = brent_method(f, a, b, tol=1e-10, return_evals=True)
+    bisect_root, _, _, bisect_evals = bisection_method(f, a, b, tol=1e-10, return_evals=True)
+    assert brent_root == pytest.approx(bisect_root, abs=1e-8)
+    assert brent_evals < bisect_evals / 2
+
+def test_brent_rejects_bracket_without_sign_change():
+    with pytest.raises(ValueError):
+        brent_method(cubic, 3, 4)
+
+def test_bisection_batch_matches_scalar_solver():
+    a = np.linspace(-3, 2, 12)
+    b = a + np.linspace(1, 4, 12)
+    roots, iterations, converged = bisection_batch(cubic, a, b, tol=1e-10)
+    for i in range(len(a)):
+        if cubic(a[i]) * cubic(b[i]) > 0:
+            assert np.isnan(roots[i]) and not converged[i]
+            continue
+        root, iters, _ = bisection_method(cubic, a[i], b[i], tol=1e-10)
+        assert converged[i]
+        assert roots[i] == pytest.approx(root, abs=1e-12)
+        assert iterations[i] == iters
+        assert roots[i] == pytest.approx(CUBIC_ROOT, abs=1e-9)
+
+def test_newton_raphson_batch_matches_scalar_solver():
+    x0 = np.array([1.0, 2.0, 3.0, 10.0, -4.0])
+    roots, iterations, converged = newton_raphson_batch(cubic, cubic_prime, x0, tol=1e-12)
+    assert converged.all()
+    for i, start in enumerate(x0):
+        root, iters, _ = newton_raphson(cubic, cubic_prime, start, tol=1e-12)
+        assert roots[i] == pytest.approx(root, abs=1e-12)
+        assert iterations[i] == iters
+    np.testing.assert_allclose(roots, CUBIC_ROOT, atol=1e-10)
+
+def test_newton_raphson_batch_flags_flat_derivative():
+    roots, _, converged = newton_raphson_batch(lambda x: x ** 2 - 1, lambda x: 2 * x, np.array([0.0, 3.0]))
+    assert not converged[0] and roots[0] == 0.0
+    assert converged[1] and roots[1] == pytest.approx(1.0)
+
+def test_secant_batch_matches_scalar_solver():
+    x0 = np.array([1.0, 2.0, 3.0, 5.0])
+    x1 = x0 + 0.5
+    roots, iterations, converged = secant_batch(cubic, x0, x1, tol=1e-8)
+    assert converged.all()
+    for i in range(len(x0)):
+        root, iters, _ = secant_method(cubic, x0[i], x1[i], tol=1e-8)
+        assert roots[i] == pytest.approx(root, abs=1e-12)
+        assert iterations[i] == iters
+    np.testing.assert_allclose(roots, CUBIC_ROOT, atol=1e-10)
+
+def test_batch_solvers_find_every_root_of_a_polynomial():
+    coeffs = np.poly([-250.0, -40.0, 75.0, 310.0])
+    f = lambda x: np.polyval(coeffs, x)
+    brackets = np.array([[-300, -200], [-100, 0], [50, 100], [300, 320]], dtype=float)
+    roots, _, converged = bisection_batch(f, brackets[:, 0], brackets[:, 1], tol=1e-9)
+    assert converged.all()
+    np.testing.assert_allclose(roots, np.sort(np.roots(coeffs).real), atol=1e-8)
+
+def real_roots_reference(coeffs):
+    """Reference: real roots from np.roots"""
+    roots = np.roots(coeffs)
+    return np.sort(roots[np.abs(roots.imag) < 1e-6].real)
+
+@pytest.mark.parametrize("roots", [
+    [3.0],
+    [-2.0, 5.0],
+    [-250.0, -40.0, 75.0, 310.0],
+    [-580.0, -410.0, -120.0, 0.0, 35.0, 260.0, 599.0],
+])
+def test_polynomial_roots_matches_np_roots(roots):
+    coeffs = 0.01 * np.poly(roots)
+    np.testing.assert_allclose(polynomial_roots(coeffs), real_roots_reference(coeffs), rtol=1e-8, atol=1e-7)
+    np.testing.assert_allclose(polynomial_roots(coeffs), roots, rtol=1e-8, atol=1e-7)
+
+def test_polynomial_roots_skips_complex_pairs_and_leading_zeros():
+    coeffs = np.array([0.0, 0.0, 1.0, 0.0, 1.0, 0.0])  # x^3 + x = x (x^2 + 1)
+    np.testing.assert_allclose(polynomial_roots(coeffs), [0.0], atol=1e-12)
+    assert len(polynomial_roots([0.0, 4.0])) == 0
+
+def test_extrema_and_inflection_points_match_derivative_roots():
+    coeffs = np.poly([-300.0, -100.0, 50.0, 400.0])
+    np.testing.assert_allclose(polynomial_extrema(coeffs), real_roots_reference(np.polyder(coeffs)), rtol=1e-9)
+    np.testing.assert_allclose(polynomial_inflection_points(coeffs), real_roots_reference(np.polyder(coeffs, 2)),
+                               rtol=1e-9)
+
+def test_fit_result_roots_match_np_roots_of_polyfit():
+    rng = np.random.default_rng(7)
+    x = rng.uniform(-600, 600, 300)
+    y = 1e-6 * (x + 450) * (x + 80) * (x - 220) + rng.normal(0, 0.5, len(x))
+    fit = fit_polynomial(x, y, 3)
+    reference = np.polyfit(x / 600, y, 3) * 600.0 ** -np.arange(3, -1, -1)
+    np.testing.assert_allclose(fit.roots(), real_roots_reference(reference), rtol=1e-6)
+    np.testing.assert_allclose(fit.roots(), [-450, -80, 220], atol=5)
+    np.testing.assert_allclose(fit.extrema(), real_roots_reference(np.polyder(reference)), rtol=1e-6)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from src.rootfinding import CubicSpline, solve_tridiagonal
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5, 8, 33, 1000])
+def test_solve_tridiagonal_matches_dense_solve(n):
+    rng = np.random.default_rng(n)
+    lower, upper = rng.normal(size=n - 1), rng.normal(size=n - 1)
+    diag = 4 + np.abs(rng.normal(size=n))
+    rhs = rng.normal(size=n)
+    dense = np.diag(diag) + np.diag(lower, -1) + np.diag(upper, 1)
+    np.testing.assert_allclose(solve_tridiagonal(lower, diag, upper, rhs), np.linalg.solve(dense, rhs), atol=1e-12)
+
+def natural_spline_second_derivatives(x, y):
+    """Reference: the natural spline system solved densely"""
+    n = len(x)
+    h = np.diff(x)
+    system = np.zeros((n, n))
+    rhs = np.zeros(n)
+    system[0, 0] = system[-1, -1] = 1.0
+    for i in range(1, n - 1):
+        system[i, i - 1:i + 2] = h[i - 1], 2 * (h[i - 1] + h[i]), h[i]
+        rhs[i] = 6 * ((y[i + 1] - y[i]) / h[i] - (y[i] - y[i - 1]) / h[i - 1])
+    return np.linalg.solve(system, rhs)
+
+def test_cubic_spline_matches_dense_reference():
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(-600, 600, 50))
+    y = 100 * np.sin(x / 80) + rng.normal(0, 5, len(x))
+    spline = CubicSpline(list(zip(x, y)))
+    np.testing.assert_allclose(spline.m, natural_spline_second_derivatives(x, y), atol=1e-9)
+    np.testing.assert_allclose(spline(x), y, atol=1e-9)
+    assert spline.m[0] == spline.m[-1] == 0.0
+
+def test_cubic_spline_reproduces_a_line_and_averages_duplicates():
+    spline = CubicSpline([(0, 1), (1, 3), (1, 5), (3, 9)])
+    np.testing.assert_allclose(spline([0.0, 1.0, 3.0]), [1.0, 4.0, 9.0], atol=1e-12)
+    line = CubicSpline([(x, 2 * x - 1) for x in range(-5, 6)])
+    np.testing.assert_allclose(line(np.linspace(-5, 5, 41)), 2 * np.linspace(-5, 5, 41) - 1, atol=1e-12)